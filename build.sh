@@ -19,61 +19,27 @@ pip install -r requirements.txt
 # - Isso garante que o Django e todas as bibliotecas auxiliares (como dj_database_url, django-storages, etc.) estejam disponíveis.
 # - Se faltar alguma dependência, essa etapa falha e o deploy para automaticamente.
 
-echo "Executando migrações"
+echo "Executando etapas do deploy (migrate, collectstatic, fixtures, mídia)"
 # ===============================================
-# Etapa 2: Atualização da estrutura do banco
+# Etapas 2 a 5: banco, arquivos estáticos, dados iniciais e mídia
 # ===============================================
-# Mensagem informativa que indica que o banco de dados será sincronizado com os modelos do Django.
+# Mensagem informativa que indica o início das etapas orquestradas pelo Django.
 
-python manage.py migrate --noinput
-# Comando do Django que aplica todas as migrações pendentes.
+python manage.py deploy_build
+# Comando customizado (core/management/commands/deploy_build.py) que executa:
+# - migrate --noinput: aplica as migrações pendentes no banco.
+# - collectstatic --noinput: envia os arquivos estáticos (CSS, JS, imagens) para o STATIC_ROOT/bucket.
+# - import_snapshot: carrega as fixtures backup_cargo.json, backup_equipe.json e backup_servico.json.
+# - upload_media: envia a pasta local "media" para o bucket do Google Cloud Storage.
 # Explicação detalhada:
-# - Cada "migration" é um arquivo que descreve alterações na estrutura do banco (criar tabela, coluna, índice, etc.).
-# - --noinput faz o comando rodar sem pedir confirmação. Isso é essencial em deploys automáticos.
-# - Garantia: após esse comando, o banco estará compatível com o código atual da aplicação.
-# - Se houver falha (como conflito de migration), o deploy será interrompido por causa do `set -e`.
-
-echo "Coletando arquivos estáticos"
-# ===============================================
-# Etapa 3: Preparação de arquivos estáticos
-# ===============================================
-# Mensagem informativa para mostrar no log que a coleta começou.
-
-python manage.py collectstatic --noinput
-# Explicação detalhada:
-# - O Django precisa que todos os arquivos estáticos (CSS, JS, imagens) fiquem em um único diretório (STATIC_ROOT) para produção.
-# - collectstatic copia arquivos de cada app e do diretório "static" do projeto para STATIC_ROOT.
-# - --noinput evita perguntas de confirmação durante o processo.
-# - Isso garante que o servidor de produção consiga servir todos os recursos corretamente.
-
-echo "Carregando dados iniciais"
-# ===============================================
-# Etapa 4: Inserção de dados essenciais (fixtures)
-# ===============================================
-# Mensagem informativa para logar o início do carregamento de dados.
-
-python manage.py loaddata backup_cargo.json
-python manage.py loaddata backup_equipe.json
-python manage.py loaddata backup_servico.json
-# Explicação detalhada:
-# - loaddata importa dados do banco a partir de arquivos JSON.
-# - Cada arquivo contém uma "fixture" com registros essenciais.
-# - Exemplos: cargos da empresa, equipes, serviços cadastrados.
-# - Isso é útil para inicializar o ambiente de produção com dados básicos que o site precisa para funcionar.
-# - Se algum arquivo estiver faltando ou corrompido, o deploy falha devido ao `set -e`.
-
-echo "Sincronizando mídia com bucket GCS"
-# ===============================================
-# Etapa 5: Upload de arquivos de mídia (uploads de usuários)
-# ===============================================
-# Mensagem informativa para logar o início da sincronização.
-
-python manage.py upload_media
-# Explicação detalhada:
-# - upload_media é um comando customizado que envia o conteúdo da pasta local "media" para o bucket do Google Cloud Storage.
-# - Garantia: todas as imagens, vídeos e outros arquivos de mídia estarão acessíveis em produção.
-# - Isso é crítico para que recursos visuais e uploads de usuários funcionem corretamente.
-# - Certifique-se de que o comando esteja implementado e funcionando antes do deploy.
+# - Para cada etapa é calculada uma "impressão digital" (hash) das suas entradas:
+#   arquivos de migração, árvore de estáticos, fixtures e índice da pasta media.
+# - Se a impressão digital for igual à do último deploy, a etapa é pulada.
+#   Assim, um deploy que só alterou código Python leva poucos segundos.
+# - collectstatic, upload_media e import_snapshot são independentes e rodam em paralelo depois do migrate.
+# - No final é exibido o tempo de cada etapa.
+# - Para forçar todas as etapas: python manage.py deploy_build --force
+# - Se alguma etapa falhar, o deploy é interrompido por causa do `set -e`.
 
 echo "Criando superusuário se não existir"
 # ===============================================
@@ -108,4 +74,5 @@ echo "Build concluído!"
 # - Arquivos estáticos coletados
 # - Dados essenciais carregados
 # - Mídia sincronizada
+# (as etapas sem alterações desde o último deploy foram puladas pelo deploy_build)
 # - Superusuário criado (se necessário)
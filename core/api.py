@@ -0,0 +1,265 @@
+# ======================================================================
+# API JSON SOMENTE LEITURA (SERVIÇOS, EQUIPE E CARGOS)
+# ======================================================================
+# Endpoints públicos em core/urls.py:
+#     /api/servicos/   /api/equipe/   /api/cargos/
+#
+# Parâmetros (todos opcionais):
+#   - campos=id,nome,cargo   → só esses campos em cada item (padrão: todos);
+#   - limite=100             → itens por página (padrão 50, máximo 500);
+#   - cursor=...             → próxima página (valor de "proximo" da resposta).
+#
+# Resposta:
+#     {"resultados": [{...}, ...], "proximo": "/api/equipe/?cursor=..." ou null}
+#
+# - Paginação por chave (keyset): cada página é WHERE id > último_id ORDER BY
+#   id LIMIT n, pelo índice parcial de 'ativo'. O cursor é opaco e assinado
+#   (django.core.signing), como o da página inicial (core/pagination.py).
+# - O corpo é gerado aos poucos (StreamingHttpResponse): as linhas vêm do
+#   banco com .iterator() e saem em blocos de texto, sem montar a lista
+#   inteira nem o JSON inteiro em memória.
+# - ETag calculado a partir do maior 'modificado' e da quantidade de linhas
+#   ativas: com If-None-Match igual, a resposta é 304 sem consultar a página.
+
+import hashlib
+import json
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import urlencode
+from django.views.generic import View
+
+from .cache import etag_confere
+from .models import Cargo, Equipe, Servico
+
+SALT = 'core.api'
+TAMANHO_BLOCO = 16 * 1024
+# Caracteres acumulados antes de enviar um pedaço da resposta: um pedaço
+# por item deixaria a resposta lenta (uma escrita no socket por linha).
+
+
+class ParametroInvalido(ValueError):
+    """Parâmetro da query string inválido (resposta 400)."""
+
+
+def coluna(nome):
+    """Campo da API que é uma coluna do próprio modelo."""
+    return (nome,), lambda objeto: getattr(objeto, nome)
+
+
+def url_imagem(objeto):
+    return objeto.imagem.url if objeto.imagem else None
+
+
+def urls_versoes(objeto):
+    """
+    URLs das versões da imagem geradas pelo django-pictures, no formato
+    {proporção: {formato: {largura: url}}}; proporção 'original' = sem corte.
+    Usa image_width/image_height do banco: não abre o arquivo no storage.
+    As URLs vêm do storage (como imagem.url), e não de figura.url: com
+    PICTURES["USE_PLACEHOLDERS"], esta apontaria para a rota de placeholders.
+    """
+    if not objeto.imagem:
+        return {}
+    storage = objeto.imagem.storage
+    return {
+        str(proporcao) if proporcao else 'original': {
+            formato.lower(): {str(largura): storage.url(figura.name) for largura, figura in larguras.items()}
+            for formato, larguras in formatos.items()
+        }
+        for proporcao, formatos in objeto.imagem.aspect_ratios.items()
+    }
+
+
+class _JSONEncoder(DjangoJSONEncoder):
+    # Datas em ISO 8601 (DjangoJSONEncoder) e acentos sem escape.
+    def __init__(self, **kwargs):
+        kwargs['ensure_ascii'] = False
+        super().__init__(**kwargs)
+
+
+_codificar = _JSONEncoder(separators=(',', ':')).encode
+
+
+class ApiListView(View):
+    """
+    Listagem JSON paginada de um modelo. Cada subclasse define:
+    - queryset: linhas publicadas (ex: ativo=True);
+    - campos: nome do campo na API → (colunas lidas do banco, função(objeto));
+    - versionado_por: colunas cujo maior valor entra no ETag.
+    """
+
+    queryset = None
+    campos = {}
+    relacionados = ()
+    # Argumentos de select_related() (ex: Equipe → cargo).
+    versionado_por = ('modificado',)
+    tamanho_padrao = 50
+    tamanho_maximo = 500
+    cache_max_age = 60
+
+    # ------------------------------------------------------------------
+    # Parâmetros
+    # ------------------------------------------------------------------
+    def campos_pedidos(self):
+        valor = self.request.GET.get('campos')
+        if not valor:
+            return list(self.campos)
+        pedidos = [nome.strip() for nome in valor.split(',') if nome.strip()]
+        desconhecidos = [nome for nome in pedidos if nome not in self.campos]
+        if desconhecidos or not pedidos:
+            raise ParametroInvalido(
+                f"Campos inválidos: {', '.join(desconhecidos) or valor}. "
+                f"Disponíveis: {', '.join(self.campos)}."
+            )
+        return list(dict.fromkeys(pedidos))
+        # Remove repetidos mantendo a ordem pedida.
+
+    def tamanho_pedido(self):
+        valor = self.request.GET.get('limite')
+        if valor is None:
+            return self.tamanho_padrao
+        try:
+            tamanho = int(valor)
+        except ValueError:
+            raise ParametroInvalido('limite deve ser um número inteiro.')
+        if not 1 <= tamanho <= self.tamanho_maximo:
+            raise ParametroInvalido(f'limite deve estar entre 1 e {self.tamanho_maximo}.')
+        return tamanho
+
+    def ultimo_pedido(self):
+        cursor = self.request.GET.get('cursor')
+        if not cursor:
+            return None
+        try:
+            estado = signing.loads(cursor, salt=f'{SALT}.{self.queryset.model._meta.label_lower}')
+        except signing.BadSignature:
+            raise ParametroInvalido('cursor inválido.')
+            # O salt inclui o modelo: um cursor da equipe não vale em /api/servicos/.
+        if not isinstance(estado, dict) or not isinstance(estado.get('u'), int):
+            raise ParametroInvalido('cursor inválido.')
+        return estado['u']
+
+    def url_proxima(self, ultimo):
+        cursor = signing.dumps({'u': ultimo}, salt=f'{SALT}.{self.queryset.model._meta.label_lower}')
+        parametros = {chave: valor for chave, valor in self.request.GET.items() if chave != 'cursor'}
+        parametros['cursor'] = cursor
+        return f'{self.request.path}?{urlencode(parametros)}'
+
+    # ------------------------------------------------------------------
+    # ETag
+    # ------------------------------------------------------------------
+    def etag(self):
+        """
+        Muda quando uma linha publicada é alterada (maior 'modificado'),
+        publicada, despublicada ou excluída (quantidade). Uma consulta de
+        agregação, sem ler as linhas da página.
+        """
+        versao = self.queryset.aggregate(
+            total=Count('pk'), **{f'v{i}': Max(coluna) for i, coluna in enumerate(self.versionado_por)}
+        )
+        base = f'{self.request.get_full_path()}|{sorted(versao.items())}'
+        return '"%s"' % hashlib.sha1(base.encode()).hexdigest()[:32]
+
+    # ------------------------------------------------------------------
+    # Corpo da resposta
+    # ------------------------------------------------------------------
+    def pagina(self, campos, tamanho, ultimo):
+        colunas = {coluna for nome in campos for coluna in self.campos[nome][0]}
+        qs = self.queryset.select_related(*self.relacionados).only(*colunas)
+        if ultimo is not None:
+            qs = qs.filter(pk__gt=ultimo)
+        qs = qs.order_by('pk')[:tamanho + 1]
+        # Uma linha a mais que o tamanho indica que existe próxima página.
+        return qs.using(qs.db)
+        # Fixa agora o banco escolhido pelo roteador (réplica ou principal): a
+        # consulta só roda enquanto a resposta é enviada, depois dos middlewares.
+
+    def gerar_json(self, linhas, campos, tamanho):
+        extratores = [(nome, self.campos[nome][1]) for nome in campos]
+        partes = ['{"resultados":[']
+        tamanho_partes = 0
+        ultimo = None
+        for indice, objeto in enumerate(linhas.iterator(chunk_size=tamanho + 1)):
+            if indice == tamanho:
+                break
+            item = _codificar({nome: extrair(objeto) for nome, extrair in extratores})
+            partes.append(',' + item if indice else item)
+            tamanho_partes += len(item)
+            ultimo = objeto.pk
+            if tamanho_partes >= TAMANHO_BLOCO:
+                yield ''.join(partes)
+                partes, tamanho_partes = [], 0
+        else:
+            ultimo = None
+            # Terminou sem chegar à linha extra: esta é a última página.
+        proximo = self.url_proxima(ultimo) if ultimo is not None else None
+        partes.append('],"proximo":%s}' % _codificar(proximo))
+        yield ''.join(partes)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            campos = self.campos_pedidos()
+            tamanho = self.tamanho_pedido()
+            ultimo = self.ultimo_pedido()
+        except ParametroInvalido as erro:
+            return JsonResponse({'erro': str(erro)}, status=400, json_dumps_params={'ensure_ascii': False})
+
+        etag = self.etag()
+        if etag_confere(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = StreamingHttpResponse(
+                self.gerar_json(self.pagina(campos, tamanho, ultimo), campos, tamanho),
+                content_type='application/json',
+            )
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=self.cache_max_age)
+        return response
+
+
+# ======================================================================
+# Endpoints
+# ======================================================================
+
+class ServicosApiView(ApiListView):
+    queryset = Servico.objects.filter(ativo=True)
+    campos = {
+        'id': coluna('id'),
+        'servico': coluna('servico'),
+        'descricao': coluna('descricao'),
+        'icone': coluna('icone'),
+        'modificado': coluna('modificado'),
+    }
+
+
+class EquipeApiView(ApiListView):
+    queryset = Equipe.objects.filter(ativo=True)
+    relacionados = ('cargo',)
+    versionado_por = ('modificado', 'cargo__modificado')
+    # O nome do cargo faz parte da resposta: renomear um cargo muda o ETag.
+    campos = {
+        'id': coluna('id'),
+        'nome': coluna('nome'),
+        'cargo': (('cargo', 'cargo__cargo'), lambda objeto: objeto.cargo.cargo),
+        'bio': coluna('bio'),
+        'imagem': (('imagem',), url_imagem),
+        'imagens': (('imagem', 'image_width', 'image_height'), urls_versoes),
+        'lqip': (('imagem_lqip',), lambda objeto: objeto.imagem_lqip or None),
+        'facebook': coluna('facebook'),
+        'twitter': coluna('twitter'),
+        'instagram': coluna('instagram'),
+        'modificado': coluna('modificado'),
+    }
+
+
+class CargosApiView(ApiListView):
+    queryset = Cargo.objects.filter(ativo=True)
+    campos = {
+        'id': coluna('id'),
+        'cargo': coluna('cargo'),
+        'modificado': coluna('modificado'),
+    }
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Importa o módulo de sinais para que os receivers sejam registrados.
+        from core import signals  # noqa: F401
+
+        # Registro de consultas lentas, ligado só com SLOW_QUERY_MS definido.
+        from django.conf import settings
+        if getattr(settings, 'SLOW_QUERY_MS', None) is not None:
+            from core import slowqueries
+            slowqueries.instalar()
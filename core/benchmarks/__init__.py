@@ -0,0 +1,148 @@
+# ======================================================================
+# MICRO-BENCHMARKS DOS CAMINHOS QUENTES (HOT PATHS)
+# ======================================================================
+# Complementa o 'loadtest' (página inteira, de fora): aqui cada trecho
+# caro é cronometrado isoladamente, para saber QUAL deles piorou.
+#
+#   - core/benchmarks/caminhos.py registra os benchmarks com @benchmark;
+#   - executar() roda cada um dentro de uma transação desfeita no fim (as
+#     linhas criadas para o teste não ficam no banco) e mede como o timeit:
+#     ajusta a quantidade de chamadas por rodada (autorange) e guarda a
+#     mediana, o mínimo e o desvio de várias rodadas;
+#   - os resultados são gravados como "linha de base" (baseline) em JSON
+#     (comando 'benchmark_suite --salvar') e comparados depois (comando
+#     'benchmark_compare'), que aponta o que ficou mais lento que a
+#     tolerância.
+#
+# A comparação usa o MÍNIMO por chamada entre as rodadas, como recomenda
+# a documentação do timeit: as rodadas mais lentas medem a interferência
+# de outros processos, não o código. Linhas de base só são
+# comparáveis entre execuções na mesma máquina e com o mesmo --linhas.
+
+import json
+import os
+import platform
+import statistics
+import timeit
+from contextlib import contextmanager
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.db import transaction
+
+_registro = {}
+# nome → função geradora (contextmanager) que prepara o cenário e produz o corpo medido.
+
+
+def benchmark(nome):
+    """
+    Registra um benchmark. A função recebe 'linhas' (tamanho dos dados),
+    prepara o cenário e produz (yield) a função sem argumentos a ser medida;
+    o que vem depois do yield é a limpeza.
+    """
+    def registrar(funcao):
+        _registro[nome] = contextmanager(funcao)
+        return funcao
+    return registrar
+
+
+def pasta():
+    return getattr(settings, 'BENCHMARK_DIR', os.path.join(settings.BASE_DIR, '.cache', 'benchmarks'))
+
+
+def _tamanhos():
+    # 1, 2, 5, 10, 20, 50, 100...
+    expoente = 0
+    while True:
+        for fator in (1, 2, 5):
+            yield fator * 10 ** expoente
+        expoente += 1
+
+
+def medir(corpo, rodadas=7, tempo_minimo=0.2):
+    """
+    Cronometra corpo(): 'rodadas' rodadas de N chamadas, com N escolhido
+    para cada rodada durar ao menos tempo_minimo segundos. Tempos em µs.
+    """
+    corpo()
+    # Aquecimento: caches, imports tardios, compilação de templates.
+    cronometro = timeit.Timer(corpo)
+    chamadas = next(n for n in _tamanhos() if cronometro.timeit(n) >= tempo_minimo)
+    # Como timeit.Timer.autorange(), mas com tempo_minimo ajustável.
+    por_chamada = [t / chamadas * 1e6 for t in cronometro.repeat(repeat=rodadas, number=chamadas)]
+    return {
+        'mediana_us': round(statistics.median(por_chamada), 3),
+        'min_us': round(min(por_chamada), 3),
+        'desvio_us': round(statistics.stdev(por_chamada), 3) if len(por_chamada) > 1 else 0.0,
+        'chamadas': chamadas * rodadas,
+    }
+
+
+def executar(linhas=50, filtro='', rodadas=7, tempo_minimo=0.2, ao_concluir=None):
+    """
+    Roda os benchmarks cujo nome contém 'filtro' e retorna o documento da
+    linha de base: {'metadados': {...}, 'resultados': {nome: medição}}.
+    ao_concluir(nome, medição) é chamado após cada benchmark.
+    """
+    from core.benchmarks import caminhos  # noqa: F401
+    # Importado aqui: registra os benchmarks (e importa views, templates...) só quando usados.
+
+    resultados = {}
+    for nome, cenario in _registro.items():
+        if filtro not in nome:
+            continue
+        with transaction.atomic():
+            with cenario(linhas) as corpo:
+                resultados[nome] = medir(corpo, rodadas, tempo_minimo)
+            transaction.set_rollback(True)
+        if ao_concluir:
+            ao_concluir(nome, resultados[nome])
+    return {
+        'metadados': {
+            'quando': datetime.now().isoformat(timespec='seconds'),
+            'maquina': platform.node(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'banco': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            'linhas': linhas,
+        },
+        'resultados': resultados,
+    }
+
+
+def salvar(documento, caminho):
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, 'w') as saida:
+        json.dump(documento, saida, indent=2, ensure_ascii=False)
+
+
+def carregar(caminho):
+    with open(caminho) as entrada:
+        return json.load(entrada)
+
+
+def comparar(base, atual, tolerancia=0.10):
+    """
+    Compara os mínimos por chamada de dois documentos. Retorna uma lista de
+    (nome, tempo base, tempo atual, variação, situação), com situação
+    'regressão' (mais lento que base * (1 + tolerância)), 'melhora'
+    (mais rápido que base * (1 - tolerância)), 'ok', 'novo' ou 'removido'.
+    """
+    linhas = []
+    nomes = list(base['resultados']) + [n for n in atual['resultados'] if n not in base['resultados']]
+    for nome in nomes:
+        antes = base['resultados'].get(nome, {}).get('min_us')
+        depois = atual['resultados'].get(nome, {}).get('min_us')
+        if antes is None or depois is None:
+            linhas.append((nome, antes, depois, None, 'novo' if antes is None else 'removido'))
+            continue
+        variacao = (depois - antes) / antes if antes else 0.0
+        if variacao > tolerancia:
+            situacao = 'regressão'
+        elif variacao < -tolerancia:
+            situacao = 'melhora'
+        else:
+            situacao = 'ok'
+        linhas.append((nome, antes, depois, variacao, situacao))
+    return linhas
@@ -0,0 +1,145 @@
+# ======================================================================
+# BENCHMARKS REGISTRADOS (ver core/benchmarks/__init__.py)
+# ======================================================================
+# Cada função prepara o cenário com 'linhas' itens e produz o corpo
+# medido. O banco é desfeito no fim de cada benchmark (transação).
+
+import functools
+import os
+import tempfile
+from unittest import mock
+
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from model_mommy import mommy
+
+from core.backups import exportar_queryset
+from core.benchmarks import benchmark
+from core.forms import ContactForm
+from core.models import Cargo, Equipe, Servico, get_file_path
+from core.views import IndexView
+
+CONTATO = {
+    'nome': 'Maria da Silva',
+    'email': 'maria@example.com',
+    'assunto': 'Orçamento',
+    'mensagem': 'Gostaria de um orçamento para um site institucional.',
+}
+LQIP = 'data:image/webp;base64,' + 'A' * 200
+# Tamanho típico do LQIP de 16px (core/images.py).
+
+
+def _equipe(linhas, salvar=False):
+    cargo = mommy.make(Cargo) if salvar else mommy.prepare(Cargo)
+    membros = mommy.prepare(Equipe, _quantity=linhas, cargo=cargo, _save_related=False)
+    for membro in membros:
+        membro.imagem.name, membro.image_width, membro.image_height = 'benchmark.png', 480, 480
+        membro.imagem_lqip = LQIP
+    if salvar:
+        membros = Equipe.objects.bulk_create(membros)
+    return membros
+
+
+def _servicos(linhas, salvar=False):
+    servicos = mommy.prepare(Servico, _quantity=linhas, icone='lni-cog')
+    return Servico.objects.bulk_create(servicos) if salvar else servicos
+
+
+@benchmark('models.get_file_path')
+def nome_de_arquivo(linhas):
+    yield lambda: get_file_path(None, 'foto-do-membro.png')
+
+
+@benchmark('forms.ContactForm.is_valid')
+def formulario_de_contato(linhas):
+    yield lambda: ContactForm(data=CONTATO).is_valid()
+
+
+@benchmark('templates.team.html')
+def template_equipe(linhas):
+    contexto = {'Equipe': _equipe(linhas), 'equipe_proximo': 'cursor'}
+    # Objetos em memória (cargo já carregado): mede só a renderização.
+    yield lambda: render_to_string('team.html', contexto)
+
+
+@benchmark('templates.servicos.html')
+def template_servicos(linhas):
+    contexto = {'servicos': _servicos(linhas), 'servicos_proximo': 'cursor'}
+    yield lambda: render_to_string('servicos.html', contexto)
+
+
+@benchmark('views.IndexView.get_context_data')
+def contexto_da_pagina_inicial(linhas):
+    _servicos(linhas, salvar=True)
+    _equipe(linhas, salvar=True)
+    request = RequestFactory().get('/')
+    request.COOKIES[IndexView.cookie_semente] = '12345'
+
+    def corpo():
+        view = IndexView()
+        view.setup(request)
+        return view.get_context_data()
+    yield corpo
+
+
+@functools.cache
+def _credenciais_gcs():
+    """
+    Credenciais de service account com uma chave RSA gerada na hora (sem
+    rede, sem arquivo): assinar a URL custa o mesmo que em produção.
+    """
+    import rsa
+    from google.auth import crypt
+    from google.oauth2 import service_account
+
+    _, privada = rsa.newkeys(2048)
+    assinador = crypt.RSASigner.from_string(privada.save_pkcs1().decode())
+    return service_account.Credentials(
+        assinador, 'benchmark@fusion.iam.gserviceaccount.com', 'https://oauth2.googleapis.com/token',
+    )
+
+
+def _membro_no_gcs():
+    """
+    Membro da equipe cuja imagem usa o CachedGoogleCloudStorage de
+    produção (URLs assinadas), com o cliente do GCS trocado por um local.
+    Retorna (membro, storage, patch a manter ativo durante a medição).
+    """
+    from google.cloud import storage
+
+    from core.storage import CachedGoogleCloudStorage
+
+    cliente = storage.Client(project='benchmark', credentials=_credenciais_gcs())
+    troca = mock.patch('core.storage.get_client', return_value=cliente)
+    membro = Equipe(imagem='benchmark.png', image_width=480, image_height=480)
+    # Com as dimensões preenchidas, o Django não abre o arquivo para medi-las.
+    membro.imagem.storage = CachedGoogleCloudStorage(bucket_name='benchmark', location='media')
+    return membro, membro.imagem.storage, troca
+
+
+@benchmark('models.Equipe.imagem_480_url (GCS, sem cache)')
+def url_gcs_sem_cache(linhas):
+    membro, storage, troca = _membro_no_gcs()
+
+    def corpo():
+        storage.invalidate(membro.imagem.name)
+        return membro.imagem_480_url()
+    with troca:
+        yield corpo
+
+
+@benchmark('models.Equipe.imagem_480_url (GCS, em cache)')
+def url_gcs_em_cache(linhas):
+    membro, _, troca = _membro_no_gcs()
+    with troca:
+        yield membro.imagem_480_url
+
+
+@benchmark('backups.exportar_queryset (export_data)')
+def serializacao_da_fixture(linhas):
+    membros = _equipe(linhas, salvar=True)
+    queryset = Equipe.objects.filter(pk__gte=min(m.pk for m in membros))
+    # Só as linhas criadas aqui, mesmo num banco de desenvolvimento já populado.
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'equipe.json')
+        yield lambda: exportar_queryset(queryset, caminho)
@@ -0,0 +1,102 @@
+# ======================================================================
+# CACHE LRU EM MEMÓRIA (COMPARTILHADO PELOS MÓDULOS DO APP)
+# ======================================================================
+# Usado pelo cache dos backends de armazenamento (core.storage) e pelo
+# cache de imagens placeholder (core.placeholders). No fim do arquivo, a
+# validação do cache do navegador (If-None-Match) usada pelas views.
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.utils.http import parse_etags
+
+from core import metrics
+
+# Marcador interno para diferenciar "não está no cache" de um valor None/False.
+AUSENTE = object()
+
+
+class LRUCache:
+    """
+    Cache LRU simples, seguro para uso entre threads, com prazo de validade
+    (TTL) opcional por entrada.
+
+    - max_entries: número máximo de entradas; ao ultrapassar, a entrada
+      usada há mais tempo é descartada.
+    - Cada entrada guarda (valor, expira_em). 'expira_em' None = não expira.
+    - nome: se informado, acertos e faltas vão para a métrica
+      fusion_cache_requests_total{cache=nome} (core/metrics.py).
+    """
+
+    def __init__(self, max_entries=1024, nome=None):
+        self.max_entries = max_entries
+        self.nome = nome
+        self._dados = OrderedDict()
+        # OrderedDict mantém a ordem de uso: o fim é o item mais recente.
+        self._lock = threading.Lock()
+        # Workers 'gthread' atendem várias requisições no mesmo processo,
+        # então o acesso ao dicionário precisa ser protegido.
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        valor = self._buscar(key)
+        if self.nome is not None:
+            metrics.cache.inc(cache=self.nome, result='miss' if valor is AUSENTE else 'hit')
+            # Fora do self._lock: a métrica tem a sua própria trava.
+        return default if valor is AUSENTE else valor
+
+    def _buscar(self, key):
+        with self._lock:
+            item = self._dados.get(key, AUSENTE)
+            if item is AUSENTE:
+                self.misses += 1
+                return AUSENTE
+            valor, expira_em = item
+            if expira_em is not None and expira_em <= time.monotonic():
+                # Entrada vencida: remove e conta como falta.
+                del self._dados[key]
+                self.misses += 1
+                return AUSENTE
+            self._dados.move_to_end(key)
+            # Marca como usada recentemente.
+            self.hits += 1
+            return valor
+
+    def set(self, key, valor, ttl=None):
+        expira_em = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._dados[key] = (valor, expira_em)
+            self._dados.move_to_end(key)
+            while len(self._dados) > self.max_entries:
+                self._dados.popitem(last=False)
+                # Remove o item menos usado recentemente (início do dicionário).
+
+    def invalidate(self, predicate):
+        """Remove todas as entradas cuja chave satisfaz 'predicate(chave)'."""
+        with self._lock:
+            for key in [k for k in self._dados if predicate(k)]:
+                del self._dados[key]
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+
+    def __len__(self):
+        return len(self._dados)
+
+
+# ----------------------------------------------------------------------
+# Cache do navegador: If-None-Match
+# ----------------------------------------------------------------------
+def etag_confere(request, etag):
+    """
+    True se o If-None-Match da requisição casa com 'etag' (com aspas): a
+    view pode responder 304. Usado pela PlaceholderView e pela API.
+    """
+    enviados = parse_etags(request.headers.get('If-None-Match', ''))
+    # Lista de ETags separados por vírgula; um ETag que apenas contém o
+    # atual (comparação de texto) não vale.
+    return '*' in enviados or any(e.removeprefix('W/') == etag for e in enviados)
+    # Comparação fraca, como manda a RFC 9110 para If-None-Match.
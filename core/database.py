@@ -0,0 +1,79 @@
+# ======================================================================
+# CONEXÕES COM O BANCO: ESTATÍSTICAS DO POOL E MEDIÇÃO DE LATÊNCIA
+# ======================================================================
+# Com DB_POOL=1 (ver settings.py), o Django usa o pool do psycopg 3
+# (OPTIONS['pool']). Este módulo lê as estatísticas desse pool e mede
+# quanto custa obter uma conexão em cada modo:
+#   - 'sem pool':     abre e fecha uma conexão nova a cada vez (CONN_MAX_AGE=0);
+#   - 'persistente':  reutiliza a conexão aberta, com a verificação de saúde
+#                     (CONN_HEALTH_CHECKS) feita no início de cada requisição;
+#   - 'pool':         pega e devolve uma conexão do pool (requer psycopg 3).
+
+import time
+
+from django.db import connections
+
+
+def estatisticas_pool(alias='default'):
+    """
+    Retorna o dicionário de estatísticas do pool de 'alias'
+    (tamanho, conexões livres, requisições em espera, erros...),
+    ou None se o banco não usa pool.
+    """
+    pool = getattr(connections[alias], 'pool', None)
+    if pool is None:
+        return None
+    return pool.get_stats()
+
+
+def _novo_wrapper(alias, apelido, **ajustes):
+    """
+    Cria uma conexão independente de 'alias' (mesmas configurações, com
+    'ajustes'), sem interferir nas conexões usadas pela aplicação.
+    """
+    base = connections[alias]
+    settings_dict = {**base.settings_dict, **ajustes}
+    settings_dict['OPTIONS'] = {
+        k: v for k, v in base.settings_dict.get('OPTIONS', {}).items() if k != 'pool'
+    }
+    if ajustes.get('OPTIONS'):
+        settings_dict['OPTIONS'].update(ajustes['OPTIONS'])
+    return type(base)(settings_dict, alias=apelido)
+
+
+def medir_aquisicao(alias='default', modo='sem pool', iteracoes=50):
+    """
+    Mede 'iteracoes' aquisições de conexão no 'modo' indicado, cada uma
+    seguida de um 'SELECT 1'. Retorna a lista de latências em segundos.
+    """
+    if modo == 'pool':
+        conexao = _novo_wrapper(
+            alias, f'{alias}__benchmark_pool', CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=True,
+            OPTIONS={'pool': {'min_size': 1, 'max_size': 2}},
+        )
+    else:
+        conexao = _novo_wrapper(
+            alias, f'{alias}__benchmark', CONN_MAX_AGE=None if modo == 'persistente' else 0,
+            CONN_HEALTH_CHECKS=modo == 'persistente',
+        )
+
+    latencias = []
+    try:
+        for _ in range(iteracoes + 1):
+            inicio = time.perf_counter()
+            if modo == 'persistente':
+                conexao.close_if_unusable_or_obsolete()
+                # O que o Django faz no início de cada requisição.
+            conexao.ensure_connection()
+            with conexao.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            latencias.append(time.perf_counter() - inicio)
+            if modo != 'persistente':
+                conexao.close()
+                # Sem pool, fecha de verdade; com pool, devolve a conexão ao pool.
+    finally:
+        conexao.close()
+        if modo == 'pool':
+            conexao.close_pool()
+    return latencias[1:]
+    # A primeira medida (abertura do pool ou da conexão persistente) é descartada.
@@ -0,0 +1,91 @@
+# ======================================================================
+# PLANOS DE EXECUÇÃO (EXPLAIN) DAS CONSULTAS DE UMA PÁGINA
+# ======================================================================
+# Ferramenta usada pelos testes de índices (core/tests/test_indices.py):
+# executa uma função (ex: um GET na página inicial), captura todas as
+# consultas SQL feitas e pede ao banco o plano de execução de cada uma.
+# Assim um teste pode falhar quando uma consulta volta a varrer a tabela
+# inteira ("Seq Scan") ou deixa de usar um índice específico.
+#
+# Suporta PostgreSQL (EXPLAIN em JSON) e SQLite (EXPLAIN QUERY PLAN). No
+# SQLite, todo "SCAN" de tabela vira 'Seq Scan', mesmo quando ele segue a
+# chave primária e para cedo por causa de um LIMIT: pelo texto do plano não
+# dá para distinguir os dois casos.
+
+import json
+import re
+from dataclasses import dataclass, field
+
+from django.db import connection as conexao_padrao
+from django.test.utils import CaptureQueriesContext
+
+
+@dataclass
+class Plano:
+    sql: str
+    nos: list = field(default_factory=list)
+    # Lista de (tipo, tabela, indice), ex: ('Seq Scan', 'core_servico', None).
+
+    def varreduras_sequenciais(self, tabelas):
+        """Tabelas de 'tabelas' lidas por inteiro neste plano."""
+        return [tabela for tipo, tabela, _ in self.nos if tipo == 'Seq Scan' and tabela in tabelas]
+
+    def indices(self, tabela):
+        """Índices usados para ler 'tabela' neste plano (None = sem índice nomeado)."""
+        return [indice for _, nome, indice in self.nos if nome == tabela]
+
+
+def _nos_postgresql(no):
+    # Percorre a árvore do plano em JSON (campo "Plans" = nós filhos).
+    yield no.get('Node Type'), no.get('Relation Name'), no.get('Index Name')
+    for filho in no.get('Plans', []):
+        yield from _nos_postgresql(filho)
+
+
+_SQLITE = re.compile(r'^(SCAN|SEARCH) (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+)| USING (?:INTEGER )?PRIMARY KEY)?')
+
+
+def explicar(sql, conexao=conexao_padrao):
+    """Retorna o Plano de uma consulta SELECT."""
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+            bruto = cursor.fetchone()[0]
+            bruto = json.loads(bruto) if isinstance(bruto, str) else bruto
+            return Plano(sql, list(_nos_postgresql(bruto[0]['Plan'])))
+        if conexao.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            nos = []
+            for linha in cursor.fetchall():
+                encontrado = _SQLITE.match(linha[-1])
+                if not encontrado:
+                    continue
+                operacao, tabela, indice = encontrado.groups()
+                usa_indice = operacao == 'SEARCH' or 'USING' in linha[-1]
+                nos.append(('Index Scan' if usa_indice else 'Seq Scan', tabela, indice))
+            return Plano(sql, nos)
+    raise NotImplementedError(f'EXPLAIN não suportado para {conexao.vendor}.')
+
+
+def atualizar_estatisticas(tabelas, conexao=conexao_padrao):
+    """Executa ANALYZE para o planejador conhecer o volume real de dados."""
+    with conexao.cursor() as cursor:
+        for tabela in tabelas:
+            cursor.execute(f'ANALYZE {conexao.ops.quote_name(tabela)}')
+
+
+def capturar_planos(funcao, conexao=conexao_padrao, filtro=None):
+    """
+    Executa funcao(), captura as consultas SELECT feitas em 'conexao' e
+    retorna o Plano de cada uma. 'filtro(sql)' permite escolher as consultas.
+    """
+    with CaptureQueriesContext(conexao) as capturadas:
+        funcao()
+    planos = []
+    for consulta in capturadas.captured_queries:
+        sql = consulta['sql']
+        if not sql.lstrip().upper().startswith('SELECT'):
+            continue
+        if filtro is None or filtro(sql):
+            planos.append(explicar(sql, conexao))
+    return planos
@@ -11,6 +11,11 @@ from django.core.mail.message import EmailMessage
 # Com ela podemos configurar assunto, corpo, remetente, destinatários e cabeçalhos,
 # e depois enviá-lo através do backend de e-mail definido no `settings.py` (SMTP, console, file, etc.).
 
+import time
+
+from core import metrics
+# Usados para medir a duração do envio do e-mail (métrica fusion_email_send_duration_seconds).
+
 # ==============================
 # DEFINIÇÃO DO FORMULÁRIO
 # ==============================
@@ -105,7 +110,14 @@ class ContactForm(forms.Form):
         )
         # A variável `mail` agora contém um objeto `EmailMessage` pronto para ser enviado.
 
-        mail.send()
+        inicio = time.perf_counter()
+        resultado = 'erro'
+        try:
+            mail.send()
+            resultado = 'enviado'
+        finally:
+            metrics.email.observar(time.perf_counter() - inicio, result=resultado)
+            # Registra a duração mesmo quando o servidor SMTP falha (result="erro").
         # Chama o metodo `send()` do objeto `EmailMessage`.
         # Este metodo interage com o backend de envio de e-mail configurado no Django (`EMAIL_BACKEND`).
         # Pode ser SMTP (para envio real), console (apenas exibe no terminal) ou file (salva em arquivos).
@@ -0,0 +1,59 @@
+# ======================================================================
+# CREDENCIAIS E CLIENTE DO GOOGLE CLOUD STORAGE (CARREGAMENTO PREGUIÇOSO)
+# ======================================================================
+# As bibliotecas google-auth e google-cloud-storage são pesadas para
+# importar, e ler o JSON da service account custa acesso a disco e parsing
+# da chave RSA. Este módulo adia tudo isso até o primeiro uso real do GCS
+# e reaproveita o resultado no restante da vida do processo.
+#
+# Após um fork (ex: gunicorn com preload_app), o processo filho cria o seu
+# próprio cliente: conexões HTTP não devem ser compartilhadas entre processos.
+
+import os
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+_lock = threading.Lock()
+_cache = {}
+# Guarda 'pid', 'credentials' e 'client' do processo atual.
+
+
+def _do_processo():
+    # Descarta o que foi criado por outro processo (antes de um fork).
+    if _cache.get('pid') != os.getpid():
+        _cache.clear()
+        _cache['pid'] = os.getpid()
+    return _cache
+
+
+def get_credentials():
+    """
+    Retorna as credenciais da service account lidas de GS_CREDENTIALS_FILE.
+    - Se settings.GS_CREDENTIALS já estiver preenchido, usa esse objeto.
+    - Levanta ImproperlyConfigured se o arquivo não existir.
+    """
+    if settings.GS_CREDENTIALS is not None:
+        return settings.GS_CREDENTIALS
+    with _lock:
+        cache = _do_processo()
+        if 'credentials' not in cache:
+            caminho = settings.GS_CREDENTIALS_FILE
+            if not os.path.exists(caminho):
+                raise ImproperlyConfigured(f"O arquivo {caminho} não existe!")
+            from google.oauth2 import service_account
+            # Importado aqui, e não no topo, para não pesar no boot do Django.
+            cache['credentials'] = service_account.Credentials.from_service_account_file(caminho)
+        return cache['credentials']
+
+
+def get_client():
+    """Retorna o cliente do GCS compartilhado por todo o processo."""
+    credentials = get_credentials()
+    with _lock:
+        cache = _do_processo()
+        if 'client' not in cache:
+            from google.cloud import storage
+            cache['client'] = storage.Client(credentials=credentials, project=credentials.project_id)
+        return cache['client']
@@ -0,0 +1,40 @@
+# ======================================================================
+# FUNÇÕES AUXILIARES PARA IMAGENS
+# ======================================================================
+
+import base64
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+LQIP_LARGURA = 16
+# Largura máxima (em pixels) do placeholder de baixa qualidade (LQIP).
+# 16px já são suficientes para um fundo desfocado e geram ~200 bytes em WEBP.
+
+
+def gerar_lqip(arquivo, largura=LQIP_LARGURA):
+    """
+    Gera um LQIP (Low Quality Image Placeholder) a partir de uma imagem.
+
+    Recebe:
+      - arquivo: objeto de arquivo (ou caminho) aceito por PIL.Image.open.
+      - largura: tamanho máximo do lado maior da miniatura.
+    Retorna:
+      - Uma data URI 'data:image/webp;base64,...' pronta para ser usada
+        diretamente em CSS (background-image) ou em <img src>.
+    """
+    if hasattr(arquivo, 'seek'):
+        arquivo.seek(0)
+    with Image.open(arquivo) as img:
+        img = ImageOps.exif_transpose(img)
+        # Respeita a orientação gravada pela câmera (EXIF).
+        img.thumbnail((largura, largura))
+        # Reduz mantendo a proporção original.
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+        buffer = BytesIO()
+        img.save(buffer, 'WEBP', quality=40)
+    if hasattr(arquivo, 'seek'):
+        arquivo.seek(0)
+        # Devolve o ponteiro ao início para o upload real do arquivo.
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
@@ -0,0 +1,176 @@
+# ======================================================================
+# LOGGING ESTRUTURADO (JSON) SEM BLOQUEAR A REQUISIÇÃO
+# ======================================================================
+# Configurado em settings.LOGGING. O caminho de um registro de log:
+#   1. na thread da requisição, os filtros (baratos) acrescentam o id da
+#      requisição e descartam parte dos registros DEBUG (amostragem);
+#   2. FilaHandler coloca o registro numa fila em memória, de tamanho
+#      limitado, e retorna: nenhuma escrita em disco/console na requisição.
+#      Fila cheia → o registro é descartado (e contado), nunca espera;
+#   3. uma thread do próprio processo (QueueListener) tira os registros da
+#      fila e os escreve, uma linha JSON por registro, no destino final.
+#
+# Com preload_app o logging é configurado no processo mestre do gunicorn,
+# e threads não sobrevivem ao fork: cada worker recria a fila e a thread
+# (os.register_at_fork) ao nascer.
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+# Atributos que todo LogRecord tem; os demais vieram de extra={...}.
+
+
+# ----------------------------------------------------------------------
+# Id da requisição
+# ----------------------------------------------------------------------
+_ID_VALIDO = re.compile(r'^[A-Za-z0-9._-]{8,64}$')
+
+
+def request_id_atual():
+    return _request_id.get()
+
+
+def iniciar_request_id(recebido=None):
+    """
+    Define o id da requisição atual: o recebido do proxy (se tiver formato
+    válido) ou um novo. Retorna (id, token para encerrar_request_id()).
+    """
+    valor = recebido if recebido and _ID_VALIDO.match(recebido) else uuid.uuid4().hex
+    return valor, _request_id.set(valor)
+
+
+def encerrar_request_id(token):
+    _request_id.reset(token)
+
+
+class FiltroRequestId(logging.Filter):
+    """Acrescenta record.request_id (None fora de uma requisição)."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class FiltroAmostragem(logging.Filter):
+    """
+    Mantém só uma fração ('taxa', de 0 a 1) dos registros de nível até
+    'nivel' (padrão DEBUG); os demais níveis passam sempre.
+    """
+
+    def __init__(self, taxa=1.0, nivel='DEBUG'):
+        super().__init__()
+        self.taxa = float(taxa)
+        self.nivel = logging.getLevelName(nivel) if isinstance(nivel, str) else nivel
+
+    def filter(self, record):
+        return record.levelno > self.nivel or random.random() < self.taxa
+
+
+# ----------------------------------------------------------------------
+# Formato JSON
+# ----------------------------------------------------------------------
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro, com os campos de extra={...} no topo."""
+
+    def format(self, record):
+        dados = {
+            'quando': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created))
+                      + f'.{int(record.msecs):03d}',
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+            'pid': record.process,
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO:
+                dados[chave] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados['excecao'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+# ----------------------------------------------------------------------
+# Fila limitada + thread de escrita
+# ----------------------------------------------------------------------
+class FilaHandler(QueueHandler):
+    """
+    QueueHandler com fila limitada (tamanho) que descarta em vez de
+    bloquear, e com o seu próprio QueueListener por processo.
+
+    - destino: handler que faz a escrita de verdade (padrão: StreamHandler
+      em 'stream' com FormatadorJSON).
+    - A cada registro aceito depois de descartes, um aviso com a quantidade
+      descartada entra na fila antes dele.
+    """
+
+    def __init__(self, destino=None, stream=None, tamanho=10000):
+        if destino is None:
+            destino = logging.StreamHandler(stream or sys.stdout)
+            destino.setFormatter(FormatadorJSON())
+        self.destino = destino
+        self.tamanho = tamanho
+        self.descartados = 0
+        self._lock_descartes = threading.Lock()
+        super().__init__(queue.Queue(maxsize=tamanho))
+        self._iniciar()
+        os.register_at_fork(after_in_child=self._iniciar)
+        atexit.register(self.parar)
+
+    def _iniciar(self):
+        self.queue = queue.Queue(maxsize=self.tamanho)
+        # Nova fila também no filho: a do pai pode ter ficado com a trava
+        # presa por uma thread que não existe mais após o fork.
+        self.listener = QueueListener(self.queue, self.destino, respect_handler_level=True)
+        self.listener.start()
+
+    def parar(self):
+        """Escreve o que restou na fila e encerra a thread (fim do processo)."""
+        listener, self.listener = self.listener, None
+        if listener is not None and listener._thread is not None:
+            listener.stop()
+
+    def emit(self, record):
+        # Como QueueHandler.prepare(): a mensagem vai pronta (sem args, que
+        # podem não ser seguros para outra thread), mas o traceback fica em
+        # exc_text, para o FormatadorJSON gravá-lo no campo 'excecao'.
+        try:
+            record = copy.copy(record)
+            if record.exc_info and not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.msg, record.args, record.exc_info = record.getMessage(), None, None
+            self.enqueue(record)
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record):
+        try:
+            with self._lock_descartes:
+                if self.descartados:
+                    aviso = logging.LogRecord(
+                        __name__, logging.WARNING, __file__, 0,
+                        '%d registro(s) de log descartado(s): fila cheia.', (self.descartados,), None,
+                    )
+                    self.queue.put_nowait(aviso)
+                    self.descartados = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_descartes:
+                self.descartados += 1
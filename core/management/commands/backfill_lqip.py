@@ -0,0 +1,59 @@
+# ======================================================================
+# COMANDO backfill_lqip — GERA OS PLACEHOLDERS (LQIP) DAS IMAGENS ANTIGAS
+# ======================================================================
+# Novos uploads já recebem o LQIP em Equipe.save(). Este comando preenche
+# o campo 'imagem_lqip' dos registros criados antes dele existir.
+#
+# Uso:
+#   python manage.py backfill_lqip            # apenas registros sem LQIP
+#   python manage.py backfill_lqip --force    # recalcula todos
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.images import gerar_lqip
+from core.models import Equipe
+
+
+class Command(BaseCommand):
+    help = 'Gera o placeholder de baixa qualidade (LQIP) das imagens de Equipe que ainda não o possuem.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Recalcula o LQIP mesmo dos registros que já o possuem.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Quantidade de registros gravados por bulk_update (padrão: 100).',
+        )
+
+    def handle(self, *args, **options):
+        consulta = Equipe.objects.exclude(imagem='').only('imagem', 'imagem_lqip')
+        if not options['force']:
+            consulta = consulta.filter(imagem_lqip='')
+
+        pendentes = []
+        atualizados = 0
+        falhas = 0
+        for membro in consulta.iterator(chunk_size=options['batch_size']):
+            try:
+                with membro.imagem.open('rb') as arquivo:
+                    membro.imagem_lqip = gerar_lqip(arquivo)
+                membro.modificado = timezone.now()
+                # bulk_update não aplica o auto_now: sem isso, o backup
+                # incremental ('export_data --incremental') não veria a mudança.
+            except (OSError, ValueError) as erro:
+                falhas += 1
+                self.stdout.write(self.style.WARNING(f'{membro.imagem.name}: {erro}'))
+                continue
+            pendentes.append(membro)
+            if len(pendentes) >= options['batch_size']:
+                atualizados += Equipe.objects.bulk_update(pendentes, ['imagem_lqip', 'modificado'])
+                pendentes = []
+        if pendentes:
+            atualizados += Equipe.objects.bulk_update(pendentes, ['imagem_lqip', 'modificado'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'LQIP gerado para {atualizados} registro(s); {falhas} falha(s).'
+        ))
@@ -0,0 +1,79 @@
+# ======================================================================
+# COMANDO benchmark_api — VAZÃO DA API JSON
+# ======================================================================
+# Percorre todas as páginas de cada endpoint da API (core/api.py), dentro
+# do próprio processo (django.test.Client, sem rede), e mede:
+#   - requisições, linhas e megabytes por segundo;
+#   - pico de memória alocada durante uma requisição (tracemalloc), que
+#     deve ficar estável com o aumento de --limite graças ao streaming.
+#
+# Uso:
+#   python manage.py benchmark_api
+#   python manage.py benchmark_api --limite 500 --iterations 5 --campos id,nome
+
+import json
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+ENDPOINTS = ['api_servicos', 'api_equipe', 'api_cargos']
+
+
+class Command(BaseCommand):
+    help = 'Mede a vazão (requisições, linhas e MB por segundo) da API JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=3, help='Vezes que cada endpoint é percorrido (padrão: 3).')
+        parser.add_argument('--limite', type=int, default=50, help='Itens por página (padrão: 50).')
+        parser.add_argument('--campos', default='', help='Campos pedidos (padrão: todos).')
+
+    def percorrer(self, cliente, url, medir_memoria=False):
+        """Pede todas as páginas; retorna (requisições, linhas, bytes, segundos, pico de memória em bytes)."""
+        requisicoes = linhas = total_bytes = pico = 0
+        segundos = 0.0
+        while url:
+            if medir_memoria:
+                tracemalloc.start()
+            inicio = time.perf_counter()
+            response = cliente.get(url, secure=not settings.DEBUG)
+            corpo = b''.join(response.streaming_content) if response.streaming else response.content
+            segundos += time.perf_counter() - inicio
+            if medir_memoria:
+                pico = max(pico, tracemalloc.get_traced_memory()[1] - len(corpo))
+                tracemalloc.stop()
+                # Desconta o corpo montado aqui pelo próprio benchmark.
+            if response.status_code != 200:
+                raise RuntimeError(f'{url}: HTTP {response.status_code}')
+            dados = json.loads(corpo)
+            requisicoes += 1
+            linhas += len(dados['resultados'])
+            total_bytes += len(corpo)
+            url = dados['proximo']
+        return requisicoes, linhas, total_bytes, segundos, pico
+
+    def handle(self, *args, **options):
+        cliente = Client()
+        parametros = f"?limite={options['limite']}"
+        if options['campos']:
+            parametros += f"&campos={options['campos']}"
+
+        self.stdout.write(f"{'Endpoint':<16}{'linhas':>8}{'req/s':>10}{'linhas/s':>12}{'MB/s':>8}{'pico':>11}")
+        for nome in ENDPOINTS:
+            url = reverse(nome) + parametros
+            _, linhas, _, _, pico = self.percorrer(cliente, url, medir_memoria=True)
+            # Primeira passada: aquece conexões e caches e mede a memória.
+            requisicoes = total_bytes = 0
+            segundos = 0.0
+            for _ in range(options['iterations']):
+                r, _, b, s, _ = self.percorrer(cliente, url)
+                requisicoes, total_bytes, segundos = requisicoes + r, total_bytes + b, segundos + s
+            segundos = segundos or 1e-9
+            self.stdout.write(
+                f'{nome:<16}{linhas:>8}{requisicoes / segundos:>10.1f}'
+                f'{linhas * options["iterations"] / segundos:>12.0f}'
+                f'{total_bytes / segundos / 1024 / 1024:>8.2f}{pico / 1024:>9.0f}KB'
+            )
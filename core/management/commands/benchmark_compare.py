@@ -0,0 +1,71 @@
+# ======================================================================
+# COMANDO benchmark_compare — COMPARA COM A LINHA DE BASE
+# ======================================================================
+# Compara o tempo (mínimo por chamada) de cada micro-benchmark com uma
+# linha de base gravada por 'benchmark_suite --salvar'. Sem o segundo
+# arquivo, roda a suíte agora (com o mesmo --linhas da linha de base). Termina com erro (código 1) se
+# algum benchmark ficou mais lento que a tolerância: pode ser usado no CI,
+# desde que a linha de base tenha sido gravada na mesma máquina.
+#
+# Uso:
+#   python manage.py benchmark_compare                          (BENCHMARK_DIR/baseline.json x agora)
+#   python manage.py benchmark_compare antes.json depois.json --tolerancia 0.2
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmarks
+from core.management.commands.benchmark_suite import formatar_tempo
+
+
+class Command(BaseCommand):
+    help = 'Compara os micro-benchmarks com uma linha de base e aponta regressões.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('base', nargs='?', help='Linha de base (padrão: BENCHMARK_DIR/baseline.json).')
+        parser.add_argument('atual', nargs='?', help='Resultado a comparar (padrão: roda a suíte agora).')
+        parser.add_argument('--tolerancia', type=float, default=0.10, help='Piora aceita, em fração (padrão: 0.10 = 10%%).')
+        parser.add_argument('--filtro', default='', help='Ao rodar agora, só os benchmarks cujo nome contém o texto.')
+        parser.add_argument('--rodadas', type=int, default=7, help='Ao rodar agora, rodadas por benchmark (padrão: 7).')
+        parser.add_argument('--tempo-minimo', type=float, default=0.2, help='Ao rodar agora, duração mínima de cada rodada.')
+
+    def handle(self, *args, **options):
+        caminho_base = options['base'] or os.path.join(benchmarks.pasta(), 'baseline.json')
+        try:
+            base = benchmarks.carregar(caminho_base)
+        except FileNotFoundError:
+            raise CommandError(f'{caminho_base} não existe: grave uma com "benchmark_suite --salvar".')
+
+        if options['atual']:
+            atual = benchmarks.carregar(options['atual'])
+        else:
+            atual = benchmarks.executar(
+                linhas=base['metadados']['linhas'], filtro=options['filtro'],
+                rodadas=options['rodadas'], tempo_minimo=options['tempo_minimo'],
+            )
+            base['resultados'] = {n: r for n, r in base['resultados'].items() if options['filtro'] in n}
+
+        for chave in ('maquina', 'python', 'django', 'banco', 'linhas'):
+            if base['metadados'].get(chave) != atual['metadados'].get(chave):
+                self.stdout.write(self.style.WARNING(
+                    f"Atenção: '{chave}' difere ({base['metadados'].get(chave)} → {atual['metadados'].get(chave)}); "
+                    'a comparação pode não ser justa.'
+                ))
+
+        comparacao = benchmarks.comparar(base, atual, options['tolerancia'])
+        self.stdout.write(f"{'Benchmark':<52}{'base':>12}{'atual':>12}{'variação':>10}  situação")
+        for nome, antes, depois, variacao, situacao in comparacao:
+            linha = (
+                f"{nome:<52}{formatar_tempo(antes) if antes is not None else '-':>12}"
+                f"{formatar_tempo(depois) if depois is not None else '-':>12}"
+                f"{f'{variacao:+.1%}' if variacao is not None else '-':>10}  {situacao}"
+            )
+            estilo = {'regressão': self.style.ERROR, 'melhora': self.style.SUCCESS}.get(situacao)
+            self.stdout.write(estilo(linha) if estilo else linha)
+
+        regressoes = [nome for nome, *_, situacao in comparacao if situacao == 'regressão']
+        if regressoes:
+            raise CommandError(
+                f"{len(regressoes)} regressão(ões) acima de {options['tolerancia']:.0%}: {', '.join(regressoes)}"
+            )
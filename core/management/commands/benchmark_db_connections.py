@@ -0,0 +1,55 @@
+# ======================================================================
+# COMANDO benchmark_db_connections — LATÊNCIA PARA OBTER UMA CONEXÃO
+# ======================================================================
+# Compara o custo de obter uma conexão com o banco (e executar 'SELECT 1')
+# sem pool, com conexão persistente + verificação de saúde e com o pool do
+# psycopg 3. No PostgreSQL do Render, abrir uma conexão nova inclui o
+# handshake TCP + SSL + autenticação, que costuma custar dezenas de ms.
+#
+# Uso:
+#   python manage.py benchmark_db_connections
+#   python manage.py benchmark_db_connections --iterations 200 --database default
+
+import statistics
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.database import estatisticas_pool, medir_aquisicao
+from core.timing import percentil
+
+MODOS = ['sem pool', 'persistente', 'pool']
+
+
+class Command(BaseCommand):
+    help = 'Mede a latência para obter uma conexão com o banco, com e sem pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Aquisições medidas por modo (padrão: 50).')
+        parser.add_argument('--database', default='default', help='Alias do banco (padrão: default).')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        self.stdout.write(f"{'Modo':<14}{'média':>10}{'p50':>10}{'p95':>10}{'máx':>10}")
+        for modo in MODOS:
+            if modo == 'pool' and connections[alias].vendor != 'postgresql':
+                self.stdout.write(f'{modo:<14}indisponível (apenas PostgreSQL com psycopg 3)')
+                continue
+            try:
+                latencias = medir_aquisicao(alias, modo, options['iterations'])
+            except Exception as erro:
+                self.stdout.write(f'{modo:<14}indisponível ({erro.__class__.__name__}: {erro})')
+                # Ex: psycopg 3 / psycopg_pool não instalados.
+                continue
+            ms = [x * 1000 for x in latencias]
+            self.stdout.write(
+                f'{modo:<14}{statistics.mean(ms):>8.2f}ms{percentil(ms, 50):>8.2f}ms'
+                f'{percentil(ms, 95):>8.2f}ms{max(ms):>8.2f}ms'
+            )
+
+        estatisticas = estatisticas_pool(alias)
+        if estatisticas is not None:
+            self.stdout.write('')
+            self.stdout.write('Pool da aplicação (este processo):')
+            for chave, valor in sorted(estatisticas.items()):
+                self.stdout.write(f'  {chave}: {valor}')
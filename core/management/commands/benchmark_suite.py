@@ -0,0 +1,61 @@
+# ======================================================================
+# COMANDO benchmark_suite — MICRO-BENCHMARKS DOS CAMINHOS QUENTES
+# ======================================================================
+# Roda os benchmarks de core/benchmarks e mostra a mediana, o mínimo e o
+# desvio por chamada. Com --salvar, grava o resultado como linha de base
+# (JSON) para o comando 'benchmark_compare'.
+#
+# Uso:
+#   python manage.py benchmark_suite
+#   python manage.py benchmark_suite --salvar                 (BENCHMARK_DIR/baseline.json)
+#   python manage.py benchmark_suite --salvar antes.json --linhas 200 --filtro templates
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmarks
+
+
+def formatar_tempo(microssegundos):
+    if microssegundos >= 1000:
+        return f'{microssegundos / 1000:.2f}ms'
+    return f'{microssegundos:.2f}µs'
+
+
+class Command(BaseCommand):
+    help = 'Roda os micro-benchmarks (core/benchmarks) e, opcionalmente, grava a linha de base.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=50, help='Itens nos cenários com dados (padrão: 50).')
+        parser.add_argument('--filtro', default='', help='Roda só os benchmarks cujo nome contém o texto.')
+        parser.add_argument('--rodadas', type=int, default=7, help='Rodadas por benchmark (padrão: 7).')
+        parser.add_argument('--tempo-minimo', type=float, default=0.2, help='Duração mínima de cada rodada, em segundos (padrão: 0.2).')
+        parser.add_argument(
+            '--salvar', nargs='?', const='', default=None, metavar='ARQUIVO',
+            help='Grava o resultado em JSON (padrão: BENCHMARK_DIR/baseline.json).',
+        )
+
+    def handle(self, *args, **options):
+        if options['linhas'] < 1 or options['rodadas'] < 1:
+            raise CommandError('--linhas e --rodadas devem ser >= 1.')
+
+        self.stdout.write(f"{'Benchmark':<52}{'mediana':>12}{'mínimo':>12}{'desvio':>12}")
+
+        def mostrar(nome, medicao):
+            self.stdout.write(
+                f"{nome:<52}{formatar_tempo(medicao['mediana_us']):>12}"
+                f"{formatar_tempo(medicao['min_us']):>12}{formatar_tempo(medicao['desvio_us']):>12}"
+            )
+
+        documento = benchmarks.executar(
+            linhas=options['linhas'], filtro=options['filtro'], rodadas=options['rodadas'],
+            tempo_minimo=options['tempo_minimo'], ao_concluir=mostrar,
+        )
+        if not documento['resultados']:
+            raise CommandError(f"Nenhum benchmark com '{options['filtro']}' no nome.")
+
+        if options['salvar'] is not None:
+            caminho = options['salvar'] or os.path.join(benchmarks.pasta(), 'baseline.json')
+            benchmarks.salvar(documento, caminho)
+            self.stdout.write(self.style.SUCCESS(f'Linha de base gravada em {caminho}'))
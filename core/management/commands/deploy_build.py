@@ -0,0 +1,193 @@
+# ======================================================================
+# COMANDO deploy_build — ORQUESTRA AS ETAPAS DO DEPLOY COM "IMPRESSÃO DIGITAL"
+# ======================================================================
+# Substitui a sequência fixa do build.sh (migrate, collectstatic, carga das
+# fixtures, upload_media). Para cada etapa é calculada uma impressão digital
+# (fingerprint, SHA-256) das suas entradas:
+#   - migrate:          arquivos de migração de todos os apps;
+#   - collectstatic:    conteúdo de todos os arquivos estáticos;
+#   - import_snapshot:  conteúdo das fixtures backup_*.json;
+#   - upload_media:     índice da pasta 'media' (caminho + conteúdo).
+# Se a impressão digital for igual à do último deploy bem-sucedido, a etapa
+# é pulada. As impressões digitais ficam no banco (modelo EtapaDeploy), pois
+# cada build do Render começa de um checkout novo, sem arquivos do anterior.
+# As etapas independentes (arquivos estáticos, mídia e fixtures)
+# rodam em paralelo depois do migrate. No final é exibido o tempo de cada etapa.
+#
+# Uso:
+#   python manage.py deploy_build
+#   python manage.py deploy_build --force            # executa tudo
+#   python manage.py deploy_build --only migrate     # apenas uma etapa
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.db.migrations.executor import MigrationExecutor
+
+from core.management.commands.import_snapshot import ARQUIVOS_PADRAO
+from core.models import EtapaDeploy
+
+
+# ----------------------------------------------------------------------
+# Impressões digitais das entradas de cada etapa
+# ----------------------------------------------------------------------
+def _hash_arquivos(pares):
+    """
+    Calcula um SHA-256 único para uma sequência de (nome, caminho absoluto).
+    A ordem é normalizada, então o resultado não depende da listagem.
+    """
+    resumo = hashlib.sha256()
+    for nome, caminho in sorted(pares):
+        resumo.update(nome.encode('utf-8') + b'\0')
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+                resumo.update(bloco)
+        resumo.update(b'\0')
+    return resumo.hexdigest()
+
+
+def fingerprint_migracoes():
+    pares = []
+    for app in apps.get_app_configs():
+        pasta = os.path.join(app.path, 'migrations')
+        if os.path.isdir(pasta):
+            for nome in os.listdir(pasta):
+                if nome.endswith('.py'):
+                    pares.append((f'{app.label}/{nome}', os.path.join(pasta, nome)))
+    return _hash_arquivos(pares)
+
+
+def fingerprint_estaticos():
+    pares = []
+    for finder in finders.get_finders():
+        for caminho, storage in finder.list(['CVS', '.*', '*~']):
+            pares.append((caminho, storage.path(caminho)))
+    return _hash_arquivos(pares)
+
+
+def fingerprint_fixtures():
+    return _hash_arquivos((nome, os.path.abspath(nome)) for nome in ARQUIVOS_PADRAO if os.path.exists(nome))
+
+
+def fingerprint_media():
+    pasta = os.path.join(os.getcwd(), 'media')
+    pares = []
+    for root, _, files in os.walk(pasta):
+        for nome in files:
+            caminho = os.path.join(root, nome)
+            pares.append((os.path.relpath(caminho, pasta), caminho))
+    return _hash_arquivos(pares)
+
+
+def migracoes_pendentes():
+    """True se o banco ainda tem migrações a aplicar (mesmo com arquivos iguais)."""
+    executor = MigrationExecutor(connection)
+    return bool(executor.migration_plan(executor.loader.graph.leaf_nodes()))
+
+
+# ----------------------------------------------------------------------
+# Definição das etapas
+# ----------------------------------------------------------------------
+ETAPAS = [
+    # (nome, argumentos do call_command, função de fingerprint, grupo)
+    # Etapas do mesmo grupo rodam em paralelo; os grupos rodam em ordem.
+    ('migrate', ['migrate', '--noinput'], fingerprint_migracoes, 1),
+    ('collectstatic', ['collectstatic', '--noinput'], fingerprint_estaticos, 2),
+    ('upload_media', ['upload_media'], fingerprint_media, 2),
+    ('import_snapshot', ['import_snapshot', *ARQUIVOS_PADRAO], fingerprint_fixtures, 2),
+]
+
+
+class Command(BaseCommand):
+    help = 'Executa as etapas do deploy, pulando as que não tiveram entradas alteradas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Executa todas as etapas, ignorando as impressões digitais.')
+        parser.add_argument(
+            '--only', action='append', choices=[e[0] for e in ETAPAS],
+            help='Executa apenas a etapa indicada (pode ser repetido).',
+        )
+
+    # ------------------------------------------------------------------
+    # Estado salvo entre deploys
+    # ------------------------------------------------------------------
+    def ler_estado(self):
+        try:
+            return dict(EtapaDeploy.objects.values_list('nome', 'fingerprint'))
+        except DatabaseError:
+            return {}
+            # Primeiro deploy (tabela ainda não criada pelo migrate): todas as etapas rodam.
+
+    def gravar_estado(self, estado):
+        for nome, fingerprint in estado.items():
+            EtapaDeploy.objects.update_or_create(nome=nome, defaults={'fingerprint': fingerprint})
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    def executar(self, nome, argumentos, fingerprint, anterior, forcar):
+        """
+        Executa uma etapa (se necessário) e retorna
+        (nome, situação, segundos, fingerprint, saída do comando).
+        """
+        inicio = time.perf_counter()
+        try:
+            atual = fingerprint()
+            precisa = forcar or atual != anterior or (nome == 'migrate' and migracoes_pendentes())
+            if not precisa:
+                return nome, 'pulada', time.perf_counter() - inicio, atual, ''
+            saida = StringIO()
+            call_command(*argumentos, stdout=saida)
+            # A saída é capturada para não misturar as mensagens das threads.
+            return nome, 'executada', time.perf_counter() - inicio, atual, saida.getvalue()
+        finally:
+            if not connection.in_atomic_block:
+                connection.close()
+                # Cada thread tem a sua conexão; fecha ao terminar a etapa.
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        estado = self.ler_estado()
+        etapas = [e for e in ETAPAS if not options['only'] or e[0] in options['only']]
+        relatorio = []
+
+        concluidas = {}
+        # Só as etapas deste deploy são gravadas (as demais mantêm o valor anterior).
+        for grupo in sorted({e[3] for e in etapas}):
+            do_grupo = [e for e in etapas if e[3] == grupo]
+            with ThreadPoolExecutor(max_workers=len(do_grupo)) as executor:
+                futuros = [
+                    executor.submit(self.executar, nome, argumentos, fingerprint, estado.get(nome), options['force'])
+                    for nome, argumentos, fingerprint, _ in do_grupo
+                ]
+                erros = []
+                for futuro in futuros:
+                    try:
+                        nome, situacao, segundos, atual, saida = futuro.result()
+                    except Exception as erro:
+                        erros.append(erro)
+                        continue
+                    if saida:
+                        self.stdout.write(saida.rstrip())
+                    concluidas[nome] = atual
+                    relatorio.append((nome, situacao, segundos))
+            self.gravar_estado(concluidas)
+            # Grava após cada grupo: as etapas concluídas não repetem se o
+            # deploy falhar mais adiante.
+            if erros:
+                raise CommandError(f'Falha no deploy: {erros[0]}') from erros[0]
+
+        self.stdout.write('')
+        self.stdout.write('Etapa               Situação    Tempo')
+        for nome, situacao, segundos in relatorio:
+            self.stdout.write(f'{nome:<20}{situacao:<12}{segundos:6.2f}s')
+        total = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(f'Build concluído em {total:.2f}s.'))
@@ -2,13 +2,30 @@
 # Comandos customizados permitem criar scripts que você pode executar via "python manage.py nome_do_comando"
 from django.core.management.base import BaseCommand
 
-# Importa os serializadores do Django, que permitem transformar objetos de banco em JSON ou outros formatos
-# É essencial para gerar backups compatíveis com fixtures do Django
-from django.core import serializers
+# Importa o módulo os, usado para montar o caminho dos arquivos de saída
+import os
+
+# Executa a exportação de cada modelo em uma thread separada
+from concurrent.futures import ThreadPoolExecutor
+
+# Cada thread usa a sua própria conexão com o banco; 'connection' permite fechá-la ao final.
+# 'transaction' mantém todos os modelos na mesma foto (snapshot) do banco.
+from django.db import connection, transaction
+
+# timezone.now() marca o instante de corte do backup incremental
+from datetime import timedelta
+
+from django.utils import timezone
+
+# Funções de exportação em streaming e de estado do backup incremental (core/backups.py):
+# - COMPRESSOES: tipos de compressão aceitos e a extensão de cada um
+# - exportar_queryset: grava o queryset no arquivo objeto a objeto, sem montar tudo em memória
+# - ler_estado / gravar_estado: marca d'água (high-water mark) de cada modelo
+from core.backups import COMPRESSOES, exportar_queryset, gravar_estado, ler_estado
 
 # Importa os modelos que você deseja exportar
 # Substitua "core.models" e os nomes dos modelos pelos do seu projeto, se necessário
-from core.models import Cargo, Equipe, Servico
+from core.models import Cargo, Equipe, Exclusao, Servico
 
 # Define uma nova classe de comando personalizada
 # Todo comando do Django precisa herdar BaseCommand
@@ -16,36 +33,166 @@ class Command(BaseCommand):
     # Mensagem de ajuda que aparece quando você executa "python manage.py help export_data"
     help = 'Exporta os modelos Cargo, Equipe e Servico para JSON de fixture com UTF-8'
 
+    # Lista de pares (modelo, nome) exportados
+    # O nome será usado como sufixo do arquivo: "backup_nome.json"
+    modelos = [(Cargo, 'cargo'), (Equipe, 'equipe'), (Servico, 'servico')]
+
+    # Declara as opções aceitas pela linha de comando
+    def add_arguments(self, parser):
+        # Pasta onde os arquivos serão gravados (padrão: pasta atual, como antes)
+        parser.add_argument('--output-dir', default='.', help='Pasta de destino dos backups (padrão: pasta atual).')
+        # Compressão opcional: gzip gera backup_x.json.gz (aceito direto pelo loaddata)
+        parser.add_argument(
+            '--compress', choices=sorted(COMPRESSOES), default='none',
+            help="Compressão dos arquivos: none, gzip ou zstd (zstd requer o pacote 'zstandard').",
+        )
+        # Quantidade de linhas buscadas do banco por vez (cursor do lado do servidor)
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Linhas lidas do banco por bloco (padrão: 2000).')
+        # Quantidade de modelos exportados ao mesmo tempo (1 = sequencial).
+        # Em paralelo, cada thread tem a sua conexão: só é consistente no PostgreSQL,
+        # onde todas importam o mesmo snapshot (pg_export_snapshot).
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Modelos exportados em paralelo (padrão: 1; mais de 1 só no PostgreSQL).',
+        )
+        # Modo incremental: exporta apenas o que mudou desde a última execução
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Gera arquivos delta_<modelo>_<data>.json apenas com as linhas alteradas '
+                 'desde a última exportação, mais delta_exclusoes_<data>.json com as exclusões.',
+        )
+        # Limpeza dos "tombstones": a tabela Exclusao cresce a cada exclusão
+        parser.add_argument(
+            '--prune-tombstones', action='store_true',
+            help='Ao final, apaga as Exclusao já cobertas por este backup. '
+                 'Use apenas se esta for a única pasta de backups incrementais.',
+        )
+        # Sobreposição entre deltas consecutivos (ver handle())
+        parser.add_argument(
+            '--overlap', type=int, default=300,
+            help='Segundos antes do corte que o próximo delta exporta de novo; deve cobrir a '
+                 'transação de escrita mais longa (padrão: 300).',
+        )
+
+    # Monta a lista de tarefas (nome, queryset, arquivo) desta execução
+    def tarefas(self, options, estado, carimbo):
+        sufixo = f".json{COMPRESSOES[options['compress']]}"
+        tarefas = []
+        for model_class, complemento in self.modelos:
+            # order_by('pk') deixa os arquivos estáveis entre execuções (diffs menores)
+            queryset = model_class.objects.order_by('pk')
+            marca = estado.get(complemento) if options['incremental'] else None
+            if marca is None:
+                # Backup completo (snapshot base), como sempre foi feito
+                nome_arquivo = f'backup_{complemento}{sufixo}'
+            else:
+                # Delta: usa o índice de 'modificado' para buscar só o que mudou.
+                # '>=' (e não '>') garante que nada se perca no instante exato do corte;
+                # uma linha repetida é inofensiva, pois a restauração sobrescreve pela pk.
+                queryset = queryset.filter(modificado__gte=marca)
+                nome_arquivo = f'delta_{complemento}_{carimbo}{sufixo}'
+            tarefas.append((complemento, queryset, nome_arquivo))
+
+        marca = estado.get('exclusoes') if options['incremental'] else None
+        if marca is not None:
+            # Exclusões ("tombstones") registradas desde o último backup
+            queryset = Exclusao.objects.filter(excluido__gte=marca).order_by('pk')
+            tarefas.append(('exclusoes', queryset, f'delta_exclusoes_{carimbo}{sufixo}'))
+        return tarefas
+
+    # Exporta um único queryset; executado dentro de uma thread do pool
+    def exportar(self, queryset, nome_arquivo, options):
+        caminho = os.path.join(options['output_dir'], nome_arquivo)
+        linhas, segundos = exportar_queryset(
+            queryset, caminho, options['compress'], options['chunk_size'],
+        )
+        return caminho, linhas, segundos
+
+    # Executado em uma thread auxiliar: lê dentro do snapshot da thread principal
+    # e fecha a conexão aberta por ela ao terminar
+    def exportar_em_thread(self, queryset, nome_arquivo, options, snapshot):
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                    cursor.execute('SET TRANSACTION SNAPSHOT %s', [snapshot])
+                return self.exportar(queryset, nome_arquivo, options)
+        finally:
+            connection.close()
+
     # O método handle() é chamado quando você executa o comando
     # É o "coração" do comando, onde a lógica real acontece
-    def handle(self, *args, **kwargs):
-        # Lista de classes de modelos que serão exportadas
-        # Cada item aqui é uma referência direta à classe do modelo
-        lista_classes = [Cargo, Equipe, Servico]
-
-        # Lista de nomes que serão usados para criar os arquivos JSON
-        # O nome será usado como sufixo do arquivo: "backup_nome.json"
-        nomes = ['cargo', 'equipe', 'servico']
-
-        # Percorre cada modelo junto com seu nome correspondente
-        # zip() combina duas listas em pares: (modelo, nome)
-        for model_class, complemento in zip(lista_classes, nomes):
-            # Serializa todos os objetos do modelo para JSON no formato de fixture do Django
-            # serializers.serialize('json', ...) produz uma lista de dicionários com:
-            #  - "model": nome do app + nome do modelo (ex: "core.Cargo")
-            #  - "pk": chave primária do objeto
-            #  - "fields": dicionário com todos os campos e valores do objeto
-            # Esse formato é **compatível com o comando "loaddata" do Django**
-            data = serializers.serialize('json', model_class.objects.all())
-
-            # Abre o arquivo para escrita
-            # "f'backup_{complemento}.json'" cria um arquivo com o nome apropriado
-            # encoding='utf-8' garante que caracteres acentuados ou especiais sejam preservados corretamente
-            # 'w' significa "write" (sobrescreve se o arquivo já existir)
-            with open(f'backup_{complemento}.json', 'w', encoding='utf-8') as f:
-                # Escreve o JSON serializado no arquivo
-                # f.write() grava a string exatamente como gerada pelo serializador
-                f.write(data)
+    def handle(self, *args, **options):
+        os.makedirs(options['output_dir'], exist_ok=True)
+
+        # Instante de corte: registrado ANTES das consultas. Não basta como marca
+        # d'água: um save do admin em andamento recebe o 'modificado' (auto_now)
+        # antes do corte, mas só faz commit depois do snapshot. Este delta não vê
+        # a linha, e um próximo delta a partir do corte também não. Por isso a
+        # marca gravada recua --overlap segundos; exportar uma linha duas vezes é
+        # inofensivo, pois a restauração sobrescreve pela pk.
+        corte = timezone.now()
+        marca = corte - timedelta(seconds=options['overlap'])
+        carimbo = corte.strftime('%Y%m%dT%H%M%S%f')
+        estado = ler_estado(options['output_dir'])
+        tarefas = self.tarefas(options, estado, carimbo)
+
+        paralelo = options['workers'] > 1
+        if paralelo and connection.vendor != 'postgresql':
+            self.stderr.write(self.style.WARNING(
+                f'--workers {options["workers"]} ignorado: só o PostgreSQL compartilha '
+                'o snapshot entre conexões. Exportando em sequência.'
+            ))
+            paralelo = False
+
+        # Uma única transação (uma única foto do banco) para todos os modelos:
+        # sem ela, um Cargo apagado entre a leitura de Cargo e a de Equipe
+        # deixaria no backup um membro com cargo inexistente, e a restauração falharia.
+        externa = not connection.in_atomic_block
+        # SET TRANSACTION só vale como primeira instrução da transação.
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    if externa:
+                        cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                        # No READ COMMITTED (padrão) cada consulta veria uma foto diferente.
+                    if paralelo:
+                        cursor.execute('SELECT pg_export_snapshot()')
+                        snapshot = cursor.fetchone()[0]
+            if not paralelo:
+                # Sequencial: usa a conexão da thread principal
+                resultados = [self.exportar(qs, arquivo, options) for _, qs, arquivo in tarefas]
+            else:
+                # Paralelo: cada modelo é exportado em uma thread com conexão própria,
+                # todas no snapshot exportado acima (válido enquanto esta transação durar)
+                with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                    futuros = [
+                        executor.submit(self.exportar_em_thread, qs, arquivo, options, snapshot)
+                        for _, qs, arquivo in tarefas
+                    ]
+                    resultados = [f.result() for f in futuros]
+
+        # Só avança a marca d'água depois que todos os arquivos foram gravados
+        for complemento, _, _ in tarefas:
+            estado[complemento] = marca
+        if not options['incremental']:
+            # Um snapshot completo já reflete todas as exclusões anteriores
+            # (exceto as ainda não confirmadas, daí a mesma sobreposição)
+            estado['exclusoes'] = marca
+        estado.setdefault('exclusoes', marca)
+        gravar_estado(options['output_dir'], estado)
+
+        if options['prune_tombstones']:
+            # Tudo antes da marca já está neste backup (no delta ou no snapshot completo).
+            # Entre a marca e o corte pode haver uma exclusão confirmada depois do
+            # snapshot: fica para o próximo delta, como as feitas durante a exportação.
+            apagadas, _ = Exclusao.objects.filter(excluido__lt=marca).delete()
+            self.stdout.write(f'{apagadas} registro(s) de exclusão antigo(s) apagado(s).')
+
+        # Relatório de linhas exportadas e velocidade (linhas por segundo) de cada arquivo
+        for caminho, linhas, segundos in resultados:
+            taxa = linhas / segundos if segundos > 0 else 0
+            self.stdout.write(f'{caminho}: {linhas} linha(s) em {segundos:.2f}s ({taxa:.0f} linhas/s)')
 
         # Exibe uma mensagem de sucesso no terminal
         # self.stdout.write() envia a mensagem para o console
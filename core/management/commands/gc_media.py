@@ -0,0 +1,174 @@
+# ======================================================================
+# COMANDO gc_media — COLETOR DE LIXO DOS ARQUIVOS DE MÍDIA
+# ======================================================================
+# Sempre que a foto de um membro da Equipe é trocada ou o registro é
+# apagado, o arquivo original '<uuid>.png' e as versões geradas pelo
+# django-pictures ('<uuid>/480w.png' e '<uuid>/1/480w.png') ficam órfãos
+# no storage. Este comando:
+#   1. monta, em uma única consulta, o conjunto de arquivos referenciados
+#      por Equipe.imagem (original + todas as versões);
+#   2. lista o storage (pasta 'media' local ou bucket do GCS);
+#   3. apaga a diferença em lotes paralelos.
+#
+# Arquivos mais novos que --min-age nunca são apagados: uma foto enviada
+# entre os passos 1 e 2 (ou durante um save do admin, antes do commit da
+# linha) ainda não aparece no banco, mas não é órfã.
+#
+# Uso:
+#   python manage.py gc_media --dry-run     # apenas relatório
+#   python manage.py gc_media               # apaga os órfãos
+#   python manage.py gc_media --min-age 0   # inclui os arquivos recentes
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Equipe
+
+# Apenas arquivos no padrão gerado por get_file_path() (nome UUID) e as
+# pastas de versões do django-pictures são candidatos à remoção. Qualquer
+# outro arquivo em 'media' é preservado.
+PADRAO_UPLOAD = re.compile(
+    r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(\.[A-Za-z0-9]+|/.+)$'
+)
+
+
+def arquivos_referenciados():
+    """
+    Retorna o conjunto de nomes (relativos ao storage) usados pelo banco:
+    a imagem original de cada Equipe e todas as suas versões.
+    """
+    referenciados = set()
+    consulta = Equipe.objects.only('imagem', 'image_width', 'image_height')
+    # 'only' busca apenas as colunas necessárias; width/height evitam que o
+    # django-pictures abra a imagem para calcular as versões.
+    for membro in consulta.iterator(chunk_size=500):
+        if not membro.imagem:
+            continue
+        referenciados.add(membro.imagem.name)
+        for picture in membro.imagem.get_picture_files_list():
+            referenciados.add(picture.name)
+    return referenciados
+
+
+def listar_storage(storage):
+    """
+    Gera triplas (nome, tamanho em bytes, data de modificação) para todos
+    os arquivos do storage.
+
+    - GCS: uma única listagem paginada do bucket (já traz tamanhos e datas).
+    - Demais backends: percorre recursivamente com listdir()/size().
+    """
+    bucket = getattr(storage, 'bucket', None)
+    if bucket is not None:
+        prefixo = storage.location.strip('/')
+        prefixo = f'{prefixo}/' if prefixo else ''
+        for blob in bucket.list_blobs(prefix=prefixo):
+            yield blob.name[len(prefixo):], blob.size, blob.updated
+        return
+
+    pendentes = ['']
+    while pendentes:
+        pasta = pendentes.pop()
+        try:
+            dirs, files = storage.listdir(pasta)
+        except FileNotFoundError:
+            continue
+        for nome in files:
+            caminho = f'{pasta}/{nome}' if pasta else nome
+            yield caminho, storage.size(caminho), storage.get_modified_time(caminho)
+        pendentes.extend(f'{pasta}/{d}' if pasta else d for d in dirs)
+
+
+def remover_pastas_vazias(storage, apagados):
+    """
+    Remove as pastas de versões '<uuid>/' esvaziadas pelos arquivos
+    'apagados' (apenas storage local). Outras pastas vazias de 'media'
+    não são tocadas.
+    """
+    pastas = {nome.split('/', 1)[0] for nome in apagados if '/' in nome}
+    for pasta in pastas:
+        try:
+            raiz = storage.path(pasta)
+        except NotImplementedError:
+            return
+            # Storages remotos (GCS) não possuem pastas reais.
+        for root, dirs, files in os.walk(raiz, topdown=False):
+            if not os.listdir(root):
+                os.rmdir(root)
+
+
+class Command(BaseCommand):
+    help = 'Remove do storage as imagens de Equipe (e suas versões) que não são mais referenciadas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas lista os órfãos e o espaço que seria liberado.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Quantidade de arquivos apagados por lote (padrão: 100).',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='Quantidade de lotes apagados em paralelo (padrão: 8).',
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Idade mínima, em segundos, de um arquivo para ser apagado (padrão: 3600 = 1h).',
+        )
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        limite = timezone.now() - timedelta(seconds=max(0, options['min_age']))
+        # Calculado antes da consulta: tudo o que for enviado depois dela é recente.
+        referenciados = arquivos_referenciados()
+
+        orfaos = []
+        recentes = 0
+        total_bytes = 0
+        for nome, tamanho, modificado in listar_storage(storage):
+            if nome in referenciados or not PADRAO_UPLOAD.match(nome):
+                continue
+            if modificado is not None and modificado > limite:
+                recentes += 1
+                continue
+            orfaos.append(nome)
+            total_bytes += tamanho or 0
+
+        resumo = (
+            f'{len(orfaos)} arquivo(s) órfão(s), '
+            f'{total_bytes / 1024:.1f} KiB a liberar '
+            f'({len(referenciados)} referenciado(s), {recentes} recente(s) preservado(s)).'
+        )
+
+        if options['dry_run']:
+            for nome in sorted(orfaos):
+                self.stdout.write(f'  {nome}')
+            self.stdout.write(self.style.WARNING(f'[dry-run] {resumo}'))
+            return
+
+        if not orfaos:
+            self.stdout.write(self.style.SUCCESS('Nenhum arquivo órfão encontrado.'))
+            return
+
+        tamanho_lote = max(1, options['batch_size'])
+        lotes = [orfaos[i:i + tamanho_lote] for i in range(0, len(orfaos), tamanho_lote)]
+
+        def apagar_lote(lote):
+            for nome in lote:
+                storage.delete(nome)
+            return len(lote)
+
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            apagados = sum(executor.map(apagar_lote, lotes))
+            # executor.map propaga a primeira exceção ocorrida em um lote.
+
+        remover_pastas_vazias(storage, orfaos)
+        self.stdout.write(self.style.SUCCESS(f'{apagados} arquivo(s) removido(s). {resumo}'))
@@ -0,0 +1,209 @@
+# ======================================================================
+# COMANDO import_snapshot — CARGA IDEMPOTENTE DAS FIXTURES EM LOTE
+# ======================================================================
+# Substitui os três 'loaddata' do build.sh. Diferenças:
+#   - lê as fixtures em streaming (core.backups.iterar_fixture);
+#   - grava em lotes com bulk_create(update_conflicts=True) ("upsert"),
+#     tudo dentro de uma única transação e sem disparar sinais;
+#   - valida as chaves estrangeiras (ex: Equipe.cargo) com uma consulta
+#     por lote, em vez de uma por objeto; como o 'loaddata', falha se
+#     alguma apontar para um registro inexistente (--skip-missing-fk pula
+#     esses objetos);
+#   - não sobrescreve registros editados no admin depois do backup
+#     ('modificado' no banco mais recente que o da fixture);
+#   - num registro existente, atualiza só os campos presentes na fixture e
+#     mantém o LQIP do banco quando a fixture não traz um para a mesma imagem
+#     (bulk_create não chama Equipe.save(), que o recalcularia);
+#   - se o checksum de todos os arquivos for igual ao da última importação,
+#     não faz nada.
+#
+# Uso:
+#   python manage.py import_snapshot backup_cargo.json backup_equipe.json backup_servico.json
+
+import os
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from core.backups import checksum_arquivo, iterar_fixture
+from core.models import Importacao
+
+ARQUIVOS_PADRAO = ['backup_cargo.json', 'backup_equipe.json', 'backup_servico.json']
+
+
+def em_lotes(iteravel, tamanho):
+    """Agrupa os itens de 'iteravel' em listas de até 'tamanho' elementos."""
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+@contextmanager
+def sem_auto_now(model):
+    """
+    Desliga temporariamente auto_now/auto_now_add dos campos de data do
+    modelo, para que 'criado' e 'modificado' venham da fixture (como no
+    'loaddata') e não do horário da importação.
+    """
+    campos = [
+        f for f in model._meta.concrete_fields
+        if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)
+    ]
+    originais = [(f, f.auto_now, f.auto_now_add) for f in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originais:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Importa fixtures JSON em lote (upsert), pulando a etapa se nada mudou desde a última importação.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures', nargs='*', default=ARQUIVOS_PADRAO,
+            help='Arquivos de fixture, na ordem de importação (padrão: os três backup_*.json).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Objetos por upsert (padrão: 1000).')
+        parser.add_argument('--force', action='store_true', help='Importa mesmo que os checksums não tenham mudado.')
+        parser.add_argument(
+            '--skip-missing-fk', action='store_true',
+            help='Pula (conta como ignorados) os objetos com chave estrangeira inexistente, em vez de falhar.',
+        )
+
+    def handle(self, *args, **options):
+        self.pular_fk_ausente = options['skip_missing_fk']
+        for caminho in options['fixtures']:
+            if not os.path.exists(caminho):
+                raise CommandError(f"Fixture '{caminho}' não encontrada.")
+
+        checksums = {os.path.basename(c): checksum_arquivo(c) for c in options['fixtures']}
+        anteriores = dict(
+            Importacao.objects.filter(arquivo__in=checksums).values_list('arquivo', 'checksum')
+        )
+        if anteriores == checksums and not options['force']:
+            self.stdout.write(self.style.SUCCESS('Fixtures sem alterações desde a última importação; nada a fazer.'))
+            return
+
+        self.modelos_importados = set()
+        with transaction.atomic():
+            for caminho in options['fixtures']:
+                criados, atualizados, ignorados = self.importar_arquivo(caminho, options['batch_size'])
+                self.stdout.write(
+                    f'{caminho}: {criados} criado(s), {atualizados} atualizado(s), {ignorados} ignorado(s)'
+                )
+
+            self.resetar_sequencias()
+            for arquivo, checksum in checksums.items():
+                Importacao.objects.update_or_create(arquivo=arquivo, defaults={'checksum': checksum})
+
+        self.stdout.write(self.style.SUCCESS('Importação concluída!'))
+
+    def importar_arquivo(self, caminho, batch_size):
+        totais = [0, 0, 0]
+        for lote in em_lotes(iterar_fixture(caminho), batch_size):
+            # O desserializador 'python' converte cada dicionário em instância
+            # do modelo (datas, chaves estrangeiras por pk) sem consultar o banco.
+            presentes = {}
+            for item in lote:
+                campos = set(item.get('fields', {}))
+                rotulo = item['model'].lower()
+                presentes[rotulo] = presentes[rotulo] & campos if rotulo in presentes else campos
+            # Campos que todos os objetos do lote trazem, por modelo.
+            por_modelo = {}
+            for deserializado in serializers.deserialize('python', lote, ignorenonexistent=True):
+                objeto = deserializado.object
+                por_modelo.setdefault(type(objeto), []).append(objeto)
+            for model, objetos in por_modelo.items():
+                campos = presentes.get(model._meta.label_lower, set())
+                for i, valor in enumerate(self.upsert(model, objetos, campos)):
+                    totais[i] += valor
+        return totais
+
+    def upsert(self, model, objetos, campos_presentes):
+        """
+        Grava 'objetos' de 'model' em um único INSERT ... ON CONFLICT DO UPDATE.
+        Em conflito, atualiza apenas 'campos_presentes' (os da fixture).
+        """
+        self.modelos_importados.add(model)
+        pk = model._meta.pk
+        ignorados = 0
+
+        # 1. Chaves estrangeiras: uma consulta por campo para o lote inteiro.
+        for campo in model._meta.concrete_fields:
+            if not campo.many_to_one:
+                continue
+            ids = {getattr(o, campo.attname) for o in objetos} - {None}
+            validos = set(
+                campo.related_model._base_manager.filter(pk__in=ids).values_list('pk', flat=True)
+            )
+            restantes = [o for o in objetos if getattr(o, campo.attname) in validos or getattr(o, campo.attname) is None]
+            if len(restantes) < len(objetos) and not self.pular_fk_ausente:
+                ausentes = sorted({getattr(o, campo.attname) for o in objetos} - validos - {None})
+                raise CommandError(
+                    f"{model._meta.label}.{campo.name} aponta para {campo.related_model._meta.label} "
+                    f"inexistente (pk {', '.join(map(str, ausentes))}). Use --skip-missing-fk para pular esses objetos."
+                )
+            ignorados += len(objetos) - len(restantes)
+            objetos = restantes
+
+        # 2. Registros já existentes: não sobrescreve edições mais recentes que o backup.
+        existentes = {}
+        tem_lqip = hasattr(model, 'imagem_lqip')
+        if objetos:
+            campos_busca = ['pk'] + (['modificado'] if hasattr(model, 'modificado') else [])
+            campos_busca += ['imagem', 'imagem_lqip'] if tem_lqip else []
+            for linha in model._base_manager.filter(pk__in=[o.pk for o in objetos]).values(*campos_busca):
+                existentes[linha['pk']] = linha
+        novos = []
+        for objeto in objetos:
+            no_banco = existentes.get(objeto.pk, {}).get('modificado')
+            mais_recente_no_banco = (
+                objeto.pk in existentes and no_banco is not None
+                and getattr(objeto, 'modificado', None) is not None
+                and no_banco >= objeto.modificado
+            )
+            if mais_recente_no_banco:
+                ignorados += 1
+                continue
+            if tem_lqip and objeto.pk in existentes and not objeto.imagem_lqip:
+                linha = existentes[objeto.pk]
+                if linha['imagem'] == objeto.imagem.name:
+                    objeto.imagem_lqip = linha['imagem_lqip']
+                    # Mesma imagem: o LQIP calculado no banco continua válido.
+            novos.append(objeto)
+
+        # 3. Upsert em lote.
+        if novos:
+            campos_update = [
+                f.name for f in model._meta.concrete_fields
+                if not f.primary_key and f.name in campos_presentes
+            ]
+            if tem_lqip and 'imagem' in campos_update and 'imagem_lqip' not in campos_update:
+                campos_update.append('imagem_lqip')
+                # Acompanha a imagem: o do banco se ela não mudou (ver acima), vazio se mudou.
+            conflito = (
+                {'update_conflicts': True, 'unique_fields': [pk.name], 'update_fields': campos_update}
+                if campos_update else {'ignore_conflicts': True}
+            )
+            # Fixture sem nenhum campo além da pk: só cria os que faltam.
+            with sem_auto_now(model):
+                model._base_manager.bulk_create(novos, **conflito)
+        atualizados = sum(1 for o in novos if o.pk in existentes)
+        return len(novos) - atualizados, atualizados, ignorados
+
+    def resetar_sequencias(self):
+        # Como o 'loaddata': as pks vieram da fixture, então as sequências
+        # do PostgreSQL precisam avançar para depois do maior id importado.
+        comandos = connection.ops.sequence_reset_sql(no_style(), list(self.modelos_importados))
+        if comandos:
+            with connection.cursor() as cursor:
+                for sql in comandos:
+                    cursor.execute(sql)
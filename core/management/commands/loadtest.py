@@ -0,0 +1,206 @@
+# ======================================================================
+# COMANDO loadtest — CARGA CONCORRENTE NA PÁGINA INICIAL
+# ======================================================================
+# Dispara, em --concorrencia threads, GETs da página inicial e POSTs do
+# formulário de contato (fração --post) e informa:
+#   - vazão (requisições por segundo) e erros;
+#   - latência p50/p95/p99/máx, por tipo de requisição;
+#   - consultas SQL por requisição.
+#
+# Dois alvos:
+#   - sem --url: a aplicação WSGI roda neste processo (django.test.Client,
+#     sem rede). As consultas são contadas com core.timing.medir(), e os
+#     e-mails do formulário vão para o backend 'dummy' (não são enviados);
+#   - com --url: um servidor já rodando (runserver, gunicorn, produção).
+#     As consultas vêm do cabeçalho Server-Timing ('db;...;desc="N
+#     consultas"'), presente só se SERVER_TIMING_PUBLIC estiver ligado e a
+#     requisição for amostrada (SERVER_TIMING_SAMPLE_RATE). Atenção: cada
+#     POST válido envia um e-mail de verdade no servidor alvo.
+#
+# Para popular o banco antes: 'manage.py seed_synthetic'.
+#
+# Uso:
+#   python manage.py loadtest --requisicoes 500 --concorrencia 8
+#   python manage.py loadtest --url http://127.0.0.1:8000/ --post 0
+
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core import timing
+
+CONTATO = {
+    'nome': 'Teste de carga',
+    'email': 'carga@example.com',
+    'assunto': 'loadtest',
+    'mensagem': 'Mensagem gerada pelo comando loadtest.',
+}
+_CONSULTAS = re.compile(r'db;[^,]*desc="(\d+) consultas"')
+
+
+class ClienteLocal:
+    """Requisições para a aplicação WSGI deste processo."""
+
+    def __init__(self):
+        self.cliente = Client()
+        self.url = reverse('index')
+
+    def requisitar(self, metodo):
+        """Retorna (status, consultas)."""
+        with timing.medir() as medicao:
+            if metodo == 'GET':
+                response = self.cliente.get(self.url, secure=not settings.DEBUG)
+            else:
+                response = self.cliente.post(self.url, CONTATO, secure=not settings.DEBUG)
+        return response.status_code, medicao.consultas
+
+    def encerrar(self):
+        connections.close_all()
+        # Conexões com o banco são por thread: fecha as desta thread.
+
+
+class ClienteRemoto:
+    """Requisições HTTP para um servidor rodando; guarda cookies (sessão, CSRF)."""
+
+    def __init__(self, url):
+        self.url = url
+        self.cookies = CookieJar()
+        self.abridor = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), SemRedirecionar,
+        )
+
+    def _token_csrf(self):
+        token = next((c.value for c in self.cookies if c.name == settings.CSRF_COOKIE_NAME), None)
+        if token is None:
+            self.requisitar('GET')
+            token = next((c.value for c in self.cookies if c.name == settings.CSRF_COOKIE_NAME), '')
+        return token
+
+    def requisitar(self, metodo):
+        dados = None
+        cabecalhos = {'User-Agent': 'fusion-loadtest'}
+        if metodo == 'POST':
+            dados = urllib.parse.urlencode({**CONTATO, 'csrfmiddlewaretoken': self._token_csrf()}).encode()
+            cabecalhos['Referer'] = self.url
+            # Em HTTPS o CsrfViewMiddleware exige o Referer da mesma origem.
+        pedido = urllib.request.Request(self.url, data=dados, headers=cabecalhos, method=metodo)
+        try:
+            with self.abridor.open(pedido, timeout=30) as response:
+                response.read()
+                status, timing_cabecalho = response.status, response.headers.get('Server-Timing', '')
+        except urllib.error.HTTPError as erro:
+            erro.read()
+            status, timing_cabecalho = erro.code, erro.headers.get('Server-Timing', '')
+        encontrado = _CONSULTAS.search(timing_cabecalho)
+        return status, int(encontrado.group(1)) if encontrado else None
+
+    def encerrar(self):
+        pass
+
+
+class SemRedirecionar(urllib.request.HTTPRedirectHandler):
+    """O 302 depois do POST é a resposta medida; não segue o redirecionamento."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Teste de carga da página inicial (GET) e do formulário de contato (POST).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='', help='Servidor alvo (padrão: aplicação WSGI neste processo).')
+        parser.add_argument('--requisicoes', type=int, default=200, help='Total de requisições (padrão: 200).')
+        parser.add_argument('--concorrencia', type=int, default=4, help='Requisições simultâneas (padrão: 4).')
+        parser.add_argument('--post', type=float, default=0.1, help='Fração de POSTs do formulário (padrão: 0.1).')
+        parser.add_argument('--aquecimento', type=int, default=5, help='Requisições por thread antes da medição (padrão: 5).')
+
+    def handle(self, *args, **options):
+        total, concorrencia = options['requisicoes'], options['concorrencia']
+        if total < 1 or concorrencia < 1 or not 0 <= options['post'] <= 1:
+            raise CommandError('--requisicoes e --concorrencia devem ser >= 1, e --post entre 0 e 1.')
+        metodos = [
+            'POST' if int(i * options['post']) > int((i - 1) * options['post']) else 'GET'
+            for i in range(1, total + 1)
+        ]
+        # POSTs espalhados de forma regular (ex: 0.1 → um a cada dez).
+        pendentes = iter(metodos)
+        trava = threading.Lock()
+        largada = threading.Barrier(concorrencia)
+        # A medição começa quando todas as threads terminaram o aquecimento.
+        resultados = []
+        # (método, início, fim, status, consultas ou None)
+
+        def trabalhador(_):
+            cliente = ClienteRemoto(options['url']) if options['url'] else ClienteLocal()
+            try:
+                try:
+                    for _ in range(options['aquecimento']):
+                        cliente.requisitar('GET')
+                except Exception:
+                    largada.abort()
+                    # As outras threads saem do wait() com BrokenBarrierError
+                    # em vez de esperarem para sempre por esta.
+                    raise
+                largada.wait()
+                while True:
+                    with trava:
+                        metodo = next(pendentes, None)
+                    if metodo is None:
+                        return
+                    inicio = time.perf_counter()
+                    try:
+                        status, consultas = cliente.requisitar(metodo)
+                    except Exception as erro:
+                        status, consultas = erro.__class__.__name__, None
+                    resultados.append((metodo, inicio, time.perf_counter(), status, consultas))
+            finally:
+                cliente.encerrar()
+
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend'):
+            # Vale só para o alvo local; um servidor remoto usa o próprio backend.
+            with ThreadPoolExecutor(max_workers=concorrencia) as threads:
+                futuros = [threads.submit(trabalhador, i) for i in range(concorrencia)]
+        falha = next((
+            f.exception() for f in futuros
+            if f.exception() is not None and not isinstance(f.exception(), threading.BrokenBarrierError)
+        ), None)
+        if falha is not None:
+            raise CommandError(f'Falha no aquecimento: {falha!r}') from falha
+            # A causa de verdade, não o BrokenBarrierError das outras threads.
+
+        duracao = max(r[2] for r in resultados) - min(r[1] for r in resultados)
+        falhas = sorted({str(r[3]) for r in resultados if not isinstance(r[3], int) or r[3] >= 400})
+        erros = sum(1 for r in resultados if str(r[3]) in falhas)
+        self.stdout.write(f"Alvo: {options['url'] or 'aplicação WSGI neste processo'}")
+        self.stdout.write(
+            f'{len(resultados)} requisições em {duracao:.2f}s ({len(resultados) / duracao:.1f} req/s), '
+            f'concorrência {concorrencia}, erros {erros}'
+        )
+        self.stdout.write(f"{'Tipo':<8}{'qtd':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'máx':>10}{'consultas':>11}")
+        for nome in ('GET', 'POST', 'total'):
+            grupo = [r for r in resultados if nome in ('total', r[0])]
+            if not grupo:
+                continue
+            ms = [(r[2] - r[1]) * 1000 for r in grupo]
+            consultas = [r[4] for r in grupo if r[4] is not None]
+            media_consultas = f'{statistics.mean(consultas):.1f}' if consultas else 'n/d'
+            self.stdout.write(
+                f'{nome:<8}{len(grupo):>6}{timing.percentil(ms, 50):>8.1f}ms{timing.percentil(ms, 95):>8.1f}ms'
+                f'{timing.percentil(ms, 99):>8.1f}ms{max(ms):>8.1f}ms{media_consultas:>11}'
+            )
+        if falhas:
+            self.stdout.write(self.style.WARNING(f"Status com erro: {', '.join(falhas)}"))
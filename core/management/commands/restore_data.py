@@ -0,0 +1,119 @@
+# ======================================================================
+# COMANDO restore_data — RESTAURA SNAPSHOT BASE + DELTAS INCREMENTAIS
+# ======================================================================
+# Reaplica, em ordem, os arquivos gerados por 'export_data':
+#   1. o snapshot base: backup_cargo.json, backup_equipe.json, backup_servico.json;
+#   2. cada delta 'delta_<modelo>_<data>.json', do mais antigo ao mais novo;
+#   3. as exclusões 'delta_exclusoes_<data>.json' de cada delta.
+# Arquivos .json.gz e .json.zst também são aceitos.
+#
+# Uso:
+#   python manage.py restore_data --dir backups
+#   python manage.py restore_data --dir backups --until 20250901T000000000000
+
+import glob
+import os
+import re
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from core.backups import COMPRESSOES, abrir_texto
+from core.signals import sem_registro_de_exclusoes
+
+ORDEM_MODELOS = ['cargo', 'equipe', 'servico']
+# Cargo antes de Equipe, por causa da chave estrangeira Equipe.cargo.
+
+PADRAO_DELTA = re.compile(r'^delta_(?P<nome>[a-z]+)_(?P<carimbo>\d{8}T\d+)\.json(\.gz|\.zst)?$')
+
+
+def arquivo_base(pasta, nome):
+    """Retorna o snapshot base de 'nome' (com ou sem compressão), ou None."""
+    for sufixo in COMPRESSOES.values():
+        caminho = os.path.join(pasta, f'backup_{nome}.json{sufixo}')
+        if os.path.exists(caminho):
+            return caminho
+    return None
+
+
+def deltas_por_carimbo(pasta):
+    """Agrupa os arquivos delta por carimbo de data: {carimbo: {nome: caminho}}."""
+    grupos = {}
+    for caminho in glob.glob(os.path.join(pasta, 'delta_*.json*')):
+        encontrado = PADRAO_DELTA.match(os.path.basename(caminho))
+        if encontrado:
+            grupos.setdefault(encontrado['carimbo'], {})[encontrado['nome']] = caminho
+    return dict(sorted(grupos.items()))
+
+
+class Command(BaseCommand):
+    help = 'Restaura o banco a partir do snapshot base e dos deltas gerados por export_data --incremental.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default='.', help='Pasta com os arquivos de backup (padrão: pasta atual).')
+        parser.add_argument(
+            '--until', default=None,
+            help='Aplica apenas os deltas com carimbo menor ou igual a este (ex: 20250901T000000000000).',
+        )
+
+    def carregar(self, caminho):
+        # Salva cada objeto como o 'loaddata' faz (save "raw"), preservando
+        # as datas de criação/modificação gravadas no backup.
+        total = 0
+        with abrir_texto(caminho, 'rt') as arquivo:
+            for objeto in serializers.deserialize('json', arquivo, ignorenonexistent=True):
+                objeto.save()
+                total += 1
+        return total
+
+    def aplicar_exclusoes(self, caminho):
+        # As exclusões reaplicadas não geram novas Exclusao (já estão no backup).
+        total = 0
+        with abrir_texto(caminho, 'rt') as arquivo, sem_registro_de_exclusoes():
+            for objeto in serializers.deserialize('json', arquivo):
+                exclusao = objeto.object
+                modelo = apps.get_model(exclusao.modelo)
+                apagados, _ = modelo.objects.filter(pk=exclusao.objeto_pk).delete()
+                total += apagados
+        return total
+
+    def handle(self, *args, **options):
+        pasta = options['dir']
+        bases = {nome: arquivo_base(pasta, nome) for nome in ORDEM_MODELOS}
+        faltando = [nome for nome, caminho in bases.items() if caminho is None]
+        if faltando:
+            raise CommandError(f"Snapshot base ausente em '{pasta}' para: {', '.join(faltando)}.")
+
+        grupos = deltas_por_carimbo(pasta)
+        if options['until']:
+            grupos = {c: g for c, g in grupos.items() if c <= options['until']}
+
+        with transaction.atomic():
+            for nome in ORDEM_MODELOS:
+                total = self.carregar(bases[nome])
+                self.stdout.write(f'{bases[nome]}: {total} objeto(s)')
+
+            for carimbo, arquivos in grupos.items():
+                for nome in ORDEM_MODELOS:
+                    if nome in arquivos:
+                        total = self.carregar(arquivos[nome])
+                        self.stdout.write(f'{arquivos[nome]}: {total} objeto(s)')
+                if 'exclusoes' in arquivos:
+                    total = self.aplicar_exclusoes(arquivos['exclusoes'])
+                    self.stdout.write(f"{arquivos['exclusoes']}: {total} objeto(s) apagado(s)")
+
+            # Como o 'loaddata', ajusta as sequências do PostgreSQL para depois
+            # das chaves primárias restauradas (evita conflito no próximo INSERT).
+            modelos = [apps.get_model('core', nome) for nome in ORDEM_MODELOS]
+            comandos = connection.ops.sequence_reset_sql(no_style(), modelos)
+            if comandos:
+                with connection.cursor() as cursor:
+                    for sql in comandos:
+                        cursor.execute(sql)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Restauração concluída: snapshot base + {len(grupos)} delta(s).'
+        ))
@@ -0,0 +1,141 @@
+# ======================================================================
+# COMANDO seed_synthetic — DADOS SINTÉTICOS PARA TESTES DE CARGA
+# ======================================================================
+# Enche o banco com N membros da equipe, M serviços e K cargos, para medir
+# a página inicial (comando 'loadtest') com 10, 1.000 ou 100.000 linhas.
+#
+#   - Os campos de texto vêm do model_mommy (mommy.prepare, sem salvar) e
+#     as linhas entram em lotes com bulk_create: uma consulta por lote, em
+#     vez de um INSERT (e um save()) por objeto.
+#   - As fotos são geradas em paralelo: o desenho (Pillow, uso de CPU) em
+#     processos separados e o envio ao storage, com as versões do
+#     django-pictures (uso de rede no GCS), em threads.
+#   - Só --imagens fotos distintas são criadas e repetidas entre os membros:
+#     100.000 membros não significam 100.000 arquivos no bucket.
+#
+# bulk_create não chama Equipe.save(): o LQIP de cada foto é calculado aqui.
+# Os dados são acrescentados aos existentes; para recomeçar do zero, use
+# um banco de desenvolvimento vazio ('manage.py flush').
+#
+# Uso:
+#   python manage.py seed_synthetic --equipe 1000 --servicos 200 --cargos 20
+#   python manage.py seed_synthetic --equipe 100000 --imagens 50 --workers 8
+
+import colorsys
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from itertools import cycle
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from model_mommy import mommy
+from PIL import Image, ImageDraw
+
+from core.images import gerar_lqip
+from core.models import Cargo, Equipe, Servico
+
+LADO_IMAGEM = 480
+# Mesma largura do container das fotos (PICTURES['CONTAINER_WIDTH']).
+
+
+def gerar_imagem(indice, lado=LADO_IMAGEM):
+    """
+    Desenha a foto sintética número 'indice' (sempre a mesma para o mesmo
+    índice). Roda em outro processo: retorna só tipos simples
+    (PNG em bytes, largura, altura, LQIP).
+    """
+    sorteio = random.Random(indice)
+    cor = tuple(int(c * 255) for c in colorsys.hsv_to_rgb(sorteio.random(), 0.5, 0.9))
+    img = Image.new('RGB', (lado, lado), cor)
+    desenho = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y, r = sorteio.randrange(lado), sorteio.randrange(lado), sorteio.randrange(20, lado // 3)
+        desenho.ellipse((x - r, y - r, x + r, y + r), fill=tuple(sorteio.randrange(256) for _ in range(3)))
+    buffer = BytesIO()
+    img.save(buffer, 'PNG')
+    return buffer.getvalue(), lado, lado, gerar_lqip(BytesIO(buffer.getvalue()))
+
+
+def enviar_imagem(indice, conteudo):
+    """Grava a foto no storage (com as versões do django-pictures); retorna o nome."""
+    equipe = Equipe()
+    # Instância só para o campo: o arquivo vai para o storage, a linha não.
+    equipe.imagem.save(f'sintetica-{indice}.png', ContentFile(conteudo), save=False)
+    return equipe.imagem.name
+
+
+class Command(BaseCommand):
+    help = 'Cria cargos, serviços e membros da equipe sintéticos (bulk_create) para testes de carga.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--equipe', type=int, default=0, help='Membros da equipe a criar (padrão: 0).')
+        parser.add_argument('--servicos', type=int, default=0, help='Serviços a criar (padrão: 0).')
+        parser.add_argument('--cargos', type=int, default=0, help='Cargos a criar (padrão: 0; usa os existentes).')
+        parser.add_argument('--imagens', type=int, default=20, help='Fotos distintas, repetidas entre os membros (padrão: 20).')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Processos/threads para as fotos (1 = sequencial).')
+        parser.add_argument('--lote', type=int, default=1000, help='Linhas por bulk_create (padrão: 1000).')
+        parser.add_argument('--inativos', type=float, default=0.0, help='Fração de linhas com ativo=False (padrão: 0).')
+
+    def criar_em_lotes(self, modelo, quantidade, lote, preencher=None):
+        """Prepara 'quantidade' objetos com o model_mommy e grava com bulk_create."""
+        criados = 0
+        while criados < quantidade:
+            objetos = mommy.prepare(modelo, _quantity=min(lote, quantidade - criados), _save_related=False)
+            for objeto in objetos:
+                objeto.ativo = random.random() >= self.inativos
+                if preencher:
+                    preencher(objeto)
+            with transaction.atomic():
+                modelo.objects.bulk_create(objetos, batch_size=lote)
+            criados += len(objetos)
+            self.stdout.write(f'  {modelo._meta.verbose_name_plural}: {criados}/{quantidade}', ending='\r')
+        if quantidade:
+            self.stdout.write('')
+
+    def gerar_imagens(self, quantidade, workers):
+        """Gera e envia as fotos em paralelo; retorna [(nome, largura, altura, lqip), ...]."""
+        if workers == 1:
+            geradas = list(map(gerar_imagem, range(quantidade)))
+            # Sem processos extras (ex: dentro de um worker do 'test --parallel').
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as processos:
+                geradas = list(processos.map(gerar_imagem, range(quantidade)))
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            nomes = list(threads.map(enviar_imagem, range(quantidade), [g[0] for g in geradas]))
+        return [(nome, largura, altura, lqip) for nome, (_, largura, altura, lqip) in zip(nomes, geradas)]
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        self.inativos = options['inativos']
+        lote = max(1, options['lote'])
+
+        self.criar_em_lotes(Cargo, options['cargos'], lote)
+
+        self.criar_em_lotes(Servico, options['servicos'], lote, lambda s: setattr(
+            s, 'icone', random.choice(Servico.choices)[0],
+        ))
+
+        if options['equipe']:
+            cargos = list(Cargo.objects.values_list('pk', flat=True))
+            if not cargos:
+                raise CommandError('Nenhum cargo no banco: use --cargos para criar alguns.')
+            quantidade_imagens = max(1, min(options['imagens'], options['equipe']))
+            antes = time.perf_counter()
+            imagens = self.gerar_imagens(quantidade_imagens, max(1, options['workers']))
+            self.stdout.write(f'  {quantidade_imagens} foto(s) em {time.perf_counter() - antes:.1f}s')
+            proxima_imagem, proximo_cargo = cycle(imagens), cycle(cargos)
+
+            def preencher(equipe):
+                equipe.cargo_id = next(proximo_cargo)
+                equipe.imagem.name, equipe.image_width, equipe.image_height, equipe.imagem_lqip = next(proxima_imagem)
+
+            self.criar_em_lotes(Equipe, options['equipe'], lote, preencher)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Criados: {options['cargos']} cargo(s), {options['servicos']} serviço(s), "
+            f"{options['equipe']} membro(s) em {time.perf_counter() - inicio:.1f}s."
+        ))
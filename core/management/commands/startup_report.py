@@ -0,0 +1,100 @@
+# ======================================================================
+# COMANDO startup_report — TEMPO DE IMPORTAÇÃO DO django.setup()
+# ======================================================================
+# Executa, em um processo Python novo ("cold start"), o equivalente a
+#     python -X importtime -c "import django; django.setup()"
+# com as mesmas configurações (DJANGO_SETTINGS_MODULE) do processo atual,
+# e mostra:
+#   - o tempo total do django.setup() (relógio) e a soma das importações;
+#   - os pacotes de primeiro nível que mais pesam (tempo acumulado);
+#   - um aviso se bibliotecas do Google (google.*) forem importadas no boot,
+#     já que elas devem ser carregadas só no primeiro uso do storage (core/gcs.py).
+# Se o tempo passar do orçamento (settings.STARTUP_BUDGET_MS ou --budget-ms),
+# o comando termina com erro, o que permite usá-lo no CI.
+#
+# Uso:
+#   python manage.py startup_report
+#   python manage.py startup_report --top 30 --budget-ms 800
+
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SCRIPT = (
+    'import time; inicio = time.perf_counter(); '
+    'import django; django.setup(); '
+    'print(round((time.perf_counter() - inicio) * 1000, 1))'
+)
+# O tempo de relógio é medido dentro do processo filho e impresso no stdout;
+# o '-X importtime' escreve o relatório de importações no stderr.
+
+LINHA = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+# Exemplo: "import time:       412 |       1830 |   django.utils.timezone"
+# A indentação do nome (2 espaços por nível) indica o aninhamento.
+
+
+def parse_importtime(texto):
+    """
+    Converte a saída do '-X importtime' em uma lista de
+    (modulo, self_us, cumulativo_us, nivel), na ordem em que aparecem.
+    """
+    modulos = []
+    for linha in texto.splitlines():
+        encontrado = LINHA.match(linha)
+        if encontrado:
+            self_us, cumulativo_us, espacos, nome = encontrado.groups()
+            modulos.append((nome, int(self_us), int(cumulativo_us), (len(espacos) - 1) // 2))
+    return modulos
+
+
+class Command(BaseCommand):
+    help = 'Mede o tempo de importação do django.setup() em um processo novo (python -X importtime).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-ms', type=float, default=None,
+            help='Tempo máximo aceito para o django.setup(), em ms (padrão: settings.STARTUP_BUDGET_MS).',
+        )
+        parser.add_argument('--top', type=int, default=15, help='Quantidade de pacotes exibidos (padrão: 15).')
+
+    def handle(self, *args, **options):
+        orcamento = options['budget_ms']
+        if orcamento is None:
+            orcamento = getattr(settings, 'STARTUP_BUDGET_MS', None)
+
+        ambiente = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        ambiente.pop('PYTHONIMPORTTIME', None)
+        processo = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT],
+            cwd=str(settings.BASE_DIR), env=ambiente, capture_output=True, text=True,
+        )
+        if processo.returncode != 0:
+            erro = processo.stderr.strip().splitlines()[-1:] or ['sem saída']
+            raise CommandError(f'django.setup() falhou no processo filho: {erro[0]}')
+
+        modulos = parse_importtime(processo.stderr)
+        tempo_setup = float(processo.stdout.strip().splitlines()[-1])
+        soma_importacoes = sum(m[1] for m in modulos) / 1000
+
+        self.stdout.write(f'django.setup(): {tempo_setup:.1f} ms (relógio)')
+        self.stdout.write(f'Importações: {len(modulos)} módulo(s), {soma_importacoes:.1f} ms no total')
+        self.stdout.write('')
+        self.stdout.write(f"{'Pacote':<45}{'Acumulado':>12}")
+        primeiro_nivel = sorted((m for m in modulos if m[3] == 0), key=lambda m: m[2], reverse=True)
+        for nome, _, cumulativo_us, _ in primeiro_nivel[:options['top']]:
+            self.stdout.write(f'{nome:<45}{cumulativo_us / 1000:>10.1f}ms')
+
+        google = sorted({m[0] for m in modulos if m[0] == 'google' or m[0].startswith('google.')})
+        if google:
+            self.stdout.write(self.style.WARNING(
+                f'Bibliotecas do Google importadas no boot ({len(google)} módulo(s), ex: {google[0]}). '
+                'Elas deveriam ser carregadas apenas no primeiro uso do storage (core/gcs.py).'
+            ))
+
+        if orcamento is not None and tempo_setup > orcamento:
+            raise CommandError(f'django.setup() levou {tempo_setup:.1f} ms, acima do orçamento de {orcamento:.0f} ms.')
+        self.stdout.write(self.style.SUCCESS('Tempo de inicialização dentro do orçamento.'))
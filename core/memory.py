@@ -0,0 +1,83 @@
+# ======================================================================
+# MEMÓRIA DO WORKER: RSS, PICO E ALOCAÇÕES (tracemalloc)
+# ======================================================================
+# No plano free do Render a instância tem 512 MB. Uploads de imagens no
+# admin (Pillow) e querysets grandes fazem a memória de cada worker crescer
+# aos poucos até o kernel matar a instância inteira (OOM), levando todos os
+# workers juntos. Este módulo mede a memória do processo atual; o
+# MemoryWatchdogMiddleware (core/middleware.py) usa essas medidas para
+# aposentar, de forma graciosa, o worker que passar do limite.
+
+import os
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+    # Módulo exclusivo de Unix: no Windows (desenvolvimento) o pico fica indisponível.
+
+_PAGINA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+# Tamanho da página de memória; /proc/self/statm conta em páginas.
+
+estatisticas = {'requisicoes': 0, 'pico_rss_mb': 0.0, 'aposentando': False}
+# Contadores deste processo (cada worker do gunicorn tem os seus).
+
+VARIAVEL_WORKER = 'FUSION_GUNICORN_WORKER'
+# Definida como '1' pelo hook post_fork (gunicorn.conf.py) em cada worker.
+
+
+def em_worker_gunicorn():
+    """
+    True se este processo é um worker do gunicorn, de qualquer classe.
+    O SERVER_SOFTWARE da requisição não serve: o worker do uvicorn (ASGI)
+    não o define.
+    """
+    return os.environ.get(VARIAVEL_WORKER) == '1'
+
+
+def rss_atual_mb():
+    """Memória residente (RSS) atual do processo, em MB."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGINA / (1024 * 1024)
+            # Leitura barata (alguns microssegundos): pode ser feita a cada requisição.
+    except OSError:
+        return pico_rss_mb()
+        # Fora do Linux não há /proc; usa o pico como aproximação.
+
+
+def pico_rss_mb():
+    """Maior RSS já atingido pelo processo (getrusage), em MB."""
+    if resource is None:
+        return 0.0
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024) if sys.platform == 'darwin' else maximo / 1024
+    # Linux informa em KB; macOS, em bytes.
+
+
+def iniciar_tracemalloc(frames=10):
+    """Liga o tracemalloc neste processo (tem custo de CPU e memória)."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def top_alocacoes(limite=25, agrupar_por='lineno'):
+    """
+    Retorna as 'limite' linhas de código que mais alocaram memória ainda viva,
+    como lista de (local, tamanho_kb, quantidade). Vazia se o tracemalloc
+    estiver desligado.
+    """
+    if not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+    resultado = []
+    for stat in snapshot.statistics(agrupar_por)[:limite]:
+        quadro = stat.traceback[0]
+        resultado.append((f'{quadro.filename}:{quadro.lineno}', stat.size / 1024, stat.count))
+    return resultado
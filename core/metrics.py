@@ -0,0 +1,279 @@
+# ======================================================================
+# MÉTRICAS NO FORMATO DO PROMETHEUS, SOMADAS ENTRE OS WORKERS
+# ======================================================================
+# Cada worker do gunicorn é um processo separado: um contador em memória só
+# enxerga as requisições do próprio worker. Aqui cada processo:
+#   1. acumula os valores em memória (sem I/O no caminho da requisição);
+#   2. grava periodicamente (METRICS_FLUSH_INTERVAL) um arquivo JSON só seu
+#      em METRICS_DIR ('<pid>.json'), de forma atômica (arquivo temporário +
+#      os.replace). Como ninguém mais escreve nesse arquivo, não é preciso
+#      trava entre processos, e quem lê nunca vê um arquivo pela metade;
+#   3. a rota /metrics soma os arquivos de todos os processos.
+#
+# Só os workers do gunicorn gravam: o hook post_fork (gunicorn.conf.py)
+# chama ativar_gravacao(). Comandos (migrate, export_data, loadtest em
+# processo...) acumulam em memória mas não deixam '<pid>.json' na pasta,
+# senão o tráfego deles entraria no /metrics de produção.
+#
+# Quando o gunicorn encerra um worker (max_requests, aposentadoria por
+# memória...), o hook child_exit (gunicorn.conf.py) soma o arquivo dele em
+# 'encerrados.json': os contadores nunca diminuem, e a pasta não cresce.
+# A pasta é esvaziada quando o gunicorn inicia.
+#
+# Tipos suportados: contador (counter) e histograma (histogram).
+
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+ARQUIVO_ENCERRADOS = 'encerrados.json'
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registro = {}
+# nome → Metrica, na ordem de criação (ordem da exposição).
+_valores = {}
+# (nome, rótulos) → float (contador) ou [contagem por bucket..., soma, total] (histograma).
+_lock = threading.Lock()
+_gravado_em = [0.0]
+_agendado = [False]
+_gravacao_ativa = [False]
+
+
+def ativar_gravacao():
+    """Liga a gravação em METRICS_DIR neste processo (worker do gunicorn)."""
+    if not _gravacao_ativa[0]:
+        _gravacao_ativa[0] = True
+        atexit.register(gravar)
+
+
+def pasta():
+    return getattr(settings, 'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'fusion-metrics'))
+
+
+class Metrica:
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        _registro[nome] = self
+
+    def _chave(self, rotulos):
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f'{self.nome} espera os rótulos {self.rotulos}, recebeu {tuple(rotulos)}.')
+        return self.nome, tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+
+class Contador(Metrica):
+    tipo = 'counter'
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with _lock:
+            _valores[chave] = _valores.get(chave, 0) + valor
+
+
+class Histograma(Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, rotulos=(), buckets=BUCKETS_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with _lock:
+            contagens = _valores.setdefault(chave, [0] * (len(self.buckets) + 3))
+            # Uma posição por bucket, mais +Inf, soma e total.
+            for indice, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    break
+            else:
+                indice = len(self.buckets)
+            contagens[indice] += 1
+            # Guarda por faixa; a exposição acumula (le="...").
+            contagens[-2] += valor
+            contagens[-1] += 1
+
+    @contextmanager
+    def cronometrar(self, **rotulos):
+        """Observa a duração do bloco em segundos (também quando ele falha)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+
+# ----------------------------------------------------------------------
+# Arquivos por processo
+# ----------------------------------------------------------------------
+def _gravar_json(caminho, dados):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix='.tmp')
+    with os.fdopen(descritor, 'w') as arquivo:
+        json.dump(dados, arquivo)
+    os.replace(temporario, caminho)
+
+
+def _ler_json(caminho):
+    try:
+        with open(caminho) as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return []
+
+
+def gravar():
+    """Grava os valores deste processo em METRICS_DIR/<pid>.json."""
+    with _lock:
+        dados = [[nome, list(rotulos), valor] for (nome, rotulos), valor in _valores.items()]
+        _gravado_em[0] = time.monotonic()
+    try:
+        _gravar_json(os.path.join(pasta(), f'{os.getpid()}.json'), dados)
+    except OSError:
+        pass
+        # Disco indisponível: as métricas ficam só em memória até a próxima tentativa.
+
+
+def _gravar_agendado():
+    _agendado[0] = False
+    gravar()
+
+
+def gravar_se_preciso():
+    """
+    Chamado ao fim de cada requisição: grava no máximo a cada
+    METRICS_FLUSH_INTERVAL segundos. Dentro do intervalo, agenda uma
+    gravação para o fim dele, para um worker que fica ocioso não deixar
+    as últimas requisições de fora de /metrics. Não faz nada fora de
+    um worker do gunicorn (ver ativar_gravacao).
+    """
+    if not _gravacao_ativa[0]:
+        return
+    intervalo = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+    decorrido = time.monotonic() - _gravado_em[0]
+    if decorrido >= intervalo:
+        gravar()
+    elif not _agendado[0]:
+        _agendado[0] = True
+        temporizador = threading.Timer(intervalo - decorrido, _gravar_agendado)
+        temporizador.daemon = True
+        temporizador.start()
+
+
+def _somar(total, dados):
+    for nome, rotulos, valor in dados:
+        chave = (nome, tuple(rotulos))
+        if isinstance(valor, list):
+            anterior = total.get(chave)
+            total[chave] = [a + b for a, b in zip(anterior, valor)] if anterior else list(valor)
+        else:
+            total[chave] = total.get(chave, 0) + valor
+
+
+def _como_lista(total):
+    return [[nome, list(rotulos), valor] for (nome, rotulos), valor in total.items()]
+
+
+def arquivar_processo(pid):
+    """Soma o arquivo de um processo encerrado em 'encerrados.json' e o apaga."""
+    caminho = os.path.join(pasta(), f'{pid}.json')
+    if not os.path.exists(caminho):
+        return
+    total = {}
+    _somar(total, _ler_json(os.path.join(pasta(), ARQUIVO_ENCERRADOS)))
+    _somar(total, _ler_json(caminho))
+    _gravar_json(os.path.join(pasta(), ARQUIVO_ENCERRADOS), _como_lista(total))
+    os.remove(caminho)
+
+
+def limpar():
+    """Apaga os arquivos de métricas (início do servidor e testes)."""
+    with _lock:
+        _valores.clear()
+    if os.path.isdir(pasta()):
+        for nome in os.listdir(pasta()):
+            if nome.endswith('.json'):
+                os.remove(os.path.join(pasta(), nome))
+
+
+def somar_processos():
+    """
+    Valores somados de todos os arquivos (processos vivos e encerrados),
+    mais os valores em memória deste processo (no lugar do seu arquivo,
+    que pode estar atrasado ou nem existir).
+    """
+    with _lock:
+        total = {chave: list(valor) if isinstance(valor, list) else valor for chave, valor in _valores.items()}
+    proprio = f'{os.getpid()}.json'
+    if os.path.isdir(pasta()):
+        for nome in sorted(os.listdir(pasta())):
+            if nome.endswith('.json') and nome != proprio:
+                _somar(total, _ler_json(os.path.join(pasta(), nome)))
+    return total
+
+
+# ----------------------------------------------------------------------
+# Formato de exposição em texto
+# ----------------------------------------------------------------------
+def _texto_rotulos(pares):
+    if not pares:
+        return ''
+    escapar = lambda v: v.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return '{' + ','.join(f'{nome}="{escapar(valor)}"' for nome, valor in pares) + '}'
+
+
+def _numero(valor):
+    if math.isinf(valor):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exportar():
+    """Texto no formato de exposição do Prometheus (text/plain; version=0.0.4)."""
+    total = somar_processos()
+    linhas = []
+    for metrica in _registro.values():
+        linhas.append(f'# HELP {metrica.nome} {metrica.ajuda}')
+        linhas.append(f'# TYPE {metrica.nome} {metrica.tipo}')
+        series = sorted((rotulos, valor) for (nome, rotulos), valor in total.items() if nome == metrica.nome)
+        for valores_rotulos, valor in series:
+            pares = list(zip(metrica.rotulos, valores_rotulos))
+            if metrica.tipo == 'counter':
+                linhas.append(f'{metrica.nome}{_texto_rotulos(pares)} {_numero(valor)}')
+                continue
+            acumulado = 0
+            for limite, contagem in zip((*metrica.buckets, math.inf), valor[:-2]):
+                acumulado += contagem
+                rotulos_bucket = _texto_rotulos(pares + [('le', _numero(limite))])
+                linhas.append(f'{metrica.nome}_bucket{rotulos_bucket} {acumulado}')
+            linhas.append(f'{metrica.nome}_sum{_texto_rotulos(pares)} {_numero(valor[-2])}')
+            linhas.append(f'{metrica.nome}_count{_texto_rotulos(pares)} {valor[-1]}')
+    return '\n'.join(linhas) + '\n'
+
+
+# ======================================================================
+# Métricas do projeto
+# ======================================================================
+requisicoes = Histograma(
+    'fusion_http_request_duration_seconds', 'Duração das requisições por rota.',
+    ['view', 'method', 'status'],
+)
+consultas = Contador('fusion_db_queries_total', 'Consultas SQL executadas, por rota.', ['view'])
+tempo_banco = Contador('fusion_db_query_seconds_total', 'Tempo gasto em consultas SQL, por rota.', ['view'])
+cache = Contador('fusion_cache_requests_total', 'Consultas aos caches LRU em memória.', ['cache', 'result'])
+storage = Histograma(
+    'fusion_storage_call_duration_seconds', 'Chamadas ao backend de armazenamento (fora do cache).',
+    ['backend', 'operation'],
+)
+formulario_contato = Contador('fusion_contact_form_submissions_total', 'Envios do formulário de contato.', ['result'])
+email = Histograma('fusion_email_send_duration_seconds', 'Duração do envio de e-mails.', ['result'])
@@ -0,0 +1,233 @@
+# ======================================================================
+# MIDDLEWARES DO PROJETO
+# ======================================================================
+
+import logging
+import os
+import random
+import signal
+import time
+
+from django.conf import settings
+
+from core import log, memory, metrics, profiling, routers, timing
+
+logger = logging.getLogger(__name__)
+timing_logger = logging.getLogger('core.timing')
+
+
+class MemoryWatchdogMiddleware:
+    """
+    Mede a memória residente (RSS) do worker depois de cada requisição e,
+    se passar de settings.MEMORY_WATCHDOG_MAX_RSS_MB, aposenta o worker.
+
+    A aposentadoria é graciosa: o processo envia SIGTERM a si mesmo, o
+    gunicorn termina de entregar a resposta atual, encerra o worker e o
+    processo mestre cria um novo no lugar. Assim a memória volta ao normal
+    sem que o kernel mate a instância inteira por falta de memória (OOM).
+
+    Fora do gunicorn (ex: runserver) apenas registra um aviso no log.
+
+    Configurações:
+    - MEMORY_WATCHDOG_MAX_RSS_MB: limite em MB (None desliga a aposentadoria).
+    - MEMORY_WATCHDOG_CHECK_EVERY: mede a cada N requisições (padrão 1).
+    - MEMORY_TRACEMALLOC: liga o tracemalloc ao iniciar o worker.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limite_mb = getattr(settings, 'MEMORY_WATCHDOG_MAX_RSS_MB', None)
+        self.intervalo = max(1, getattr(settings, 'MEMORY_WATCHDOG_CHECK_EVERY', 1))
+        if getattr(settings, 'MEMORY_TRACEMALLOC', False):
+            memory.iniciar_tracemalloc()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        memory.estatisticas['requisicoes'] += 1
+        if memory.estatisticas['requisicoes'] % self.intervalo == 0:
+            self.verificar(request)
+        return response
+
+    def verificar(self, request):
+        rss = memory.rss_atual_mb()
+        memory.estatisticas['pico_rss_mb'] = max(memory.estatisticas['pico_rss_mb'], rss)
+        if self.limite_mb is None or rss <= self.limite_mb or memory.estatisticas['aposentando']:
+            return
+        memory.estatisticas['aposentando'] = True
+        # Só uma vez: as próximas requisições (gthread) não repetem o sinal.
+        logger.warning(
+            'Worker %s com %.0f MB de RSS (limite %s MB) após %s; aposentando.',
+            os.getpid(), rss, self.limite_mb, request.path,
+        )
+        if memory.em_worker_gunicorn():
+            os.kill(os.getpid(), signal.SIGTERM)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decide, para cada requisição, se as leituras podem ir para as réplicas
+    (ver core/routers.py). Apenas requisições GET/HEAD fora do admin e sem o
+    cookie de "leitura no principal" usam réplicas.
+
+    Quando a requisição grava algo no banco, a resposta leva o cookie
+    REPLICA_STICKY_COOKIE por REPLICA_STICKY_SECONDS: as próximas leituras
+    desse navegador ficam no principal até a réplica alcançar a escrita.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cookie = getattr(settings, 'REPLICA_STICKY_COOKIE', 'usar_primario')
+        self.segundos = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+        self.caminhos_excluidos = tuple(getattr(settings, 'REPLICA_EXCLUDED_PATHS', ['/admin/']))
+
+    def usar_replicas(self, request):
+        return (
+            bool(routers.replicas_configuradas())
+            and request.method in ('GET', 'HEAD')
+            and not request.path.startswith(self.caminhos_excluidos)
+            and self.cookie not in request.COOKIES
+        )
+
+    def __call__(self, request):
+        token = routers.iniciar_requisicao(self.usar_replicas(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            escreveu = routers.encerrar_requisicao(token)
+        if escreveu and routers.replicas_configuradas():
+            response.set_cookie(self.cookie, '1', max_age=self.segundos, httponly=True, samesite='Lax')
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Mede onde vai o tempo de uma requisição: consultas ao banco (quantidade
+    e tempo), renderização de templates e tempo total (ver core/timing.py).
+
+    O resultado vai para:
+    - o cabeçalho Server-Timing, exibido na aba "Network/Timing" do navegador
+      (db, tpl e total, em ms) — para todos quando SERVER_TIMING_PUBLIC,
+      senão só para usuários da equipe (is_staff);
+    - uma linha no log 'core.timing' com os mesmos números (extra 'timing').
+
+    Só uma fração das requisições é medida (SERVER_TIMING_SAMPLE_RATE, de 0
+    a 1): as demais passam direto, sem custo. Deve ficar no início da lista
+    (logo após o RequestIdMiddleware), para o total incluir os outros.
+    Respostas em streaming (API) consultam o banco depois deste ponto: as
+    consultas feitas durante o envio do corpo não entram na conta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.amostragem = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 1.0)
+        self.publico = getattr(settings, 'SERVER_TIMING_PUBLIC', settings.DEBUG)
+        timing.instalar()
+
+    def __call__(self, request):
+        if self.amostragem <= 0 or random.random() >= self.amostragem:
+            return self.get_response(request)
+        with timing.medir() as medicao:
+            response = self.get_response(request)
+        dados = medicao.como_dict()
+        if self.publico or getattr(getattr(request, 'user', None), 'is_staff', False):
+            response['Server-Timing'] = (
+                f'db;dur={dados["banco_ms"]};desc="{dados["consultas"]} consultas", '
+                f'tpl;dur={dados["render_ms"]}, total;dur={dados["total_ms"]}'
+            )
+        timing_logger.info(
+            '%s %s %s total=%.1fms banco=%.1fms consultas=%d render=%.1fms',
+            request.method, request.path, response.status_code,
+            dados['total_ms'], dados['banco_ms'], dados['consultas'], dados['render_ms'],
+            extra={'timing': {'metodo': request.method, 'caminho': request.path,
+                              'status': response.status_code, **dados}},
+        )
+        return response
+
+
+def nome_da_rota(request):
+    """
+    Rótulo 'view' das métricas: o nome da rota ('index', 'api_equipe'...),
+    ou o namespace para o admin e o django-pictures. Rotas inexistentes
+    (404) ficam juntas, para não criar uma série por URL digitada.
+    """
+    rota = getattr(request, 'resolver_match', None)
+    if rota is None:
+        return 'desconhecida'
+    if rota.namespaces and rota.namespaces[0] in ('admin', 'pictures'):
+        return rota.namespaces[0]
+    return rota.url_name or 'desconhecida'
+
+
+class MetricsMiddleware:
+    """
+    Alimenta as métricas do Prometheus (core/metrics.py) em toda requisição:
+    duração por rota, método e status; quantidade e tempo das consultas SQL.
+    Ao final, grava os valores deste worker em disco no máximo uma vez por
+    METRICS_FLUSH_INTERVAL segundos, para a rota /metrics somar os workers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inicio = time.perf_counter()
+        with timing.medir() as medicao:
+            response = self.get_response(request)
+        view = nome_da_rota(request)
+        metrics.requisicoes.observar(
+            time.perf_counter() - inicio, view=view, method=request.method, status=response.status_code,
+        )
+        metrics.consultas.inc(medicao.consultas, view=view)
+        metrics.tempo_banco.inc(medicao.banco, view=view)
+        metrics.gravar_se_preciso()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Perfil sob demanda (core/profiling.py): um usuário da equipe adiciona
+    ?__perfil=amostragem|cprofile (ou o cabeçalho X-Perfil) a qualquer URL
+    e o perfil da requisição é gravado em disco, listado em /admin/perfis/.
+    A resposta traz o cabeçalho X-Perfil com o nome do arquivo gerado.
+
+    Fica depois do AuthenticationMiddleware (precisa de request.user): o
+    perfil cobre a view, os templates e os middlewares seguintes. Para os
+    demais usuários o parâmetro é ignorado.
+    """
+
+    parametro = '__perfil'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        modo = request.GET.get(self.parametro) or request.headers.get('X-Perfil')
+        if modo not in profiling.MODOS or not getattr(request, 'user', None) or not request.user.is_staff:
+            return self.get_response(request)
+        response, arquivo = profiling.perfilar(request, modo, lambda: self.get_response(request))
+        response['X-Perfil'] = arquivo or 'ocupado'
+        # 'ocupado': outro perfil estava em andamento neste worker.
+        return response
+
+
+class RequestIdMiddleware:
+    """
+    Dá um id a cada requisição (core/log.py): todos os registros de log
+    feitos durante ela levam o campo 'request_id', e a resposta leva o
+    cabeçalho X-Request-ID. Um X-Request-ID recebido do proxy é mantido,
+    para ligar os logs do proxy aos da aplicação.
+    """
+
+    cabecalho = 'X-Request-ID'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.id, token = log.iniciar_request_id(request.headers.get(self.cabecalho))
+        try:
+            response = self.get_response(request)
+        finally:
+            log.encerrar_request_id(token)
+        response[self.cabecalho] = request.id
+        return response
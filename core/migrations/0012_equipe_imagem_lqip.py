@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_alter_equipe_bio_alter_equipe_image_height_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipe',
+            name='imagem_lqip',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Placeholder da imagem'),
+        ),
+    ]
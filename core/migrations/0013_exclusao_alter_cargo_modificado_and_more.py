@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_equipe_imagem_lqip'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Exclusao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100, verbose_name='Modelo')),
+                ('objeto_pk', models.CharField(max_length=64, verbose_name='Chave primária')),
+                ('excluido', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Data de exclusão')),
+            ],
+            options={
+                'verbose_name': 'Exclusão',
+                'verbose_name_plural': 'Exclusões',
+            },
+        ),
+        migrations.AlterField(
+            model_name='cargo',
+            name='modificado',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Data de modificação'),
+        ),
+        migrations.AlterField(
+            model_name='equipe',
+            name='modificado',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Data de modificação'),
+        ),
+        migrations.AlterField(
+            model_name='servico',
+            name='modificado',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Data de modificação'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_exclusao_alter_cargo_modificado_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Importacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('arquivo', models.CharField(max_length=255, unique=True, verbose_name='Arquivo')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Checksum')),
+                ('importado', models.DateTimeField(auto_now=True, verbose_name='Data de importação')),
+            ],
+            options={
+                'verbose_name': 'Importação',
+                'verbose_name_plural': 'Importações',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_importacao'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipe',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['id'], include=('cargo', 'nome'), name='equipe_ativo_cobertura_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servico',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['id'], name='servico_ativo_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_equipe_equipe_ativo_cobertura_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EtapaDeploy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=50, unique=True, verbose_name='Etapa')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Impressão digital')),
+                ('executado', models.DateTimeField(auto_now=True, verbose_name='Data de execução')),
+            ],
+            options={
+                'verbose_name': 'Etapa do deploy',
+                'verbose_name_plural': 'Etapas do deploy',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_etapadeploy'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='equipe',
+            name='equipe_ativo_cobertura_idx',
+        ),
+        migrations.AddIndex(
+            model_name='equipe',
+            index=models.Index(condition=models.Q(('ativo', True)), fields=['id'], name='equipe_ativo_idx'),
+        ),
+    ]
@@ -43,6 +43,10 @@ from pictures.models import PictureField
 #   - metadados de largura/altura.
 # Isso facilita trabalhar com imagens em aplicações responsivas.
 
+from core.images import gerar_lqip
+# 'gerar_lqip' cria a miniatura de baixa qualidade (LQIP) usada como
+# placeholder da foto de cada membro da equipe (ver Equipe.imagem_lqip).
+
 # ----------------------------------------------------------------------
 # Função auxiliar para gerar nomes de arquivos únicos
 # ----------------------------------------------------------------------
@@ -97,10 +101,17 @@ class Base(models.Model):
 
     modificado = models.DateTimeField(
         'Data de modificação',
-        auto_now=True
+        auto_now=True,
+        db_index=True
     )
     # 'auto_now=True' → atualiza o campo para a data/hora atual
     # sempre que o objeto for salvo (update).
+    # 'db_index=True' → cria um índice na coluna; o backup incremental
+    # ('export_data --incremental') busca "modificado >= última exportação"
+    # sem varrer a tabela inteira.
+    # Atenção: QuerySet.update() e bulk_update() não aplicam o auto_now.
+    # Quem alterar linhas assim deve gravar 'modificado' junto (ver
+    # backfill_lqip), senão a alteração fica fora dos deltas.
 
     ativo = models.BooleanField(
         'Ativo?',
@@ -187,6 +198,12 @@ class Servico(Base):
     class Meta:
         verbose_name = 'Serviço'
         verbose_name_plural = 'Serviços'
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(ativo=True), name='servico_ativo_idx'),
+        ]
+        # Índice parcial: só contém as linhas com ativo = true, exatamente as
+        # que a página inicial lista. Fica pequeno mesmo com muitos serviços
+        # desativados, e a consulta pública não precisa varrer a tabela.
 
     def __str__(self):
         return self.servico
@@ -251,6 +268,19 @@ class Equipe(Base):
     # Esses campos armazenam largura/altura reais da imagem.
     # São preenchidos automaticamente pelo PictureField.
 
+    imagem_lqip = models.TextField(
+        'Placeholder da imagem',
+        blank=True,
+        default='',
+        editable=False,
+    )
+    # LQIP (Low Quality Image Placeholder): miniatura de ~16px em WEBP,
+    # guardada como data URI ('data:image/webp;base64,...').
+    # - É calculada uma única vez, no upload (ver save()) ou pelo comando
+    #   'python manage.py backfill_lqip' para imagens antigas.
+    # - O template team.html usa esse valor como fundo da foto enquanto
+    #   a imagem real carrega, sem requisição extra.
+
     facebook = models.CharField('Facebook', max_length=100, default='#')
     twitter = models.CharField('X', max_length=100, default='#')
     instagram = models.CharField('Instagram', max_length=100, default='#')
@@ -260,6 +290,32 @@ class Equipe(Base):
     class Meta:
         verbose_name = 'Pessoa'
         verbose_name_plural = 'Pessoas'
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(ativo=True), name='equipe_ativo_idx'),
+        ]
+        # Índice parcial (ativo = true), como o de Servico: a listagem da
+        # equipe percorre só os membros ativos, em ordem de id. Sem INCLUDE:
+        # a listagem lê todas as colunas e junta com Cargo, então uma
+        # varredura só no índice (Index Only Scan) não seria possível.
+        # Obs.: 'modificado' já tem índice (db_index=True em Base), usado
+        # quando o admin ordena pela coluna "Data de modificação".
+
+    def save(self, *args, **kwargs):
+        """
+        Antes de salvar, recalcula o LQIP quando uma nova imagem foi enviada.
+        - 'imagem._committed' é False enquanto o arquivo enviado ainda está
+          em memória (ainda não gravado no storage), ou seja, é um upload novo.
+        - Calcular aqui evita baixar a imagem do storage depois.
+        """
+        if not self.imagem:
+            self.imagem_lqip = ''
+        elif not self.imagem._committed:
+            try:
+                self.imagem_lqip = gerar_lqip(self.imagem.file)
+            except (OSError, ValueError):
+                self.imagem_lqip = ''
+                # Imagem ilegível: o upload segue normalmente, sem placeholder.
+        super().save(*args, **kwargs)
 
     def imagem_480_url(self):
         """
@@ -273,3 +329,112 @@ class Equipe(Base):
     def __str__(self):
         return self.nome
         # Representação amigável → nome da pessoa.
+
+# ======================================================================
+# MODELO EXCLUSAO (registro de exclusões para o backup incremental)
+# ======================================================================
+class Exclusao(models.Model):
+    """
+    Registro ("tombstone") de um objeto apagado de Cargo, Equipe ou Servico.
+    - É criado automaticamente pelo sinal post_delete (ver core/signals.py).
+    - O backup incremental exporta esses registros para que o comando
+      'restore_data' também apague os objetos ao reaplicar os deltas.
+    """
+
+    modelo = models.CharField(
+        'Modelo',
+        max_length=100
+    )
+    # Rótulo do modelo apagado, no formato 'app.modelo' (ex: 'core.equipe').
+
+    objeto_pk = models.CharField(
+        'Chave primária',
+        max_length=64
+    )
+    # Chave primária do objeto apagado (texto, para servir a qualquer modelo).
+
+    excluido = models.DateTimeField(
+        'Data de exclusão',
+        auto_now_add=True,
+        db_index=True
+    )
+    # Momento da exclusão; indexado para a consulta do backup incremental.
+
+    class Meta:
+        verbose_name = 'Exclusão'
+        verbose_name_plural = 'Exclusões'
+
+    def __str__(self):
+        return f'{self.modelo}#{self.objeto_pk}'
+
+# ======================================================================
+# MODELO IMPORTACAO (controle do comando import_snapshot)
+# ======================================================================
+class Importacao(models.Model):
+    """
+    Guarda o checksum (SHA-256) de cada fixture já importada pelo comando
+    'import_snapshot'. Se todos os arquivos tiverem o mesmo checksum da
+    última importação, o comando não faz nada (o deploy pula a etapa).
+    """
+
+    arquivo = models.CharField(
+        'Arquivo',
+        max_length=255,
+        unique=True
+    )
+    # Nome do arquivo de fixture (ex: 'backup_equipe.json').
+
+    checksum = models.CharField(
+        'Checksum',
+        max_length=64
+    )
+    # SHA-256 do conteúdo do arquivo na última importação.
+
+    importado = models.DateTimeField(
+        'Data de importação',
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = 'Importação'
+        verbose_name_plural = 'Importações'
+
+    def __str__(self):
+        return self.arquivo
+
+
+
+# ======================================================================
+# MODELO ETAPADEPLOY (controle do comando deploy_build)
+# ======================================================================
+class EtapaDeploy(models.Model):
+    """
+    Guarda a impressão digital (fingerprint) das entradas de cada etapa do
+    deploy ('migrate', 'collectstatic'...) no último deploy bem-sucedido.
+    Fica no banco, e não em disco, porque cada build do Render começa de
+    um checkout novo: um arquivo local nunca sobreviveria ao próximo deploy.
+    """
+
+    nome = models.CharField(
+        'Etapa',
+        max_length=50,
+        unique=True
+    )
+
+    fingerprint = models.CharField(
+        'Impressão digital',
+        max_length=64
+    )
+    # SHA-256 das entradas da etapa (ver deploy_build.py).
+
+    executado = models.DateTimeField(
+        'Data de execução',
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = 'Etapa do deploy'
+        verbose_name_plural = 'Etapas do deploy'
+
+    def __str__(self):
+        return self.nome
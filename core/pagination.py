@@ -0,0 +1,81 @@
+# ======================================================================
+# PAGINAÇÃO POR CHAVE (KEYSET) COM ORDEM "EMBARALHADA" POR VISITANTE
+# ======================================================================
+# A página inicial exibia todos os serviços e membros da equipe com
+# ORDER BY RANDOM(): o banco precisa ler e ordenar todas as linhas a cada
+# visita, e o HTML cresce junto com a tabela.
+#
+# Aqui a ordem é uma ROTAÇÃO da chave primária a partir de um "pivô"
+# escolhido pela semente do visitante (cookie):
+#     pivô, pivô+1, ..., maior id, 1, 2, ..., pivô-1
+# Cada visitante vê a lista começando de um ponto diferente, mas a ordem é
+# estável entre as páginas, e cada página é uma consulta
+#     WHERE id > último_id_visto ORDER BY id LIMIT n
+# que usa o índice da pk (ou o índice parcial de 'ativo'): o custo de uma
+# página não depende do tamanho da tabela, nem da página pedida.
+#
+# O estado da paginação (pivô, fase da rotação e último id) vai para o
+# navegador como um cursor opaco assinado (django.core.signing).
+
+import random
+
+from django.core import signing
+from django.db.models import Max
+
+SALT = 'core.pagination'
+SEMENTE_MAXIMA = 2 ** 31 - 1
+
+
+def nova_semente():
+    return random.randint(1, SEMENTE_MAXIMA)
+
+
+def pivo_para(queryset, semente):
+    """Id inicial da rotação para esta semente (uma consulta MAX pelo índice)."""
+    maior = queryset.aggregate(maior=Max('pk'))['maior']
+    return 1 + semente % maior if maior else 1
+
+
+def codificar_cursor(estado):
+    return signing.dumps(estado, salt=SALT, compress=True)
+
+
+def decodificar_cursor(cursor):
+    """Levanta signing.BadSignature se o cursor foi alterado ou é inválido."""
+    estado = signing.loads(cursor, salt=SALT)
+    if not isinstance(estado, dict) or not {'p', 'f', 'u'} <= estado.keys():
+        raise signing.BadSignature('Cursor incompleto.')
+    return estado
+
+
+def paginar(queryset, tamanho, estado):
+    """
+    Retorna (itens, próximo_cursor) a partir de 'estado' = {'p': pivô,
+    'f': fase (0 = ids >= pivô, 1 = ids < pivô), 'u': último id ou None}.
+    próximo_cursor é None na última página. Faz no máximo duas consultas
+    (uma por fase), cada uma limitada a 'tamanho' + 1 linhas.
+    """
+    pivo, fase, ultimo = estado['p'], estado['f'], estado['u']
+    itens = []
+    while fase < 2:
+        qs = queryset.filter(pk__gte=pivo) if fase == 0 else queryset.filter(pk__lt=pivo)
+        if ultimo is not None:
+            qs = qs.filter(pk__gt=ultimo)
+        lote = list(qs.order_by('pk')[:tamanho + 1 - len(itens)])
+        itens.extend((fase, objeto) for objeto in lote)
+        if len(itens) > tamanho:
+            break
+            # Uma linha a mais que o tamanho: existe próxima página.
+        fase, ultimo = fase + 1, None
+
+    proximo = None
+    if len(itens) > tamanho:
+        itens = itens[:tamanho]
+        fase_final, ultimo_objeto = itens[-1]
+        proximo = codificar_cursor({'p': pivo, 'f': fase_final, 'u': ultimo_objeto.pk})
+    return [objeto for _, objeto in itens], proximo
+
+
+def primeira_pagina(queryset, tamanho, semente):
+    """Primeira página da rotação definida pela semente do visitante."""
+    return paginar(queryset, tamanho, {'p': pivo_para(queryset, semente), 'f': 0, 'u': None})
@@ -0,0 +1,168 @@
+# ======================================================================
+# CACHE DAS IMAGENS PLACEHOLDER DO DJANGO-PICTURES
+# ======================================================================
+# Com PICTURES["USE_PLACEHOLDERS"] = True, toda URL de versão de imagem
+# aponta para a rota 'pictures/<alt>/<ratio>/<largura>w.<formato>', que
+# desenha e codifica a imagem com o Pillow a cada requisição.
+# Aqui os bytes já codificados ficam guardados:
+#   1. em memória, em um cache LRU por processo;
+#   2. em disco (PICTURES_PLACEHOLDER_CACHE_DIR), compartilhado entre os
+#      workers e entre reinícios do servidor, com no máximo
+#      PICTURES_PLACEHOLDER_CACHE_DIR_MAX_FILES arquivos (os menos usados
+#      recentemente são apagados).
+#
+# A rota é pública: só são atendidos os tamanhos, proporções e formatos
+# que algum PictureField do projeto realmente gera, e textos 'alt' de até
+# ALT_MAXIMO caracteres. Qualquer outra combinação é recusada (ValueError)
+# antes de desenhar ou gravar qualquer coisa.
+
+import hashlib
+import math
+import os
+import tempfile
+from fractions import Fraction
+from functools import lru_cache
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from pictures import conf, utils
+from pictures.models import PictureField
+
+from core.cache import LRUCache
+
+# Cache em memória: chave → (bytes da imagem codificada, etag).
+_memoria = LRUCache(max_entries=getattr(settings, 'PICTURES_PLACEHOLDER_CACHE_SIZE', 256), nome='placeholders')
+
+ALT_MAXIMO = 64
+# O django-pictures usa o nome do arquivo original (um UUID, 36 caracteres).
+
+
+def _pasta_cache():
+    return getattr(settings, 'PICTURES_PLACEHOLDER_CACHE_DIR', None)
+
+
+@lru_cache(maxsize=None)
+def combinacoes_permitidas():
+    """
+    Conjunto de (largura, proporção, formato) que os PictureFields do
+    projeto geram; calculado uma vez por processo, a partir dos models.
+    Proporção None (a da imagem original) não tem placeholder.
+    """
+    densidades = conf.get_settings().PIXEL_DENSITIES
+    combinacoes = set()
+    for modelo in apps.get_models():
+        for campo in modelo._meta.get_fields():
+            if not isinstance(campo, PictureField):
+                continue
+            larguras = {
+                math.floor(campo.container_width * (coluna + 1) / campo.grid_columns * densidade)
+                for coluna in range(campo.grid_columns)
+                for densidade in getattr(campo, 'pixel_densities', None) or densidades
+            }
+            # Mesmas larguras de pictures.utils.source_set, sem o corte pelo
+            # tamanho da imagem original (que só diminui o conjunto).
+            combinacoes.update(
+                (largura, Fraction(proporcao), formato.upper())
+                for largura in larguras
+                for proporcao in campo.aspect_ratios if proporcao
+                for formato in campo.file_types
+            )
+    return frozenset(combinacoes)
+
+
+def chave_placeholder(width, ratio, file_type, alt):
+    """
+    Monta a chave do cache a partir de tamanho, proporção, formato e texto.
+    O texto alternativo ('alt') é desenhado na imagem, então também faz parte.
+    """
+    bruto = f'{width}|{ratio.numerator}x{ratio.denominator}|{file_type.upper()}|{alt}'
+    return hashlib.sha256(bruto.encode('utf-8')).hexdigest()
+
+
+def _gerar(width, ratio, file_type, alt):
+    # Mesma lógica de pictures.views.placeholder, mas retornando os bytes.
+    height = math.floor(width / ratio)
+    img = utils.placeholder(width, height, alt=alt)
+    buffer = BytesIO()
+    img.save(buffer, file_type.upper())
+    return buffer.getvalue()
+
+
+def _ler_disco(chave):
+    pasta = _pasta_cache()
+    if not pasta:
+        return None
+    caminho = os.path.join(pasta, chave)
+    try:
+        with open(caminho, 'rb') as f:
+            conteudo = f.read()
+        os.utime(caminho)
+        # A data de modificação marca o último uso (ver _limitar_disco).
+        return conteudo
+    except OSError:
+        return None
+
+
+def _limitar_disco(pasta):
+    # Apaga os arquivos usados há mais tempo até sobrar o máximo permitido.
+    maximo = getattr(settings, 'PICTURES_PLACEHOLDER_CACHE_DIR_MAX_FILES', 1000)
+    try:
+        arquivos = [entrada for entrada in os.scandir(pasta) if entrada.is_file()]
+        if len(arquivos) <= maximo:
+            return
+        arquivos.sort(key=lambda entrada: entrada.stat().st_mtime)
+        for entrada in arquivos[:len(arquivos) - maximo]:
+            os.remove(entrada.path)
+    except OSError:
+        pass
+        # Outro worker pode ter apagado o mesmo arquivo antes.
+
+
+def _gravar_disco(chave, conteudo):
+    pasta = _pasta_cache()
+    if not pasta:
+        return
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=pasta)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(conteudo)
+        os.replace(temporario, os.path.join(pasta, chave))
+        # Grava em um arquivo temporário e renomeia: outro worker lendo o
+        # mesmo arquivo nunca vê um conteúdo pela metade.
+    except OSError:
+        return
+        # Falha de disco não impede a resposta; fica apenas o cache em memória.
+    _limitar_disco(pasta)
+
+
+def obter_placeholder(width, ratio, file_type, alt):
+    """
+    Retorna (bytes, etag) do placeholder pedido, gerando-o somente quando
+    não estiver nem em memória nem em disco.
+
+    Levanta ValueError para proporção, largura, formato ou texto que o
+    projeto não usa (ver combinacoes_permitidas).
+    """
+    if not isinstance(ratio, Fraction):
+        ratio = Fraction(ratio.replace('x', '/'))
+    if file_type.upper() not in conf.get_settings().FILE_TYPES:
+        raise ValueError('Tipo de arquivo não permitido')
+    if (width, ratio, file_type.upper()) not in combinacoes_permitidas():
+        raise ValueError('Tamanho ou proporção não configurados')
+    if len(alt) > ALT_MAXIMO:
+        raise ValueError('Texto alternativo muito longo')
+
+    chave = chave_placeholder(width, ratio, file_type, alt)
+    item = _memoria.get(chave)
+    if item is None:
+        conteudo = _ler_disco(chave)
+        if conteudo is None:
+            conteudo = _gerar(width, ratio, file_type, alt)
+            _gravar_disco(chave, conteudo)
+        etag = hashlib.sha256(conteudo).hexdigest()[:32]
+        # ETag forte: derivado dos próprios bytes entregues.
+        item = (conteudo, etag)
+        _memoria.set(chave, item)
+    return item
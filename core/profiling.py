@@ -0,0 +1,176 @@
+# ======================================================================
+# PERFIL (PROFILE) DE UMA REQUISIÇÃO, SOB DEMANDA, PARA A EQUIPE
+# ======================================================================
+# Um usuário da equipe (is_staff, logado pelo admin) pede o perfil de
+# qualquer requisição, em produção, sem novo deploy:
+#     /?__perfil=amostragem          (ou cabeçalho  X-Perfil: amostragem)
+#     /admin/core/servico/?__perfil=cprofile
+#
+# Modos:
+#   - amostragem: uma thread lê a pilha da thread da requisição a cada
+#     PROFILING_SAMPLE_INTERVAL segundos. Custo baixo e constante. Gera um
+#     arquivo '.folded' (uma pilha por linha + quantidade de amostras), o
+#     formato aceito por flamegraph.pl, speedscope.app e inferno;
+#   - cprofile: cProfile mede cada chamada de função (custo alto, números
+#     exatos). Gera '.prof' (pstats: snakeviz, 'python -m pstats',
+#     flameprof para flamegraph) e '.txt' com as funções mais caras.
+#
+# Os arquivos ficam em PROFILING_DIR (no máximo PROFILING_MAX_FILES) e
+# aparecem em /admin/perfis/.
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+MODOS = {
+    'amostragem': ('.folded',),
+    'cprofile': ('.prof', '.txt'),
+}
+# Modo → extensões geradas (a primeira é o arquivo principal).
+
+_em_andamento = threading.Lock()
+# Um perfil por processo de cada vez: cProfile não aceita dois ativos, e
+# dois perfis simultâneos distorceriam um ao outro.
+
+
+def pasta():
+    return getattr(settings, 'PROFILING_DIR', os.path.join(settings.BASE_DIR, '.cache', 'perfis'))
+
+
+class Amostrador:
+    """Coleta a pilha da thread atual periodicamente, em outra thread."""
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._alvo = threading.get_ident()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._coletar, name='perfil-amostragem', daemon=True)
+
+    @staticmethod
+    def _nome(codigo):
+        arquivo = codigo.co_filename
+        if arquivo.startswith(str(settings.BASE_DIR)):
+            arquivo = os.path.relpath(arquivo, settings.BASE_DIR)
+        else:
+            arquivo = os.path.basename(arquivo)
+        return f'{codigo.co_name} ({arquivo}:{codigo.co_firstlineno})'.replace(';', ':')
+        # ';' separa os quadros no formato .folded.
+
+    def _coletar(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self._alvo)
+            pilha = []
+            while quadro is not None:
+                pilha.append(self._nome(quadro.f_code))
+                quadro = quadro.f_back
+            if pilha:
+                self.pilhas[';'.join(reversed(pilha))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+
+    def folded(self):
+        return ''.join(f'{pilha} {quantidade}\n' for pilha, quantidade in self.pilhas.most_common())
+
+
+def _slug(texto):
+    return re.sub(r'[^A-Za-z0-9]+', '-', texto).strip('-')[:60] or 'raiz'
+
+
+def _gravar(nome, conteudo):
+    modo = 'wb' if isinstance(conteudo, bytes) else 'w'
+    with open(os.path.join(pasta(), nome), modo) as saida:
+        saida.write(conteudo)
+
+
+def _limpar_antigos():
+    maximo = getattr(settings, 'PROFILING_MAX_FILES', 50)
+    arquivos = listar()
+    for perfil in arquivos[maximo:]:
+        for nome in perfil['arquivos']:
+            try:
+                os.remove(os.path.join(pasta(), nome))
+            except FileNotFoundError:
+                pass
+
+
+def perfilar(request, modo, executar):
+    """
+    Executa executar() sob o perfil 'modo' e grava os arquivos.
+    Retorna (resposta, nome do arquivo principal), ou (resposta, None) se
+    outro perfil já estiver em andamento neste processo.
+    """
+    if not _em_andamento.acquire(blocking=False):
+        return executar(), None
+    try:
+        inicio = time.perf_counter()
+        if modo == 'cprofile':
+            perfil = cProfile.Profile()
+            resposta = perfil.runcall(executar)
+        else:
+            with Amostrador(getattr(settings, 'PROFILING_SAMPLE_INTERVAL', 0.001)) as amostrador:
+                resposta = executar()
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+    finally:
+        _em_andamento.release()
+
+    os.makedirs(pasta(), exist_ok=True)
+    base = (
+        f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{modo}_{duracao_ms:.0f}ms_"
+        f"{request.method}_{_slug(request.path)}"
+    )
+    if modo == 'cprofile':
+        perfil.dump_stats(os.path.join(pasta(), base + '.prof'))
+        resumo = io.StringIO()
+        pstats.Stats(perfil, stream=resumo).sort_stats('cumulative').print_stats(60)
+        _gravar(base + '.txt', f'{request.method} {request.get_full_path()}\n{resumo.getvalue()}')
+    else:
+        _gravar(base + '.folded', amostrador.folded())
+    _limpar_antigos()
+    return resposta, base + MODOS[modo][0]
+
+
+_NOME = re.compile(r'^(\d{8}-\d{6})_(\d+)_(\w+?)_(\d+)ms_([A-Z]+)_(.+)$')
+
+
+def listar():
+    """Perfis gravados, do mais recente ao mais antigo."""
+    if not os.path.isdir(pasta()):
+        return []
+    perfis = {}
+    for nome in os.listdir(pasta()):
+        base, extensao = os.path.splitext(nome)
+        encontrado = _NOME.match(base)
+        if not encontrado or encontrado.group(3) not in MODOS or extensao not in MODOS[encontrado.group(3)]:
+            continue
+        quando, pid, modo, duracao, metodo, caminho = encontrado.groups()
+        perfil = perfis.setdefault(base, {
+            'base': base, 'quando': quando, 'pid': int(pid), 'modo': modo,
+            'duracao_ms': int(duracao), 'metodo': metodo, 'caminho': caminho, 'arquivos': [],
+        })
+        perfil['arquivos'].append(nome)
+    for perfil in perfis.values():
+        perfil['arquivos'].sort(key=lambda nome: MODOS[perfil['modo']].index(os.path.splitext(nome)[1]))
+    return sorted(perfis.values(), key=lambda p: p['base'], reverse=True)
+
+
+def caminho_do_arquivo(nome):
+    """Caminho de um arquivo de perfil listado; None para qualquer outro nome."""
+    for perfil in listar():
+        if nome in perfil['arquivos']:
+            return os.path.join(pasta(), nome)
+    return None
@@ -0,0 +1,153 @@
+# ======================================================================
+# ROTEADOR DE BANCO: LEITURAS PÚBLICAS NAS RÉPLICAS
+# ======================================================================
+# Com réplicas configuradas (DATABASE_REPLICA_URLS, ver settings.py), as
+# leituras feitas pelas páginas públicas (ex: Servico e Equipe na página
+# inicial) vão para uma réplica, aliviando o banco principal. Continuam
+# no principal ('default'):
+#   - toda escrita;
+#   - todas as leituras fora de uma requisição (comandos, shell, testes);
+#   - requisições do admin e requisições não seguras (POST, PUT...);
+#   - leituras feitas depois de uma escrita na mesma requisição, e nas
+#     requisições seguintes do mesmo navegador por REPLICA_STICKY_SECONDS
+#     (cookie), para que o usuário sempre veja o que acabou de gravar;
+#   - leituras dentro de transaction.atomic() no principal;
+#   - leituras quando nenhuma réplica está saudável (fora do ar ou com
+#     atraso de replicação acima de REPLICA_MAX_LAG_SECONDS).
+
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_estado = contextvars.ContextVar('roteamento_replicas', default=None)
+# Estado da requisição atual: {'replicas': bool, 'escreveu': bool}.
+# None fora de uma requisição (as leituras ficam no principal).
+
+
+def replicas_configuradas():
+    return list(getattr(settings, 'REPLICA_DATABASES', []))
+
+
+# ----------------------------------------------------------------------
+# Controle pela requisição (usado pelo ReplicaRoutingMiddleware)
+# ----------------------------------------------------------------------
+def iniciar_requisicao(usar_replicas):
+    """Abre o estado da requisição; retorna o token para encerrar_requisicao()."""
+    return _estado.set({'replicas': usar_replicas, 'escreveu': False})
+
+
+def encerrar_requisicao(token):
+    """Fecha o estado da requisição; retorna True se houve escrita nela."""
+    estado = _estado.get()
+    _estado.reset(token)
+    return bool(estado and estado['escreveu'])
+
+
+# ----------------------------------------------------------------------
+# Saúde das réplicas
+# ----------------------------------------------------------------------
+_saude = {}
+_saude_lock = threading.Lock()
+# alias -> (saudavel, verificado_em, verificando); cache por processo.
+
+
+def atraso_replicacao(alias):
+    """
+    Atraso da réplica em segundos (0 se não for uma réplica física, ex: a
+    cópia em SQLite usada em testes). Levanta exceção se ela estiver fora do ar.
+    """
+    conexao = connections[alias]
+    with conexao.cursor() as cursor:
+        if conexao.vendor != 'postgresql':
+            cursor.execute('SELECT 1')
+            return 0.0
+        cursor.execute(
+            'SELECT CASE WHEN pg_is_in_recovery() '
+            'THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) '
+            'ELSE 0 END'
+        )
+        return float(cursor.fetchone()[0])
+
+
+def replica_saudavel(alias):
+    """
+    True se a réplica responde e está com atraso aceitável. O resultado
+    fica em cache por REPLICA_CHECK_INTERVAL segundos.
+
+    Só uma thread por vez faz a verificação (que pode demorar até
+    REPLICA_CONNECT_TIMEOUT com a réplica fora do ar); enquanto isso, as
+    outras usam o resultado anterior, ou consideram a réplica indisponível
+    se ainda não houver um, e leem do principal sem esperar.
+    """
+    agora = time.monotonic()
+    intervalo = getattr(settings, 'REPLICA_CHECK_INTERVAL', 5)
+    with _saude_lock:
+        saudavel, verificado_em, verificando = _saude.get(alias, (None, 0, False))
+        if verificando or (saudavel is not None and agora - verificado_em < intervalo):
+            return bool(saudavel)
+        _saude[alias] = (saudavel, verificado_em, True)
+    saudavel = False
+    try:
+        atraso = atraso_replicacao(alias)
+        saudavel = atraso <= getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 10)
+        if not saudavel:
+            logger.warning('Réplica %s com %.1fs de atraso; usando o banco principal.', alias, atraso)
+    except Exception:
+        logger.warning('Réplica %s indisponível; usando o banco principal.', alias, exc_info=True)
+        if alias in connections.settings:
+            connections[alias].close()
+            # Descarta a conexão quebrada; a próxima verificação abre outra.
+    finally:
+        with _saude_lock:
+            _saude[alias] = (saudavel, time.monotonic(), False)
+    return saudavel
+
+
+def limpar_saude():
+    """Esquece as verificações feitas (usado nos testes)."""
+    with _saude_lock:
+        _saude.clear()
+
+
+# ----------------------------------------------------------------------
+# Roteador
+# ----------------------------------------------------------------------
+class ReplicaRouter:
+    """Roteador registrado em settings.DATABASE_ROUTERS."""
+
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if not estado or not estado['replicas'] or estado['escreveu']:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+            # Dentro de uma transação, a leitura precisa ver o que ela gravou.
+        saudaveis = [alias for alias in replicas_configuradas() if replica_saudavel(alias)]
+        return random.choice(saudaveis) if saudaveis else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            estado['escreveu'] = True
+            # A partir daqui, as leituras desta requisição vão para o principal.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bancos = {DEFAULT_DB_ALIAS, *replicas_configuradas()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+            # Réplicas têm os mesmos dados do principal.
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas_configuradas():
+            return False
+            # As réplicas recebem o esquema pela replicação do principal.
+        return None
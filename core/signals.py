@@ -0,0 +1,47 @@
+# ======================================================================
+# SINAIS DO APP CORE
+# ======================================================================
+# Conectados em CoreConfig.ready() (core/apps.py).
+
+import contextvars
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete
+
+from core.models import Cargo, Equipe, Exclusao, Servico
+
+MODELOS_COM_BACKUP = (Cargo, Equipe, Servico)
+# Modelos exportados pelo comando export_data.
+
+_suspenso = contextvars.ContextVar('exclusoes_suspensas', default=False)
+
+
+@contextmanager
+def sem_registro_de_exclusoes():
+    """
+    Não grava Exclusao para o que for apagado dentro do bloco (apenas na
+    thread atual). Usado pelo 'restore_data' ao reaplicar exclusões que
+    já estão registradas no backup.
+    """
+    token = _suspenso.set(True)
+    try:
+        yield
+    finally:
+        _suspenso.reset(token)
+
+
+def registrar_exclusao(sender, instance, **kwargs):
+    """
+    Grava um registro em Exclusao sempre que um objeto de um dos modelos
+    com backup é apagado (inclusive em cascata, ex: Cargo → Equipe).
+    O backup incremental usa esses registros como "tombstones".
+    """
+    if _suspenso.get():
+        return
+    Exclusao.objects.create(modelo=sender._meta.label_lower, objeto_pk=str(instance.pk))
+
+
+for modelo in MODELOS_COM_BACKUP:
+    post_delete.connect(registrar_exclusao, sender=modelo, dispatch_uid=f'exclusao_{modelo.__name__}')
+    # Conecta apenas aos modelos com backup: os demais continuam podendo
+    # usar o "fast delete" do Django (DELETE sem carregar os objetos).
@@ -0,0 +1,274 @@
+# ======================================================================
+# REGISTRO DE CONSULTAS LENTAS (SLOW QUERY LOG)
+# ======================================================================
+# Opcional: ligado com a variável de ambiente SLOW_QUERY_MS (ver
+# settings.py). Cada conexão aberta com o banco recebe um execute_wrapper
+# que cronometra as consultas; as que passam do limite são gravadas, uma
+# linha JSON por consulta, em SLOW_QUERY_LOG_FILE.<pid> (um arquivo rotativo
+# por processo) com:
+#   - SQL, parâmetros e duração;
+#   - "impressão digital" (fingerprint): o SQL sem os valores literais, que
+#     agrupa as execuções da mesma consulta com parâmetros diferentes;
+#   - a linha do código do projeto e a linha do template que dispararam a
+#     consulta (ex: {{ e.cargo }} em team.html, uma consulta por membro);
+#   - opcionalmente (SLOW_QUERY_EXPLAIN), o plano de execução com
+#     EXPLAIN (ANALYZE, BUFFERS) na primeira vez que cada fingerprint
+#     aparece neste processo. Só para SELECT: ANALYZE executa a consulta.
+#
+# A página /admin/consultas-lentas/ lê os arquivos de todos os processos e
+# lista as piores consultas. Cada worker do gunicorn escreve e rotaciona só
+# o seu arquivo: RotatingFileHandlers de processos diferentes no mesmo
+# arquivo rotacionariam uns por cima dos outros e perderiam linhas.
+
+import contextvars
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from core import log, timing
+
+logger = logging.getLogger(__name__)
+
+_explicados = set()
+# Fingerprints que já tiveram o plano capturado neste processo.
+_dentro = contextvars.ContextVar('consulta_lenta_em_andamento', default=False)
+# True enquanto o próprio registro executa o EXPLAIN (evita recursão).
+
+_PASTA_PROJETO = str(settings.BASE_DIR)
+_IGNORADOS = (os.sep + 'site-packages' + os.sep, __file__, timing.__file__)
+# Os próprios execute_wrappers do projeto não contam como origem.
+
+
+# ----------------------------------------------------------------------
+# Impressão digital
+# ----------------------------------------------------------------------
+_LITERAIS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)'), '(?+)'),
+    # IN (?, ?, ?) com qualquer quantidade de itens vira IN (?+).
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalizar(sql):
+    for padrao, troca in _LITERAIS:
+        sql = padrao.sub(troca, sql)
+    return sql.strip()
+
+
+def impressao_digital(sql):
+    return hashlib.sha1(normalizar(sql).encode()).hexdigest()[:12]
+
+
+# ----------------------------------------------------------------------
+# Origem: linha do projeto e linha do template
+# ----------------------------------------------------------------------
+def origem():
+    """
+    Retorna (linha do código do projeto, linha do template) que disparou a
+    consulta atual, ex: ('core/views.py:140 in get_context_data',
+    'team_itens.html:12'). None quando não houver.
+    """
+    codigo = template = None
+    quadro = sys._getframe(1)
+    while quadro is not None and (codigo is None or template is None):
+        caminho = quadro.f_code.co_filename
+        if template is None and quadro.f_code.co_name == 'render_annotated':
+            no = quadro.f_locals.get('self')
+            # Node do template sendo renderizado (o mais interno vem primeiro).
+            origem_no, token = getattr(no, 'origin', None), getattr(no, 'token', None)
+            if origem_no is not None and token is not None:
+                template = f'{origem_no.template_name}:{token.lineno}'
+        elif codigo is None and caminho.startswith(_PASTA_PROJETO) and not any(i in caminho for i in _IGNORADOS):
+            codigo = f'{os.path.relpath(caminho, _PASTA_PROJETO)}:{quadro.f_lineno} in {quadro.f_code.co_name}'
+        quadro = quadro.f_back
+    return codigo, template
+
+
+# ----------------------------------------------------------------------
+# Plano de execução
+# ----------------------------------------------------------------------
+def capturar_plano(conexao, sql, params):
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    prefixo = 'EXPLAIN (ANALYZE, BUFFERS) ' if conexao.vendor == 'postgresql' else 'EXPLAIN QUERY PLAN '
+    # Outros bancos (ex: SQLite em desenvolvimento) não têm ANALYZE: só o plano.
+    token = _dentro.set(True)
+    try:
+        with conexao.cursor() as cursor:
+            cursor.execute(prefixo + sql, params)
+            return '\n'.join(str(linha[-1]) for linha in cursor.fetchall())
+    except Exception as erro:
+        return f'EXPLAIN falhou: {erro}'
+    finally:
+        _dentro.reset(token)
+
+
+# ----------------------------------------------------------------------
+# execute_wrapper
+# ----------------------------------------------------------------------
+def registrar(execute, sql, params, many, context):
+    if _dentro.get():
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    resultado = execute(sql, params, many, context)
+    # Se a consulta falhou, a exceção sobe sem registro: com a transação
+    # abortada (PostgreSQL) o EXPLAIN também falharia, e o erro já aparece
+    # no log da requisição.
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    limite_ms = getattr(settings, 'SLOW_QUERY_MS', None)
+    if limite_ms is not None and duracao_ms >= limite_ms:
+        _gravar(context['connection'], sql, params, many, duracao_ms)
+    return resultado
+
+
+def _gravar(conexao, sql, params, many, duracao_ms):
+    digital = impressao_digital(sql)
+    codigo, template = origem()
+    registro = {
+        'quando': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'pid': os.getpid(),
+        'banco': conexao.alias,
+        'duracao_ms': round(duracao_ms, 2),
+        'fingerprint': digital,
+        'sql': sql,
+        'params': repr(params)[:500] if not many else f'executemany ({len(params)} linhas)',
+        'codigo': codigo,
+        'template': template,
+    }
+    if getattr(settings, 'SLOW_QUERY_EXPLAIN', False) and not many and digital not in _explicados:
+        _explicados.add(digital)
+        registro['plano'] = capturar_plano(conexao, sql, params)
+    logger.warning(json.dumps(registro, ensure_ascii=False, default=str))
+
+
+# ----------------------------------------------------------------------
+# Arquivo por processo
+# ----------------------------------------------------------------------
+class ArquivoPorProcesso(RotatingFileHandler):
+    """
+    RotatingFileHandler em '<arquivo>.<pid>'. Com preload_app o handler é
+    criado no processo mestre; depois do fork, cada worker passa a escrever
+    (e rotacionar) o arquivo com o seu próprio pid.
+    """
+
+    def __init__(self, arquivo, maximo_arquivos, **kwargs):
+        self.arquivo = arquivo
+        self.maximo_arquivos = maximo_arquivos
+        super().__init__(self._caminho(), delay=True, **kwargs)
+        # delay: o arquivo só é criado na primeira consulta lenta (o mestre
+        # não executa consultas e não deixa um arquivo vazio).
+        os.register_at_fork(after_in_child=self._trocar_de_processo)
+
+    def _caminho(self):
+        return os.path.abspath(f'{self.arquivo}.{os.getpid()}')
+
+    def _trocar_de_processo(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        self.baseFilename = self._caminho()
+
+    def _open(self):
+        limpar_antigos(self.arquivo, self.maximo_arquivos)
+        return super()._open()
+
+
+def limpar_antigos(arquivo, maximo):
+    """
+    Apaga os arquivos mais antigos (por data de modificação) além dos
+    'maximo' mais recentes. Os workers reciclados (max_requests) deixam os
+    seus arquivos para trás; sem isso a pasta cresceria sem limite.
+    """
+    caminhos = []
+    for caminho in glob.glob(glob.escape(arquivo) + '.*'):
+        try:
+            caminhos.append((os.path.getmtime(caminho), caminho))
+        except OSError:
+            continue
+            # Apagado por outro processo no meio da listagem.
+    for _, caminho in sorted(caminhos, reverse=True)[maximo:]:
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+
+def _instalar_na_conexao(sender, connection, **kwargs):
+    if registrar not in connection.execute_wrappers:
+        connection.execute_wrappers.append(registrar)
+        # O objeto de conexão é reaproveitado quando o Django reconecta;
+        # connection_created dispara de novo, mas o wrapper entra uma vez.
+
+
+def instalar():
+    """
+    Liga o registro (chamado por CoreConfig.ready() quando SLOW_QUERY_MS
+    está definido): arquivo rotativo do processo + wrapper em cada conexão nova.
+    """
+    arquivo = settings.SLOW_QUERY_LOG_FILE
+    if not any(isinstance(h, log.FilaHandler) for h in logger.handlers):
+        os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+        arquivo_rotativo = ArquivoPorProcesso(
+            arquivo, settings.SLOW_QUERY_LOG_MAX_FILES, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUPS, encoding='utf-8',
+        )
+        arquivo_rotativo.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(log.FilaHandler(destino=arquivo_rotativo))
+        # A escrita no arquivo fica na thread do logging (core/log.py), fora da requisição.
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+        # O JSON vai só para o arquivo, sem repetir no console.
+    connection_created.connect(_instalar_na_conexao, dispatch_uid='core.slowqueries')
+
+
+# ----------------------------------------------------------------------
+# Leitura (página do admin)
+# ----------------------------------------------------------------------
+def ler_registros(arquivo=None):
+    """Registros dos arquivos de todos os processos e dos rotacionados (.1, .2...)."""
+    arquivo = arquivo or settings.SLOW_QUERY_LOG_FILE
+    registros = []
+    for caminho in sorted(glob.glob(glob.escape(arquivo) + '*')):
+        with open(caminho, encoding='utf-8') as entrada:
+            for linha in entrada:
+                try:
+                    registros.append(json.loads(linha))
+                except ValueError:
+                    continue
+                    # Linha que o processo dono ainda está escrevendo.
+    return registros
+
+
+def piores(registros, limite=50):
+    """
+    Agrupa por fingerprint e ordena pelo tempo total gasto. Cada item traz
+    quantidade, total, média e máximo (ms), o exemplo mais lento e o plano.
+    """
+    grupos = {}
+    for registro in registros:
+        grupo = grupos.setdefault(registro['fingerprint'], {
+            'fingerprint': registro['fingerprint'], 'quantidade': 0, 'total_ms': 0.0,
+            'max_ms': 0.0, 'exemplo': registro, 'plano': None, 'origens': set(),
+        })
+        grupo['quantidade'] += 1
+        grupo['total_ms'] += registro['duracao_ms']
+        if registro['duracao_ms'] >= grupo['max_ms']:
+            grupo['max_ms'], grupo['exemplo'] = registro['duracao_ms'], registro
+        grupo['plano'] = grupo['plano'] or registro.get('plano')
+        grupo['origens'].add(' / '.join(filter(None, [registro.get('codigo'), registro.get('template')])) or '?')
+    for grupo in grupos.values():
+        grupo['media_ms'] = grupo['total_ms'] / grupo['quantidade']
+        grupo['origens'] = sorted(grupo['origens'])
+    return sorted(grupos.values(), key=lambda g: g['total_ms'], reverse=True)[:limite]
@@ -0,0 +1,57 @@
+/* Carregamento sob demanda das seções de serviços e equipe.
+   Cada ".carregar-mais" traz em data-url o endereço da próxima página
+   (EquipeFragmentoView / ServicosFragmentoView, com o cursor keyset).
+   A página é buscada quando o botão aparece na tela ou é clicado, e o
+   HTML recebido (itens + novo botão, se houver mais) substitui o botão.
+========================================================*/
+(function () {
+
+  "use strict";
+
+  function carregar(marcador) {
+    if (marcador.dataset.carregando) {
+      return;
+    }
+    marcador.dataset.carregando = "1";
+    fetch(marcador.dataset.url, { headers: { "X-Requested-With": "XMLHttpRequest" } })
+      .then(function (resposta) {
+        if (!resposta.ok) {
+          throw new Error(resposta.status);
+        }
+        return resposta.text();
+      })
+      .then(function (html) {
+        marcador.insertAdjacentHTML("afterend", html);
+        marcador.remove();
+        observar();
+      })
+      .catch(function () {
+        delete marcador.dataset.carregando;
+        // Falhou: o botão continua na tela para uma nova tentativa.
+      });
+  }
+
+  var observador = "IntersectionObserver" in window
+    ? new IntersectionObserver(function (entradas) {
+        entradas.forEach(function (entrada) {
+          if (entrada.isIntersecting) {
+            observador.unobserve(entrada.target);
+            carregar(entrada.target);
+          }
+        });
+      }, { rootMargin: "200px" })
+    : null;
+
+  function observar() {
+    document.querySelectorAll(".carregar-mais:not([data-observado])").forEach(function (marcador) {
+      marcador.dataset.observado = "1";
+      marcador.addEventListener("click", function () { carregar(marcador); });
+      if (observador) {
+        observador.observe(marcador);
+      }
+    });
+  }
+
+  document.addEventListener("DOMContentLoaded", observar);
+
+})();
@@ -0,0 +1,225 @@
+# ======================================================================
+# BACKENDS DE ARMAZENAMENTO COM CACHE DE URL E METADADOS
+# ======================================================================
+# O template 'team.html' chama 'Equipe.imagem_480_url()' para cada membro
+# da equipe em toda requisição. Com o backend do Google Cloud Storage isso
+# significa, a cada chamada:
+#   - gerar uma URL assinada (assinatura RSA com a chave da service account);
+#   - ou, para exists()/size() (usados pelo 'pictures'), uma chamada HTTP
+#     à API do GCS para buscar os metadados do objeto.
+# Este módulo oferece um mixin que memoriza essas respostas em um cache
+# LRU (Least Recently Used) por processo, respeitando o prazo de validade
+# das URLs assinadas e invalidando as entradas em save()/delete().
+
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.files.storage import FileSystemStorage, InMemoryStorage
+from django.core.files.storage.memory import InMemoryDirNode
+from storages.backends.gcloud import GoogleCloudStorage
+
+from core import metrics
+from core.cache import AUSENTE, LRUCache
+from core.gcs import get_client
+
+
+class CachedStorageMixin:
+    """
+    Mixin que adiciona cache de URL e de metadados a qualquer backend de
+    armazenamento do Django.
+
+    Deve vir antes da classe do backend na herança, por exemplo:
+        class CachedGoogleCloudStorage(CachedStorageMixin, GoogleCloudStorage)
+
+    Opções aceitas (também via STORAGES[...]['OPTIONS']):
+    - cache_max_entries: tamanho máximo do cache LRU (padrão 2048).
+    - cache_url_ttl: validade, em segundos, das URLs em cache.
+      None = não expira (URLs públicas/determinísticas).
+    - cache_metadata_ttl: validade, em segundos, de exists/size/datas
+      (padrão 300). Protege contra alterações feitas por outro processo.
+
+    Cada chamada que chega ao backend real (fora do cache) é cronometrada na
+    métrica fusion_storage_call_duration_seconds{backend=nome_metricas}, e
+    os acertos/faltas do cache vão para fusion_cache_requests_total.
+    """
+
+    nome_metricas = 'storage'
+    cache_max_entries = 2048
+    cache_url_ttl = None
+    cache_metadata_ttl = 300
+
+    def __init__(self, *args, cache_max_entries=None, cache_url_ttl=None,
+                 cache_metadata_ttl=None, **kwargs):
+        # As opções do cache são retiradas antes de chamar o backend real,
+        # pois o BaseStorage do django-storages rejeita opções desconhecidas.
+        super().__init__(*args, **kwargs)
+        if cache_max_entries is not None:
+            self.cache_max_entries = cache_max_entries
+        if cache_url_ttl is not None:
+            self.cache_url_ttl = cache_url_ttl
+        if cache_metadata_ttl is not None:
+            self.cache_metadata_ttl = cache_metadata_ttl
+        self._cache = LRUCache(self.cache_max_entries, nome=f'storage_{self.nome_metricas}')
+
+    # ------------------------------------------------------------------
+    # Pontos de extensão
+    # ------------------------------------------------------------------
+    def get_url_cache_ttl(self, name):
+        """
+        Retorna por quantos segundos a URL de 'name' pode ser reaproveitada.
+        Backends com URLs assinadas sobrescrevem este método.
+        """
+        return self.cache_url_ttl
+
+    def _medir(self, operacao):
+        return metrics.storage.cronometrar(backend=self.nome_metricas, operation=operacao)
+
+    def _cached(self, tipo, name, ttl, carregar):
+        # Busca (tipo, name) no cache; se não existir, chama 'carregar()'
+        # e guarda o resultado pelo tempo 'ttl'.
+        chave = (tipo, name)
+        valor = self._cache.get(chave, AUSENTE)
+        if valor is AUSENTE:
+            with self._medir(tipo):
+                valor = carregar()
+            self._cache.set(chave, valor, ttl)
+        return valor
+
+    def invalidate(self, name):
+        """Descarta do cache tudo o que se refere ao arquivo 'name'."""
+        self._cache.invalidate(lambda chave: chave[1] == name)
+
+    # ------------------------------------------------------------------
+    # URL
+    # ------------------------------------------------------------------
+    def url(self, name, *args, **kwargs):
+        if args or kwargs:
+            # Parâmetros extras (ex: 'parameters' do GCS) geram URLs
+            # diferentes; nesse caso o cache é ignorado.
+            with self._medir('url'):
+                return super().url(name, *args, **kwargs)
+        return self._cached(
+            'url', name, self.get_url_cache_ttl(name),
+            lambda: super(CachedStorageMixin, self).url(name),
+        )
+
+    # ------------------------------------------------------------------
+    # Metadados
+    # ------------------------------------------------------------------
+    def exists(self, name):
+        chave = ('exists', name)
+        if self._cache.get(chave, False):
+            return True
+        with self._medir('exists'):
+            existe = super().exists(name)
+        if existe:
+            self._cache.set(chave, True, self.cache_metadata_ttl)
+        # Apenas respostas positivas vão para o cache: get_available_name()
+        # usa exists() para evitar sobrescrever arquivos, e um "não existe"
+        # desatualizado poderia apagar o upload de outro processo.
+        return existe
+
+    def size(self, name):
+        return self._cached(
+            'size', name, self.cache_metadata_ttl,
+            lambda: super(CachedStorageMixin, self).size(name),
+        )
+
+    def get_modified_time(self, name):
+        return self._cached(
+            'modified_time', name, self.cache_metadata_ttl,
+            lambda: super(CachedStorageMixin, self).get_modified_time(name),
+        )
+
+    def get_created_time(self, name):
+        return self._cached(
+            'created_time', name, self.cache_metadata_ttl,
+            lambda: super(CachedStorageMixin, self).get_created_time(name),
+        )
+
+    def _open(self, name, mode='rb'):
+        with self._medir('open'):
+            return super()._open(name, mode)
+
+    # ------------------------------------------------------------------
+    # Invalidação em gravação e remoção
+    # ------------------------------------------------------------------
+    def _save(self, name, content):
+        self.invalidate(name)
+        with self._medir('save'):
+            nome_salvo = super()._save(name, content)
+        self.invalidate(nome_salvo)
+        # O nome final pode diferir do pedido (ex: sufixo para evitar colisão).
+        return nome_salvo
+
+    def delete(self, name):
+        try:
+            with self._medir('delete'):
+                super().delete(name)
+        finally:
+            self.invalidate(name)
+
+
+class CachedFileSystemStorage(CachedStorageMixin, FileSystemStorage):
+    """FileSystemStorage com cache (útil em desenvolvimento e testes)."""
+
+    nome_metricas = 'filesystem'
+
+
+class CachedStaticFilesStorage(CachedStorageMixin, StaticFilesStorage):
+    """StaticFilesStorage com cache, para o alias 'staticfiles'."""
+
+    nome_metricas = 'static'
+
+
+class CachedGoogleCloudStorage(CachedStorageMixin, GoogleCloudStorage):
+    """
+    GoogleCloudStorage com cache de URL e metadados.
+
+    URLs assinadas (querystring_auth=True e ACL diferente de 'publicRead')
+    ficam em cache por apenas metade do prazo 'expiration', de modo que
+    a URL entregue ao navegador ainda tenha pelo menos metade da validade.
+
+    Sem 'credentials' nas OPTIONS, usa o cliente compartilhado de
+    core.gcs, criado (com as credenciais) apenas no primeiro acesso.
+    """
+
+    nome_metricas = 'gcs'
+
+    @property
+    def client(self):
+        if self._client is None and self.credentials is None and not self.iam_sign_blob:
+            self._client = get_client()
+            # Os dois aliases (media e static) reaproveitam o mesmo cliente.
+        return super().client
+
+    def get_url_cache_ttl(self, name):
+        acl = self.get_object_parameters(name).get('acl', self.default_acl)
+        if acl == 'publicRead' or not self.querystring_auth:
+            return self.cache_url_ttl
+            # URL pública: não depende de assinatura, não expira.
+        expiration = self.expiration
+        segundos = (
+            expiration.total_seconds()
+            if hasattr(expiration, 'total_seconds') else float(expiration)
+        )
+        ttl = segundos / 2
+        if self.cache_url_ttl is not None:
+            ttl = min(ttl, self.cache_url_ttl)
+        return ttl
+
+
+class SharedInMemoryStorage(InMemoryStorage):
+    """
+    InMemoryStorage cujas instâncias compartilham os mesmos arquivos (em
+    cada processo). Usado nos testes (fusion/settings_test.py).
+
+    O django-pictures recria o storage a partir de deconstruct() para gerar
+    as versões das imagens; com o InMemoryStorage comum, essa nova
+    instância começaria vazia e não encontraria o arquivo enviado.
+    """
+
+    _raiz = InMemoryDirNode()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._root = self._raiz
+        self._resolve(self.base_location, create_if_missing=True, leaf_cls=InMemoryDirNode)
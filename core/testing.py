@@ -0,0 +1,124 @@
+# ======================================================================
+# ORÇAMENTOS DE CONSULTAS E DE TEMPO NOS TESTES
+# ======================================================================
+# Um teste que só confere o status HTTP não percebe um N+1: a página
+# continua respondendo 200, só que com uma consulta a mais por item (ex:
+# {{ e.cargo }} sem select_related). OrcamentoMixin roda uma view ou um
+# comando com bases de dados de vários tamanhos e verifica:
+#   - o número de consultas (em todas as conexões, via core.timing) não
+#     passa do orçamento e NÃO CRESCE com a quantidade de linhas (pode
+#     diminuir: com poucas linhas, a paginação por chave faz a consulta
+#     da segunda fase da rotação, ver core/pagination.py);
+#   - o tempo de cada execução não passa do orçamento em segundos.
+#
+# A curva (linhas → consultas, tempo) vai na mensagem de falha e, com a
+# variável de ambiente TEST_BUDGET_REPORT=1, é impressa em todos os casos.
+# TEST_BUDGET_TIME_FACTOR multiplica os orçamentos de tempo (ex: 3 num CI
+# lento); as consultas não têm folga.
+#
+# Uso:
+#   class OrcamentosTestCase(OrcamentoMixin, TestCase):
+#       def test_pagina_inicial(self):
+#           self.assertOrcamentoView(reverse('index'), consultas=8, segundos=0.5)
+#       def test_export(self):
+#           self.assertOrcamentoComando('export_data', consultas=10)
+
+import os
+import sys
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from model_mommy import mommy
+
+from core import timing
+from core.models import Cargo, Equipe, Servico
+
+
+def popular(linhas):
+    """
+    Base de dados sintética com 'linhas' serviços e membros da equipe (e
+    um cargo para cada dez membros). As imagens só têm nome e dimensões:
+    nenhum arquivo é lido.
+    """
+    cargos = Cargo.objects.bulk_create(mommy.prepare(Cargo, _quantity=max(1, linhas // 10)))
+    Servico.objects.bulk_create(mommy.prepare(Servico, _quantity=linhas, icone='lni-cog'))
+    membros = mommy.prepare(Equipe, _quantity=linhas, _save_related=False)
+    for indice, membro in enumerate(membros):
+        membro.cargo = cargos[indice % len(cargos)]
+        membro.imagem.name, membro.image_width, membro.image_height = 'sintetica.png', 480, 480
+    Equipe.objects.bulk_create(membros)
+
+
+class OrcamentoMixin:
+    """Mixin para TestCase: orçamentos de consultas e tempo com bases de vários tamanhos."""
+
+    tamanhos = (1, 10, 50)
+    # Quantidades de linhas testadas; acima do tamanho de página das views.
+
+    def popular(self, linhas):
+        """Cria a base de dados de cada tamanho; sobrescreva para outros cenários."""
+        popular(linhas)
+
+    def medir_escala(self, executar, tamanhos=None):
+        """
+        Executa executar() uma vez com cada tamanho de base e retorna a curva
+        [(linhas, consultas, segundos), ...]. Cada base é desfeita antes da
+        próxima (savepoint). Uma execução de aquecimento (templates, caches)
+        não entra na curva.
+        """
+        curva = []
+        for indice, linhas in enumerate(tamanhos or self.tamanhos):
+            with transaction.atomic():
+                self.popular(linhas)
+                if indice == 0:
+                    executar()
+                with timing.medir() as medicao:
+                    executar()
+                curva.append((linhas, medicao.consultas, medicao.total()))
+                transaction.set_rollback(True)
+        return curva
+
+    def _verificar(self, nome, curva, consultas, segundos, pode_crescer):
+        texto = f'{nome}:\n' + '\n'.join(
+            f'  {linhas:>6} linhas → {quantidade:>3} consultas, {tempo * 1000:8.1f}ms'
+            for linhas, quantidade, tempo in curva
+        )
+        if os.environ.get('TEST_BUDGET_REPORT'):
+            sys.stderr.write(f'\n{texto}\n')
+        quantidades = [quantidade for _, quantidade, _ in curva]
+        if not pode_crescer and any(depois > antes for antes, depois in zip(quantidades, quantidades[1:])):
+            self.fail(f'O número de consultas cresce com a quantidade de linhas (N+1?). {texto}')
+        if consultas is not None and max(quantidades) > consultas:
+            self.fail(f'Mais de {consultas} consultas. {texto}')
+        if segundos is not None:
+            limite = segundos * float(os.environ.get('TEST_BUDGET_TIME_FACTOR', 1))
+            if max(tempo for _, _, tempo in curva) > limite:
+                self.fail(f'Mais de {limite * 1000:.0f}ms. {texto}')
+        return curva
+
+    def assertOrcamento(self, nome, executar, consultas=None, segundos=None, pode_crescer=False, tamanhos=None):
+        """
+        Verifica o orçamento de executar(). pode_crescer=True aceita que o
+        número de consultas cresça com as linhas (só o máximo é verificado).
+        Retorna a curva.
+        """
+        return self._verificar(nome, self.medir_escala(executar, tamanhos), consultas, segundos, pode_crescer)
+
+    def assertOrcamentoView(self, url, consultas=None, segundos=None, pode_crescer=False, tamanhos=None,
+                            metodo='get', status=200, **kwargs):
+        """Orçamento de uma requisição com self.client (kwargs vão para get/post)."""
+        def executar():
+            resposta = getattr(self.client, metodo)(url, **kwargs)
+            self.assertEqual(resposta.status_code, status, url)
+            if resposta.streaming:
+                b''.join(resposta.streaming_content)
+                # O corpo das respostas em streaming (ex: API) é gerado ao ser lido.
+        return self.assertOrcamento(f'{metodo.upper()} {url}', executar, consultas, segundos, pode_crescer, tamanhos)
+
+    def assertOrcamentoComando(self, comando, *args, consultas=None, segundos=None, pode_crescer=False, tamanhos=None):
+        """Orçamento de um comando de gerenciamento (saída descartada)."""
+        return self.assertOrcamento(
+            f'manage.py {comando}', lambda: call_command(comando, *args, stdout=StringIO(), stderr=StringIO()),
+            consultas, segundos, pode_crescer, tamanhos,
+        )
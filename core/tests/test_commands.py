@@ -0,0 +1,476 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from model_mommy import mommy
+from PIL import Image
+
+from core.models import Cargo, EtapaDeploy, Equipe, Exclusao, Servico
+
+
+# ======================================================================
+# Testes do comando gc_media
+# ======================================================================
+class GcMediaTestCase(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media, STORAGES={
+            **settings.STORAGES,
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+        # Storage em disco (mesmo com a mídia em memória de settings_test):
+        # a remoção das pastas de versões vazias só existe no storage local.
+
+        # Membro da equipe com uma imagem referenciada.
+        self.usado = str(uuid.uuid4())
+        equipe = mommy.make('Equipe')
+        Equipe.objects.filter(pk=equipe.pk).update(
+            imagem=f'{self.usado}.png', image_width=480, image_height=480,
+        )
+        # Arquivos no disco: original + versões do referenciado e de um órfão.
+        self.orfao = str(uuid.uuid4())
+        for stem in (self.usado, self.orfao):
+            self._criar(f'{stem}.png')
+            self._criar(f'{stem}/480w.png')
+            self._criar(f'{stem}/1/480w.png')
+        self._criar('outro.txt')
+        os.makedirs(os.path.join(self.media, 'vazia'))
+        # Pasta vazia que não é de versões: deve ser preservada.
+
+        # Órfão recém-enviado (ex: upload com o save do admin em andamento).
+        self.recente = str(uuid.uuid4())
+        self._criar(f'{self.recente}.png', idade=60)
+
+    def _criar(self, nome, idade=2 * 3600):
+        caminho = os.path.join(self.media, nome)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'wb') as f:
+            f.write(b'x' * 10)
+        antes = time.time() - idade
+        os.utime(caminho, (antes, antes))
+
+    def _existe(self, nome):
+        return os.path.exists(os.path.join(self.media, nome))
+
+    def test_dry_run_nao_apaga(self):
+        saida = StringIO()
+        call_command('gc_media', '--dry-run', stdout=saida)
+        self.assertIn('3 arquivo(s) órfão(s)', saida.getvalue())
+        self.assertTrue(self._existe(f'{self.orfao}.png'))
+
+    def test_apaga_apenas_orfaos(self):
+        call_command('gc_media', stdout=StringIO())
+        self.assertFalse(self._existe(f'{self.orfao}.png'))
+        self.assertFalse(self._existe(self.orfao))
+        # A pasta de versões vazia também é removida.
+        self.assertTrue(self._existe(f'{self.usado}.png'))
+        self.assertTrue(self._existe(f'{self.usado}/1/480w.png'))
+        self.assertTrue(self._existe('outro.txt'))
+        self.assertTrue(self._existe('vazia'))
+        self.assertTrue(self._existe(f'{self.recente}.png'))
+
+    def test_min_age_zero_inclui_recentes(self):
+        call_command('gc_media', '--min-age', '0', stdout=StringIO())
+        self.assertFalse(self._existe(f'{self.recente}.png'))
+        self.assertTrue(self._existe(f'{self.usado}.png'))
+
+
+# ======================================================================
+# Testes do comando export_data
+# ======================================================================
+class ExportDataTestCase(TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta)
+        mommy.make('Servico', _quantity=5)
+        mommy.make('Equipe', _quantity=3)
+
+    def test_exporta_gzip(self):
+        saida = StringIO()
+        call_command(
+            'export_data', '--output-dir', self.pasta, '--compress', 'gzip',
+            '--chunk-size', '2', stdout=saida,
+        )
+        with gzip.open(os.path.join(self.pasta, 'backup_servico.json.gz'), 'rt', encoding='utf-8') as f:
+            dados = json.load(f)
+        self.assertEqual(len(dados), 5)
+        self.assertEqual(dados[0]['model'], 'core.servico')
+        self.assertIn('linhas/s', saida.getvalue())
+
+    def test_workers_fora_do_postgresql(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('No PostgreSQL o caminho paralelo roda de verdade (ver abaixo).')
+        erros = StringIO()
+        call_command('export_data', '--output-dir', self.pasta, '--workers', '3', stdout=StringIO(), stderr=erros)
+        self.assertIn('Exportando em sequência', erros.getvalue())
+        with open(os.path.join(self.pasta, 'backup_equipe.json'), encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'pg_export_snapshot só existe no PostgreSQL.')
+class ExportDataParaleloTestCase(TransactionTestCase):
+    # TransactionTestCase: as threads do export só enxergam dados já gravados (commit).
+
+    def test_threads_no_mesmo_snapshot(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        mommy.make('Equipe', _quantity=4)
+        call_command('export_data', '--output-dir', pasta, '--workers', '3', stdout=StringIO())
+        with open(os.path.join(pasta, 'backup_equipe.json'), encoding='utf-8') as f:
+            equipe = json.load(f)
+        with open(os.path.join(pasta, 'backup_cargo.json'), encoding='utf-8') as f:
+            cargos = {item['pk'] for item in json.load(f)}
+        self.assertEqual(len(equipe), 4)
+        self.assertTrue(all(item['fields']['cargo'] in cargos for item in equipe))
+
+
+
+# ======================================================================
+# Testes do backup incremental (export_data --incremental + restore_data)
+# ======================================================================
+class BackupIncrementalTestCase(TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta)
+        self.servicos = mommy.make('Servico', _quantity=3)
+
+    def exportar(self, *extra):
+        call_command('export_data', '--output-dir', self.pasta, *extra, stdout=StringIO())
+
+    def test_delta_e_restauracao(self):
+        self.exportar('--overlap', '0')
+        # Sem sobreposição, para o delta trazer só a linha alterada.
+        alterado, apagado, intacto = self.servicos
+        alterado.servico = 'Alterado'
+        alterado.save()
+        apagado.delete()
+        self.exportar('--incremental')
+
+        deltas = sorted(n for n in os.listdir(self.pasta) if n.startswith('delta_servico_'))
+        with open(os.path.join(self.pasta, deltas[0]), encoding='utf-8') as f:
+            self.assertEqual([o['pk'] for o in json.load(f)], [alterado.pk])
+        # Apenas a linha alterada vai para o delta.
+
+        Servico.objects.all().delete()
+        call_command('restore_data', '--dir', self.pasta, stdout=StringIO())
+        self.assertEqual(
+            set(Servico.objects.values_list('pk', flat=True)), {alterado.pk, intacto.pk},
+        )
+        self.assertEqual(Servico.objects.get(pk=alterado.pk).servico, 'Alterado')
+
+    def test_exclusao_registrada(self):
+        servico = self.servicos[0]
+        pk = servico.pk
+        servico.delete()
+        self.assertTrue(Exclusao.objects.filter(modelo='core.servico', objeto_pk=str(pk)).exists())
+
+    def test_restauracao_nao_cria_exclusoes(self):
+        self.exportar()
+        self.servicos[0].delete()
+        self.exportar('--incremental')
+        antes = Exclusao.objects.count()
+        call_command('restore_data', '--dir', self.pasta, stdout=StringIO())
+        self.assertFalse(Servico.objects.filter(pk=self.servicos[0].pk).exists())
+        self.assertEqual(Exclusao.objects.count(), antes)
+
+    def test_prune_tombstones(self):
+        self.exportar()
+        self.servicos[0].delete()
+        self.exportar('--incremental', '--prune-tombstones')
+        self.assertTrue(Exclusao.objects.exists())
+        # Dentro da sobreposição: pode ter sido confirmada depois do snapshot.
+        self.exportar('--incremental', '--prune-tombstones', '--overlap', '0')
+        self.assertFalse(Exclusao.objects.exists())
+        # Já estão no delta_exclusoes das exportações anteriores.
+        exclusoes = [n for n in os.listdir(self.pasta) if n.startswith('delta_exclusoes_')]
+        self.assertEqual(len(exclusoes), 2)
+
+    def test_linha_confirmada_depois_do_snapshot(self):
+        self.exportar()
+        corte = timezone.now()
+        with mock.patch('core.management.commands.export_data.timezone.now', return_value=corte):
+            self.exportar('--incremental')
+        alterado = self.servicos[0]
+        Servico.objects.filter(pk=alterado.pk).update(servico='Alterado', modificado=corte - timedelta(seconds=1))
+        # Um save do admin que recebeu 'modificado' antes do corte, mas cujo
+        # commit só aconteceu depois do snapshot: o delta acima não o viu.
+        self.exportar('--incremental')
+        deltas = sorted(n for n in os.listdir(self.pasta) if n.startswith('delta_servico_'))
+        with open(os.path.join(self.pasta, deltas[-1]), encoding='utf-8') as f:
+            self.assertIn(alterado.pk, [o['pk'] for o in json.load(f)])
+
+    def test_backfill_lqip_entra_no_delta(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        buffer = BytesIO()
+        Image.new('RGB', (32, 32), color='blue').save(buffer, 'PNG')
+        with override_settings(MEDIA_ROOT=media, STORAGES={
+            **settings.STORAGES, 'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        }):
+            equipe = mommy.prepare('Equipe', cargo=mommy.make('Cargo'))
+            equipe.imagem = ContentFile(buffer.getvalue(), name='foto.png')
+            equipe.save()
+            Equipe.objects.filter(pk=equipe.pk).update(imagem_lqip='')
+            self.exportar('--overlap', '0')
+            call_command('backfill_lqip', stdout=StringIO())
+        self.exportar('--incremental')
+        delta = next(n for n in os.listdir(self.pasta) if n.startswith('delta_equipe_'))
+        with open(os.path.join(self.pasta, delta), encoding='utf-8') as f:
+            self.assertEqual([o['pk'] for o in json.load(f)], [equipe.pk])
+
+
+# ======================================================================
+# Testes do comando import_snapshot
+# ======================================================================
+class ImportSnapshotTestCase(TestCase):
+
+    fixtures_projeto = ['backup_cargo.json', 'backup_equipe.json', 'backup_servico.json']
+
+    def importar(self, *extra):
+        saida = StringIO()
+        call_command('import_snapshot', *self.fixtures_projeto, *extra, stdout=saida)
+        return saida.getvalue()
+
+    def test_importa_fixtures_do_projeto(self):
+        self.importar()
+        self.assertEqual(Cargo.objects.count(), 3)
+        self.assertEqual(Equipe.objects.count(), 4)
+        self.assertEqual(Servico.objects.count(), 6)
+        # As datas vêm da fixture, e não do momento da importação.
+        self.assertEqual(Cargo.objects.get(pk=1).modificado.year, 2025)
+
+    def test_pula_quando_checksum_igual(self):
+        self.importar()
+        self.assertIn('nada a fazer', self.importar())
+
+    def test_preserva_edicao_do_admin(self):
+        self.importar()
+        cargo = Cargo.objects.get(pk=1)
+        cargo.cargo = 'Editado no admin'
+        cargo.save()
+        self.importar('--force')
+        self.assertEqual(Cargo.objects.get(pk=1).cargo, 'Editado no admin')
+
+    def gravar_fixture(self, objetos):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        caminho = os.path.join(pasta, 'fixture.json')
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(objetos, f)
+        return caminho
+
+    def test_falha_com_chave_estrangeira_inexistente(self):
+        caminho = self.gravar_fixture([{'model': 'core.equipe', 'pk': 99, 'fields': {
+            'nome': 'Sem cargo', 'cargo': 999, 'bio': '-', 'imagem': 'x.png', 'image_width': 480, 'image_height': 480,
+            'facebook': '#', 'twitter': '#', 'instagram': '#',
+        }}])
+        with self.assertRaisesMessage(CommandError, 'core.Cargo inexistente (pk 999)'):
+            call_command('import_snapshot', caminho, stdout=StringIO())
+        saida = StringIO()
+        call_command('import_snapshot', caminho, '--skip-missing-fk', stdout=saida)
+        self.assertIn('1 ignorado(s)', saida.getvalue())
+        self.assertFalse(Equipe.objects.filter(pk=99).exists())
+
+    def test_preserva_lqip_da_mesma_imagem(self):
+        self.importar()
+        Equipe.objects.filter(pk=4).update(imagem_lqip='data:image/webp;base64,AAAA')
+        with open('backup_equipe.json', encoding='utf-8') as f:
+            membro = next(o for o in json.load(f) if o['pk'] == 4)
+        membro['fields']['nome'] = 'Novo nome'
+        membro['fields']['modificado'] = '2099-01-01T00:00:00Z'
+        call_command('import_snapshot', self.gravar_fixture([membro]), stdout=StringIO())
+        equipe = Equipe.objects.get(pk=4)
+        self.assertEqual(equipe.nome, 'Novo nome')
+        self.assertEqual(equipe.imagem_lqip, 'data:image/webp;base64,AAAA')
+
+
+# ======================================================================
+# Testes do comando deploy_build
+# ======================================================================
+class DeployBuildTestCase(TestCase):
+    # Os comandos das etapas são substituídos por um registro das chamadas:
+    # o que se testa aqui é a decisão de executar ou pular cada etapa.
+
+    def deploy(self, *extra, falhar=None):
+        chamadas = []
+
+        def registrar(nome, *args, **kwargs):
+            if nome == falhar:
+                raise RuntimeError(f'{nome} falhou')
+            chamadas.append(nome)
+
+        with mock.patch('core.management.commands.deploy_build.call_command', registrar):
+            call_command('deploy_build', *extra, stdout=StringIO())
+        return sorted(chamadas)
+
+    def test_pula_etapas_sem_alteracao(self):
+        todas = ['collectstatic', 'import_snapshot', 'migrate', 'upload_media']
+        self.assertEqual(self.deploy(), todas)
+        self.assertEqual(sorted(EtapaDeploy.objects.values_list('nome', flat=True)), todas)
+        # As impressões digitais ficam no banco: sobrevivem a um checkout novo.
+        self.assertEqual(self.deploy(), [])
+        self.assertEqual(self.deploy('--force', '--only', 'migrate'), ['migrate'])
+
+    def test_entrada_alterada(self):
+        self.deploy()
+        EtapaDeploy.objects.filter(nome='collectstatic').update(fingerprint='antiga')
+        self.assertEqual(self.deploy(), ['collectstatic'])
+
+    def test_etapa_com_falha_roda_de_novo(self):
+        with self.assertRaisesMessage(CommandError, 'upload_media falhou'):
+            self.deploy(falhar='upload_media')
+        self.assertFalse(EtapaDeploy.objects.filter(nome='upload_media').exists())
+        self.assertEqual(self.deploy(), ['upload_media'])
+
+
+# ======================================================================
+# Testes do comando benchmark_db_connections
+# ======================================================================
+class BenchmarkDbConnectionsTestCase(TestCase):
+
+    def test_mede_sem_pool_e_persistente(self):
+        saida = StringIO()
+        call_command('benchmark_db_connections', '--iterations', '3', stdout=saida)
+        linhas = {linha.split('  ')[0]: linha for linha in saida.getvalue().splitlines()}
+        self.assertIn('ms', linhas['sem pool'])
+        self.assertIn('ms', linhas['persistente'])
+
+
+# ======================================================================
+# Testes do comando benchmark_api
+# ======================================================================
+class BenchmarkApiTestCase(TestCase):
+
+    def test_percorre_os_endpoints(self):
+        mommy.make(Servico, _quantity=5)
+        saida = StringIO()
+        call_command('benchmark_api', '--iterations', '1', '--limite', '2', stdout=saida)
+        linhas = {linha.split()[0]: linha.split() for linha in saida.getvalue().splitlines()[1:]}
+        self.assertEqual(set(linhas), {'api_servicos', 'api_equipe', 'api_cargos'})
+        self.assertEqual(linhas['api_servicos'][1], '5')
+
+
+# ======================================================================
+# Testes do comando seed_synthetic
+# ======================================================================
+class SeedSyntheticTestCase(TestCase):
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_cria_em_lotes_com_imagens_repetidas(self):
+        call_command(
+            'seed_synthetic', '--cargos', '3', '--servicos', '7', '--equipe', '5',
+            '--imagens', '2', '--workers', '1', '--lote', '2', stdout=StringIO(),
+        )
+        self.assertEqual((Cargo.objects.count(), Servico.objects.count(), Equipe.objects.count()), (3, 7, 5))
+        self.assertEqual(len(set(Equipe.objects.values_list('imagem', flat=True))), 2)
+        equipe = Equipe.objects.first()
+        self.assertTrue(equipe.imagem_lqip.startswith('data:image/webp;base64,'))
+        self.assertEqual(equipe.image_width, 480)
+        self.assertTrue(default_storage.exists(equipe.imagem.name))
+
+    def test_equipe_sem_cargos(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_synthetic', '--equipe', '1', stdout=StringIO())
+
+
+# ======================================================================
+# Testes do comando loadtest
+# ======================================================================
+class LoadtestTestCase(TestCase):
+
+    def test_get_e_post_na_aplicacao_local(self):
+        saida = StringIO()
+        call_command(
+            'loadtest', '--requisicoes', '10', '--concorrencia', '2', '--post', '0.2',
+            '--aquecimento', '0', stdout=saida,
+        )
+        linhas = {linha.split()[0]: linha.split() for linha in saida.getvalue().splitlines()[3:]}
+        self.assertIn('erros 0', saida.getvalue())
+        self.assertEqual((linhas['GET'][1], linhas['POST'][1], linhas['total'][1]), ('8', '2', '10'))
+
+    def test_falha_no_aquecimento_nao_trava_as_outras_threads(self):
+        chamadas = []
+
+        def requisitar(cliente, metodo):
+            chamadas.append(metodo)
+            if len(chamadas) == 1:
+                raise ConnectionError('recusada')
+            return 200, 1
+        with mock.patch('core.management.commands.loadtest.ClienteLocal.requisitar', requisitar):
+            with self.assertRaisesMessage(CommandError, 'recusada'):
+                call_command(
+                    'loadtest', '--requisicoes', '10', '--concorrencia', '3', '--aquecimento', '2',
+                    stdout=StringIO(),
+                )
+        # Sem o abort() da barreira, as outras duas threads esperariam para sempre.
+
+
+# ======================================================================
+# Testes dos comandos benchmark_suite e benchmark_compare
+# ======================================================================
+class BenchmarkSuiteTestCase(TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta)
+        self.base = os.path.join(self.pasta, 'base.json')
+
+    def rodar(self, *args):
+        call_command(
+            'benchmark_suite', '--linhas', '3', '--rodadas', '2', '--tempo-minimo', '0.001',
+            *args, stdout=StringIO(),
+        )
+
+    def test_grava_linha_de_base(self):
+        self.rodar('--filtro', 'templates', '--salvar', self.base)
+        with open(self.base) as arquivo:
+            documento = json.load(arquivo)
+        self.assertEqual(set(documento['resultados']), {'templates.team.html', 'templates.servicos.html'})
+        self.assertEqual(documento['metadados']['linhas'], 3)
+        self.assertGreater(documento['resultados']['templates.team.html']['min_us'], 0)
+
+    def test_dados_desfeitos(self):
+        self.rodar('--filtro', 'views.IndexView')
+        self.assertFalse(Equipe.objects.exists())
+
+    def test_compare_aponta_regressao(self):
+        self.rodar('--filtro', 'get_file_path', '--salvar', self.base)
+        with open(self.base) as arquivo:
+            atual = json.load(arquivo)
+        atual['resultados']['models.get_file_path']['min_us'] *= 2
+        caminho_atual = os.path.join(self.pasta, 'atual.json')
+        with open(caminho_atual, 'w') as arquivo:
+            json.dump(atual, arquivo)
+
+        saida = StringIO()
+        with self.assertRaisesMessage(CommandError, 'models.get_file_path'):
+            call_command('benchmark_compare', self.base, caminho_atual, stdout=saida)
+        self.assertIn('+100.0%', saida.getvalue())
+        call_command('benchmark_compare', self.base, caminho_atual, '--tolerancia', '1.5', stdout=StringIO())
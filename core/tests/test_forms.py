@@ -19,36 +19,39 @@ class ContactFormTestCase(TestCase):
     # Pelo nome, essa classe será usada para testar especificamente o formulário
     # `ContactForm`.
 
-    def setUp(self):
-        # Método especial chamado antes de cada teste ser executado.
+    @classmethod
+    def setUpTestData(cls):
+        # Método especial chamado uma vez para a classe inteira, antes dos testes.
         # Serve para configurar o ambiente de teste, criando dados iniciais
-        # que serão usados em diferentes métodos de teste.
+        # que serão usados em diferentes métodos de teste. O Django entrega a
+        # cada teste uma cópia (deepcopy) dos atributos criados aqui, então
+        # um teste que altera `self.form` não afeta os outros.
 
-        self.nome = "Felicity Jones"
+        cls.nome = "Felicity Jones"
         # Define um atributo `nome` que simula o valor preenchido no formulário.
         # Aqui usamos um nome fictício de exemplo.
 
-        self.email = "felicity@gmail.com"
+        cls.email = "felicity@gmail.com"
         # Define um e-mail válido de exemplo que será usado nos testes.
 
-        self.assunto = "Um assunto qualquer"
+        cls.assunto = "Um assunto qualquer"
         # Define um assunto de exemplo, simulando a entrada do usuário no formulário.
 
-        self.message = "Uma mensagem qualquer"
+        cls.message = "Uma mensagem qualquer"
         # Define a mensagem de texto, simulando o campo de texto preenchido.
 
-        self.dados = {
-            "nome": self.nome,
-            "email": self.email,
-            "assunto": self.assunto,
-            "mensagem": self.message,
+        cls.dados = {
+            "nome": cls.nome,
+            "email": cls.email,
+            "assunto": cls.assunto,
+            "mensagem": cls.message,
         }
-        # Cria um dicionário `self.dados` que contém todos os campos necessários
+        # Cria um dicionário `cls.dados` que contém todos os campos necessários
         # para instanciar e validar o `ContactForm`.
         # As chaves correspondem exatamente aos nomes definidos no formulário
         # (nome, email, assunto, mensagem).
 
-        self.form = ContactForm(data = self.dados) # ContatForm(request.POST)
+        cls.form = ContactForm(data = cls.dados) # ContatForm(request.POST)
         # Cria uma instância de `ContactForm`, passando o dicionário como `data`.
         # Isso simula o envio de um formulário com dados preenchidos,
         # semelhante ao que aconteceria com `ContactForm(request.POST)` em uma view.
@@ -60,7 +63,7 @@ class ContactFormTestCase(TestCase):
         # Este método vai verificar se o envio de e-mail do formulário funciona corretamente.
 
         form1 = ContactForm(data = self.dados)
-        # Cria a primeira instância do formulário `ContactForm`, usando os mesmos dados definidos no setUp.
+        # Cria a primeira instância do formulário `ContactForm`, usando os mesmos dados definidos no setUpTestData.
 
         form1.is_valid()
         # Chama o método `is_valid()` que:
@@ -75,7 +78,7 @@ class ContactFormTestCase(TestCase):
         # e possivelmente retornar algo (ou apenas `None`).
 
         form2 = self.form
-        # Usa a instância do formulário já criada no `setUp` (`self.form`).
+        # Usa a instância do formulário já criada no `setUpTestData` (`self.form`).
 
         form2.is_valid()
         # Novamente, valida o formulário para garantir que `cleaned_data` esteja populado.
@@ -0,0 +1,79 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from core.explain import atualizar_estatisticas, capturar_planos
+from core.models import Cargo, Equipe, Servico
+
+TABELAS = ('core_servico', 'core_equipe')
+
+INDICES_PAGINA_INICIAL = {'core_servico': 'servico_ativo_idx', 'core_equipe': 'equipe_ativo_idx'}
+# Índices parciais (ativo = true) que as listagens públicas devem usar.
+
+
+# ======================================================================
+# Planos de execução (EXPLAIN) com volume grande de dados sintéticos
+# ======================================================================
+class IndicesTestCase(TestCase):
+    # Com poucas linhas o banco prefere ler a tabela inteira (é mais barato),
+    # então os dados são gerados em volume: muitos registros desativados e
+    # poucos ativos, como acontece com o passar do tempo no admin.
+
+    total = 5000
+    ativos_a_cada = 50
+
+    @classmethod
+    def setUpTestData(cls):
+        cargos = Cargo.objects.bulk_create([Cargo(cargo=f'Cargo {i}') for i in range(5)])
+        Servico.objects.bulk_create([
+            Servico(servico=f'Serviço {i}', descricao='x', icone='lni-cog', ativo=i % cls.ativos_a_cada == 0)
+            for i in range(cls.total)
+        ])
+        Equipe.objects.bulk_create([
+            Equipe(
+                nome=f'Pessoa {i}', cargo=cargos[i % len(cargos)], bio='x',
+                imagem='sintetica.png', image_width=480, image_height=480,
+                ativo=i % cls.ativos_a_cada == 0,
+            )
+            for i in range(cls.total)
+        ])
+        atualizar_estatisticas(TABELAS)
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'x')
+
+    def assertSemVarreduraSequencial(self, planos):
+        self.assertTrue(planos, 'Nenhuma consulta capturada.')
+        for plano in planos:
+            self.assertEqual(
+                plano.varreduras_sequenciais(TABELAS), [],
+                f'Varredura sequencial em:\n{plano.sql}\nPlano: {plano.nos}',
+            )
+
+    def test_pagina_inicial(self):
+        planos = capturar_planos(
+            lambda: self.client.get(reverse('index')),
+            filtro=lambda sql: any(t in sql for t in TABELAS),
+        )
+        self.assertSemVarreduraSequencial(planos)
+        for plano in planos:
+            for tabela, indice in INDICES_PAGINA_INICIAL.items():
+                self.assertTrue(
+                    all(usado == indice for usado in plano.indices(tabela)),
+                    f'{tabela} lida sem {indice} em:\n{plano.sql}\nPlano: {plano.nos}',
+                )
+        # Sem o índice (ex: migração removida) o teste falha no SQLite também.
+
+    @skipUnless(connection.vendor == 'postgresql', 'No SQLite, o SCAN pela pk com LIMIT não se distingue de uma varredura completa.')
+    def test_changelist_do_admin(self):
+        self.client.force_login(self.admin)
+        for modelo in ('servico', 'equipe'):
+            with self.subTest(modelo=modelo):
+                planos = capturar_planos(
+                    lambda: self.client.get(reverse(f'admin:core_{modelo}_changelist')),
+                    filtro=lambda sql: 'ORDER BY' in sql and f'core_{modelo}' in sql,
+                    # A contagem total (COUNT(*)) da paginação lê a tabela
+                    # inteira por natureza e fica de fora.
+                )
+                self.assertSemVarreduraSequencial(planos)
@@ -0,0 +1,75 @@
+import io
+import json
+import logging
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core import log
+from core.middleware import RequestIdMiddleware
+
+
+def registro(mensagem='teste', nivel=logging.INFO, **extra):
+    record = logging.LogRecord('core.teste', nivel, __file__, 1, mensagem, (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+# ======================================================================
+# Logging estruturado em fila (core/log.py)
+# ======================================================================
+class LogTestCase(SimpleTestCase):
+
+    def test_formato_json(self):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger = logging.getLogger('core.teste.json')
+            saida = io.StringIO()
+            handler = log.FilaHandler(stream=saida)
+            self.addCleanup(handler.parar)
+            logger.addHandler(handler)
+            self.addCleanup(logger.removeHandler, handler)
+            logger.propagate = False
+            self.addCleanup(setattr, logger, 'propagate', True)
+            # Só para a fila do teste, não para a saída dos testes.
+            logger.error('Falhou %s', 'x', exc_info=True, extra={'arquivo': 'a.png'})
+        handler.parar()
+        # Esvazia a fila antes de ler a saída.
+        dados = json.loads(saida.getvalue())
+        self.assertEqual(dados['mensagem'], 'Falhou x')
+        self.assertEqual(dados['arquivo'], 'a.png')
+        self.assertIn('ZeroDivisionError', dados['excecao'])
+
+    def test_fila_cheia_descarta_sem_bloquear(self):
+        saida = io.StringIO()
+        handler = log.FilaHandler(stream=saida, tamanho=2)
+        handler.parar()
+        # Sem a thread de escrita, a fila enche.
+        for indice in range(5):
+            handler.handle(registro(f'registro {indice}'))
+        self.assertEqual(handler.queue.qsize(), 2)
+        self.assertEqual(handler.descartados, 3)
+
+    def test_amostragem_so_no_debug(self):
+        filtro = log.FiltroAmostragem(taxa=0)
+        self.assertFalse(filtro.filter(registro(nivel=logging.DEBUG)))
+        self.assertTrue(filtro.filter(registro(nivel=logging.INFO)))
+
+    def test_request_id(self):
+        vistos = []
+
+        def view(request):
+            record = registro()
+            log.FiltroRequestId().filter(record)
+            vistos.append(record.request_id)
+            return HttpResponse()
+
+        middleware = RequestIdMiddleware(view)
+        response = middleware(RequestFactory().get('/', HTTP_X_REQUEST_ID='proxy-1234abcd'))
+        self.assertEqual(response['X-Request-ID'], 'proxy-1234abcd')
+        response = middleware(RequestFactory().get('/', HTTP_X_REQUEST_ID='<script>'))
+        self.assertNotEqual(response['X-Request-ID'], '<script>')
+        self.assertEqual(vistos, ['proxy-1234abcd', response['X-Request-ID']])
+        self.assertIsNone(log.request_id_atual())
+        # Fora da requisição o id volta a ser None.
@@ -0,0 +1,315 @@
+import json
+import os
+import re
+import shutil
+import signal
+import tempfile
+import threading
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.db import connection
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import memory, metrics, routers
+from core.middleware import MemoryWatchdogMiddleware, ReplicaRoutingMiddleware
+from core.models import Servico
+
+
+# ======================================================================
+# Testes do MemoryWatchdogMiddleware
+# ======================================================================
+class MemoryWatchdogMiddlewareTestCase(TestCase):
+
+    def setUp(self):
+        self.addCleanup(memory.estatisticas.update, dict(memory.estatisticas))
+        memory.estatisticas.update(requisicoes=0, pico_rss_mb=0.0, aposentando=False)
+        self.request = RequestFactory().get('/')
+        ambiente = mock.patch.dict(os.environ, {memory.VARIAVEL_WORKER: '1'})
+        ambiente.start()
+        self.addCleanup(ambiente.stop)
+        # Como no post_fork do gunicorn.conf.py (qualquer classe de worker).
+
+    def chamar(self):
+        middleware = MemoryWatchdogMiddleware(lambda request: HttpResponse('ok'))
+        with mock.patch('core.middleware.os.kill') as kill:
+            middleware(self.request)
+            middleware(self.request)
+        return kill
+
+    @override_settings(MEMORY_WATCHDOG_MAX_RSS_MB=1)
+    def test_aposenta_acima_do_limite(self):
+        with self.assertLogs('core.middleware', 'WARNING'):
+            kill = self.chamar()
+        kill.assert_called_once_with(mock.ANY, signal.SIGTERM)
+        # Uma única vez, mesmo com duas requisições acima do limite.
+        self.assertGreater(memory.estatisticas['pico_rss_mb'], 1)
+
+    @override_settings(MEMORY_WATCHDOG_MAX_RSS_MB=1)
+    def test_fora_do_gunicorn_so_avisa(self):
+        del os.environ[memory.VARIAVEL_WORKER]
+        with self.assertLogs('core.middleware', 'WARNING'):
+            self.chamar().assert_not_called()
+
+    @override_settings(MEMORY_WATCHDOG_MAX_RSS_MB=None)
+    def test_desligado(self):
+        self.chamar().assert_not_called()
+        self.assertEqual(memory.estatisticas['requisicoes'], 2)
+
+
+# ======================================================================
+# Testes da página de memória no admin
+# ======================================================================
+class MemoriaViewTestCase(TestCase):
+
+    def test_apenas_equipe(self):
+        self.assertEqual(302, self.client.get(reverse('admin_memoria')).status_code)
+        # Redireciona para o login do admin.
+
+    def test_tracemalloc_sob_demanda(self):
+        self.client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        self.addCleanup(memory.tracemalloc.stop)
+        self.client.post(reverse('admin_memoria'), {'acao': 'iniciar'})
+        resposta = self.client.get(reverse('admin_memoria'))
+        self.assertEqual(200, resposta.status_code)
+        self.assertTrue(resposta.context['tracemalloc_ativo'])
+        self.assertContains(resposta, 'Pico de RSS')
+
+
+# ======================================================================
+# Testes do roteamento para réplicas de leitura
+# ======================================================================
+@override_settings(REPLICA_DATABASES=['replica_1'])
+class ReplicaRoutingTestCase(SimpleTestCase):
+    # SimpleTestCase: sem a transação do TestCase, que (corretamente) manteria
+    # todas as leituras no banco principal.
+
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        routers.limpar_saude()
+        self.addCleanup(routers.limpar_saude)
+        self.patch_saude = mock.patch('core.routers.replica_saudavel', return_value=True)
+        self.saudavel = self.patch_saude.start()
+        self.addCleanup(self.patch_saude.stop)
+
+    def ler_em_requisicao(self, request):
+        destinos = []
+
+        def view(request):
+            destinos.append(self.router.db_for_read(Servico))
+            if request.method == 'POST':
+                self.router.db_for_write(Servico)
+                destinos.append(self.router.db_for_read(Servico))
+            return HttpResponse('ok')
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        return destinos, response
+
+    def test_fora_de_requisicao_usa_principal(self):
+        self.assertEqual(self.router.db_for_read(Servico), 'default')
+
+    def test_get_publico_usa_replica(self):
+        destinos, response = self.ler_em_requisicao(RequestFactory().get('/'))
+        self.assertEqual(destinos, ['replica_1'])
+        self.assertNotIn('usar_primario', response.cookies)
+
+    def test_admin_usa_principal(self):
+        destinos, _ = self.ler_em_requisicao(RequestFactory().get('/admin/'))
+        self.assertEqual(destinos, ['default'])
+
+    def test_escrita_fixa_o_principal(self):
+        destinos, response = self.ler_em_requisicao(RequestFactory().post('/'))
+        self.assertEqual(destinos, ['default', 'default'])
+        self.assertIn('usar_primario', response.cookies)
+        # Próxima requisição do mesmo navegador: ainda no principal.
+        request = RequestFactory().get('/')
+        request.COOKIES['usar_primario'] = '1'
+        self.assertEqual(self.ler_em_requisicao(request)[0], ['default'])
+
+    def test_replica_indisponivel(self):
+        self.saudavel.return_value = False
+        destinos, _ = self.ler_em_requisicao(RequestFactory().get('/'))
+        self.assertEqual(destinos, ['default'])
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=5)
+    def test_replica_atrasada(self):
+        self.patch_saude.stop()
+        self.addCleanup(self.patch_saude.start)
+        # replica_saudavel de verdade, com o atraso simulado.
+        with mock.patch('core.routers.atraso_replicacao', return_value=60), \
+                self.assertLogs('core.routers', 'WARNING'):
+            self.assertFalse(routers.replica_saudavel('replica_1'))
+
+    def test_verificacao_em_andamento_nao_bloqueia(self):
+        self.patch_saude.stop()
+        self.addCleanup(self.patch_saude.start)
+        iniciou, liberar = threading.Event(), threading.Event()
+
+        def atraso_lento(alias):
+            iniciou.set()
+            liberar.wait(5)
+            return 0.0
+            # Réplica lenta para responder (ex: conexão TCP pendurada).
+
+        with mock.patch('core.routers.atraso_replicacao', side_effect=atraso_lento) as atraso:
+            verificacao = threading.Thread(target=routers.replica_saudavel, args=('replica_1',))
+            verificacao.start()
+            iniciou.wait(5)
+            self.assertFalse(routers.replica_saudavel('replica_1'))
+            # Ainda sem resultado: usa o principal, sem esperar nem verificar de novo.
+            liberar.set()
+            verificacao.join(5)
+            self.assertTrue(routers.replica_saudavel('replica_1'))
+        self.assertEqual(atraso.call_count, 1)
+
+
+# ======================================================================
+# Testes do ServerTimingMiddleware
+# ======================================================================
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1, SERVER_TIMING_PUBLIC=True)
+class ServerTimingMiddlewareTestCase(TestCase):
+
+    def metricas(self, response):
+        return dict(re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing']))
+
+    def test_cabecalho_e_log(self):
+        with self.assertLogs('core.timing', 'INFO') as logs, CaptureQueriesContext(connection) as consultas:
+            response = Client().get(reverse('index'))
+        metricas = self.metricas(response)
+        self.assertEqual(set(metricas), {'db', 'tpl', 'total'})
+        self.assertGreater(float(metricas['tpl']), 0)
+        self.assertGreaterEqual(float(metricas['total']), float(metricas['tpl']))
+        self.assertIn(f'"{len(consultas)} consultas"', response['Server-Timing'])
+        registro = logs.records[0]
+        self.assertEqual(registro.timing['consultas'], len(consultas))
+        self.assertEqual(registro.timing['status'], 200)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_sem_amostragem(self):
+        self.assertNotIn('Server-Timing', Client().get(reverse('index')))
+
+    @override_settings(SERVER_TIMING_PUBLIC=False)
+    def test_cabecalho_so_para_equipe(self):
+        with self.assertLogs('core.timing', 'INFO'):
+            self.assertNotIn('Server-Timing', Client().get(reverse('index')))
+        cliente = Client()
+        cliente.force_login(User.objects.create_user('equipe', is_staff=True))
+        self.assertIn('Server-Timing', cliente.get(reverse('index')))
+
+
+# ======================================================================
+# Testes das métricas do Prometheus (MetricsMiddleware e /metrics)
+# ======================================================================
+class MetricasTestCase(TestCase):
+
+    def setUp(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        override = override_settings(METRICS_DIR=pasta, METRICS_TOKEN='segredo', SERVER_TIMING_SAMPLE_RATE=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        metrics.limpar()
+        self.addCleanup(metrics.limpar)
+        self.pasta = pasta
+        self.cliente = Client()
+
+    def exportar(self):
+        response = self.cliente.get('/metrics', HTTP_AUTHORIZATION='Bearer segredo')
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_requisicoes_consultas_e_formulario(self):
+        self.cliente.get(reverse('index'))
+        self.cliente.post(reverse('index'), {'nome': 'x'})
+        texto = self.exportar()
+        self.assertIn(
+            'fusion_http_request_duration_seconds_bucket{view="index",method="GET",status="200",le="+Inf"} 1', texto,
+        )
+        self.assertIn('fusion_http_request_duration_seconds_count{view="index",method="POST",status="200"} 1', texto)
+        self.assertRegex(texto, r'fusion_db_queries_total\{view="index"\} [1-9]')
+        self.assertIn('fusion_contact_form_submissions_total{result="invalido"} 1', texto)
+
+    def test_cache_e_storage(self):
+        url = reverse('pictures:placeholder', kwargs={'alt': 'metricas', 'ratio': '1x1', 'width': 480, 'file_type': 'PNG'})
+        self.cliente.get(url)
+        self.cliente.get(url)
+        texto = self.exportar()
+        self.assertIn('fusion_cache_requests_total{cache="placeholders",result="hit"} 1', texto)
+        self.assertIn('fusion_cache_requests_total{cache="placeholders",result="miss"} 1', texto)
+        self.assertIn('# TYPE fusion_storage_call_duration_seconds histogram', texto)
+
+    def test_soma_os_processos(self):
+        metrics.consultas.inc(3, view='index')
+        with open(os.path.join(self.pasta, '99999999.json'), 'w') as arquivo:
+            json.dump([['fusion_db_queries_total', ['index'], 4]], arquivo)
+            # Arquivo de outro worker.
+        self.assertIn('fusion_db_queries_total{view="index"} 7', self.exportar().splitlines())
+        metrics.arquivar_processo(99999999)
+        self.assertFalse(os.path.exists(os.path.join(self.pasta, '99999999.json')))
+        self.assertIn('fusion_db_queries_total{view="index"} 7', self.exportar().splitlines())
+        # O contador não diminui quando o worker é encerrado.
+
+    @override_settings(METRICS_FLUSH_INTERVAL=0)
+    def test_grava_apenas_nos_workers(self):
+        self.cliente.get(reverse('index'))
+        self.assertEqual(os.listdir(self.pasta), [])
+        # Fora do gunicorn (comandos, testes): nada em METRICS_DIR.
+        with mock.patch.object(metrics, '_gravacao_ativa', [True]):
+            self.cliente.get(reverse('index'))
+        self.assertEqual(os.listdir(self.pasta), [f'{os.getpid()}.json'])
+
+    def test_acesso(self):
+        self.assertEqual(403, self.cliente.get('/metrics').status_code)
+        self.assertEqual(403, self.cliente.get('/metrics', HTTP_AUTHORIZATION='Bearer errado').status_code)
+
+
+# ======================================================================
+# Testes do ProfilingMiddleware (perfil sob demanda)
+# ======================================================================
+class ProfilingMiddlewareTestCase(TestCase):
+
+    def setUp(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        override = override_settings(PROFILING_DIR=pasta, PROFILING_MAX_FILES=2)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.pasta = pasta
+        self.cliente = Client()
+        self.cliente.force_login(User.objects.create_user('equipe', is_staff=True))
+
+    def test_amostragem_gera_folded(self):
+        response = self.cliente.get(reverse('index'), {'__perfil': 'amostragem'})
+        nome = response['X-Perfil']
+        self.assertTrue(nome.endswith('.folded'))
+        with open(os.path.join(self.pasta, nome)) as arquivo:
+            linhas = arquivo.read().splitlines()
+        for linha in linhas:
+            self.assertRegex(linha, r'^\S.* \d+$')
+            # Formato .folded: "quadro;quadro;quadro quantidade".
+
+    def test_cprofile_pelo_cabecalho_e_pagina_do_admin(self):
+        response = self.cliente.get(reverse('admin:core_servico_changelist'), HTTP_X_PERFIL='cprofile')
+        nome = response['X-Perfil']
+        self.assertTrue(nome.endswith('.prof'))
+        self.assertTrue(os.path.exists(os.path.join(self.pasta, nome[:-5] + '.txt')))
+        pagina = self.cliente.get(reverse('admin_perfis'))
+        self.assertContains(pagina, reverse('admin_perfil_arquivo', args=[nome]))
+        download = self.cliente.get(reverse('admin_perfil_arquivo', args=[nome]))
+        self.assertEqual(200, download.status_code)
+        self.assertEqual(404, self.cliente.get(reverse('admin_perfil_arquivo', args=['..%2Fsettings.py'])).status_code)
+
+    def test_mantem_os_mais_recentes(self):
+        for _ in range(3):
+            self.cliente.get(reverse('index'), {'__perfil': 'cprofile'})
+        self.assertLessEqual(len(os.listdir(self.pasta)), 4)
+        # PROFILING_MAX_FILES=2 perfis, com 2 arquivos cada.
+
+    def test_ignorado_para_visitantes(self):
+        response = Client().get(reverse('index'), {'__perfil': 'cprofile'})
+        self.assertNotIn('X-Perfil', response)
+        self.assertEqual(os.listdir(self.pasta), [])
@@ -22,6 +22,15 @@ from core.models import get_file_path
 # Essa função é responsável por gerar nomes de arquivos únicos para upload
 # baseado em UUID.
 
+import shutil
+import tempfile
+from io import BytesIO
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.test import override_settings
+# Usados nos testes do LQIP: criam uma imagem PNG em memória e uma pasta
+# temporária que substitui MEDIA_ROOT durante o teste.
+
 
 # ======================================================================
 # Testes para a função get_file_path
@@ -53,9 +62,10 @@ class GetFilePathTestCase(TestCase):
 class ServicoTestCase(TestCase):
     # Define testes para o modelo `Servico`.
 
-    def setUp(self):
-        # Cria uma instância de `Servico` usando `mommy.make()`.
-        self.servico = mommy.make("Servico")
+    @classmethod
+    def setUpTestData(cls):
+        # Cria uma instância de `Servico` usando `mommy.make()`, uma vez para a classe.
+        cls.servico = mommy.make("Servico")
         # `mommy.make()` cria automaticamente os campos obrigatórios com valores válidos.
 
     def test_str(self):
@@ -70,9 +80,10 @@ class ServicoTestCase(TestCase):
 class CargoTestCase(TestCase):
     # Define testes para o modelo `Cargo`.
 
-    def setUp(self):
-        # Cria uma instância de `Cargo` usando `mommy.make()`.
-        self.cargo = mommy.make("Cargo")
+    @classmethod
+    def setUpTestData(cls):
+        # Cria uma instância de `Cargo` usando `mommy.make()`, uma vez para a classe.
+        cls.cargo = mommy.make("Cargo")
 
     def test_str(self):
         # Testa o método `__str__` do modelo `Cargo`.
@@ -86,11 +97,42 @@ class CargoTestCase(TestCase):
 class EquipeTestCase(TestCase):
     # Define testes para o modelo `Equipe`.
 
-    def setUp(self):
-        # Cria uma instância de `Equipe` usando `mommy.make()`.
-        self.equipe = mommy.make("Equipe")
+    @classmethod
+    def setUpTestData(cls):
+        # Cria uma instância de `Equipe` usando `mommy.make()`, uma vez para a classe.
+        cls.equipe = mommy.make("Equipe")
 
     def test_str(self):
         # Testa o método `__str__` do modelo `Equipe`.
         self.assertEqual(str(self.equipe), self.equipe.nome)
         # Garante que o objeto convertido em string retorna o nome do membro da equipe.
+
+
+# ======================================================================
+# Testes do placeholder de baixa qualidade (LQIP) do modelo Equipe
+# ======================================================================
+class EquipeLqipTestCase(TestCase):
+    # Verifica que o LQIP é calculado no upload de uma nova imagem.
+
+    def setUp(self):
+        # Usa uma pasta temporária como MEDIA_ROOT para não sujar 'media/'.
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_lqip_no_upload(self):
+        buffer = BytesIO()
+        Image.new("RGB", (64, 48), color="red").save(buffer, "PNG")
+        equipe = mommy.prepare("Equipe", cargo=mommy.make("Cargo"))
+        equipe.imagem = ContentFile(buffer.getvalue(), name="foto.png")
+        equipe.save()
+        self.assertTrue(equipe.imagem_lqip.startswith("data:image/webp;base64,"))
+        # A miniatura deve ser muito menor que a imagem original.
+        self.assertLess(len(equipe.imagem_lqip), 1000)
+
+    def test_sem_imagem(self):
+        equipe = mommy.make("Equipe")
+        self.assertEqual(equipe.imagem_lqip, "")
+
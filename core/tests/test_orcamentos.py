@@ -0,0 +1,56 @@
+import shutil
+import tempfile
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Equipe
+from core.pagination import codificar_cursor
+from core.testing import OrcamentoMixin
+from core.views import IndexView
+
+
+# ======================================================================
+# Orçamentos de consultas e de tempo (core/testing.py)
+# ======================================================================
+class OrcamentoViewsTestCase(OrcamentoMixin, TestCase):
+
+    def test_pagina_inicial(self):
+        self.client.cookies[IndexView.cookie_semente] = '0'
+        # Semente fixa: a rotação sempre começa no menor id (ver core/pagination.py).
+        self.assertOrcamentoView(reverse('index'), consultas=6, segundos=0.5)
+
+    def test_fragmentos(self):
+        cursor = codificar_cursor({'p': 1, 'f': 0, 'u': None})
+        self.assertOrcamentoView(reverse('fragmento_equipe'), data={'cursor': cursor}, consultas=2, segundos=0.25)
+        self.assertOrcamentoView(reverse('fragmento_servicos'), data={'cursor': cursor}, consultas=2, segundos=0.25)
+
+    def test_api(self):
+        for nome in ('api_servicos', 'api_equipe', 'api_cargos'):
+            self.assertOrcamentoView(reverse(nome), data={'limite': 5}, secure=True, consultas=2, segundos=0.25)
+
+
+class OrcamentoComandosTestCase(OrcamentoMixin, TestCase):
+
+    def test_export_data(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        self.assertOrcamentoComando('export_data', '--output-dir', pasta, consultas=5, segundos=1.0)
+        # Uma consulta por modelo, mais o savepoint da transação única do export.
+
+
+class OrcamentoMixinTestCase(OrcamentoMixin, TestCase):
+
+    def test_detecta_n_mais_1(self):
+        def uma_consulta_por_membro():
+            for membro in Equipe.objects.all():
+                str(membro.cargo)
+        with self.assertRaisesMessage(AssertionError, 'cresce com a quantidade de linhas'):
+            self.assertOrcamento('N+1', uma_consulta_por_membro)
+        curva = self.assertOrcamento('N+1 aceito', uma_consulta_por_membro, pode_crescer=True, tamanhos=(1, 3))
+        self.assertEqual([consultas for _, consultas, _ in curva], [2, 4])
+
+    def test_orcamento_de_consultas(self):
+        with self.assertRaisesMessage(AssertionError, 'Mais de 1 consultas'):
+            self.assertOrcamento('duas consultas', lambda: [connection.cursor().execute('SELECT 1') for _ in range(2)], consultas=1)
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from model_mommy import mommy
+
+from core import slowqueries
+from core.models import Equipe
+
+
+# ======================================================================
+# Registro de consultas lentas (core/slowqueries.py)
+# ======================================================================
+class ConsultasLentasTestCase(TestCase):
+
+    def setUp(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        self.arquivo = os.path.join(pasta, 'slow_queries.log')
+        override = override_settings(SLOW_QUERY_MS=0, SLOW_QUERY_EXPLAIN=True, SLOW_QUERY_LOG_FILE=self.arquivo)
+        override.enable()
+        self.addCleanup(override.disable)
+        slowqueries._explicados.clear()
+
+    def registrar(self, funcao):
+        # Liga o wrapper só durante 'funcao' e devolve os registros gravados.
+        with self.assertLogs('core.slowqueries', 'WARNING') as logs, connection.execute_wrapper(slowqueries.registrar):
+            funcao()
+        with open(f'{self.arquivo}.{os.getpid()}', 'a', encoding='utf-8') as saida:
+            saida.writelines(r.getMessage() + '\n' for r in logs.records)
+            # O que o ArquivoPorProcesso gravaria (ver slowqueries.instalar()).
+        return [json.loads(r.getMessage()) for r in logs.records]
+
+    def test_impressao_digital(self):
+        self.assertEqual(
+            slowqueries.impressao_digital("SELECT * FROM t WHERE id IN (1, 2, 3) AND nome = 'a'"),
+            slowqueries.impressao_digital("SELECT * FROM t WHERE id IN (7, 8) AND nome = 'outro'"),
+        )
+        self.assertNotEqual(
+            slowqueries.impressao_digital('SELECT * FROM t WHERE id = %s'),
+            slowqueries.impressao_digital('SELECT * FROM u WHERE id = %s'),
+        )
+
+    def test_origem_no_template_e_plano(self):
+        mommy.make('Equipe', imagem='sintetica.png', image_width=480, image_height=480, _quantity=2)
+
+        def requisicoes():
+            self.client.get(reverse('index'))
+            render_to_string('team_itens.html', {'itens': list(Equipe.objects.all())})
+            # Sem o select_related('cargo') da EquipeFragmentoView: um N+1 de verdade.
+        registros = self.registrar(requisicoes)
+        cargos = [r for r in registros if 'FROM "core_cargo"' in r['sql']]
+        self.assertEqual(len(cargos), 2)
+        # Uma consulta por membro, disparada por {{ e.cargo }}.
+        self.assertTrue(all(r['template'].startswith('team_itens.html:') for r in cargos))
+        self.assertEqual(len({r['fingerprint'] for r in cargos}), 1)
+        self.assertTrue(cargos[0]['plano'])
+        self.assertNotIn('plano', cargos[1])
+        # EXPLAIN só na primeira ocorrência de cada fingerprint.
+        servicos = next(r for r in registros if 'FROM "core_servico"' in r['sql'])
+        self.assertTrue(servicos['codigo'].startswith('core/pagination.py'))
+
+    def test_pagina_do_admin(self):
+        mommy.make('Servico', _quantity=3)
+        self.registrar(lambda: self.client.get(reverse('index')))
+        self.registrar(lambda: self.client.get(reverse('index')))
+        grupos = slowqueries.piores(slowqueries.ler_registros())
+        self.assertEqual(grupos, sorted(grupos, key=lambda g: g['total_ms'], reverse=True))
+        self.assertTrue(all(g['quantidade'] >= 2 for g in grupos))
+        # A mesma consulta nas duas requisições cai no mesmo grupo.
+        self.client.force_login(User.objects.create_user('equipe', is_staff=True))
+        resposta = self.client.get(reverse('admin_consultas_lentas'))
+        self.assertContains(resposta, 'core_servico')
+
+    def test_consulta_com_erro_nao_e_registrada(self):
+        with self.assertNoLogs('core.slowqueries', 'WARNING'), connection.execute_wrapper(slowqueries.registrar):
+            with self.assertRaises(DatabaseError), connection.cursor() as cursor:
+                cursor.execute('SELECT * FROM tabela_que_nao_existe')
+
+    def test_um_arquivo_por_processo(self):
+        arquivo_rotativo = slowqueries.ArquivoPorProcesso(self.arquivo, 2, encoding='utf-8')
+        self.addCleanup(arquivo_rotativo.close)
+        registro = logging.makeLogRecord({'msg': '{}'})
+        arquivo_rotativo.emit(registro)
+        with mock.patch('os.getpid', return_value=999999):
+            arquivo_rotativo._trocar_de_processo()
+            # O que o fork faz no worker (os.register_at_fork).
+        arquivo_rotativo.emit(registro)
+        self.assertTrue(os.path.exists(f'{self.arquivo}.{os.getpid()}'))
+        self.assertTrue(os.path.exists(f'{self.arquivo}.999999'))
+
+    def test_limpar_antigos(self):
+        for i, pid in enumerate([1, 2, 3]):
+            caminho = f'{self.arquivo}.{pid}'
+            open(caminho, 'w').close()
+            os.utime(caminho, (time.time() - 100 + i, time.time() - 100 + i))
+        slowqueries.limpar_antigos(self.arquivo, 2)
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(self.arquivo))),
+            ['slow_queries.log.2', 'slow_queries.log.3'],
+        )
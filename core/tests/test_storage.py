@@ -0,0 +1,128 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from core import gcs
+from core.cache import LRUCache
+from core.management.commands.startup_report import parse_importtime
+from core.storage import CachedFileSystemStorage, CachedGoogleCloudStorage
+
+
+# ======================================================================
+# Testes do cache LRU
+# ======================================================================
+class LRUCacheTestCase(TestCase):
+
+    def test_descarta_menos_usado(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        # 'a' passa a ser o mais recente, então 'b' deve ser descartado.
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_expira(self):
+        cache = LRUCache()
+        with mock.patch('core.cache.time.monotonic', return_value=100.0):
+            cache.set('a', 1, ttl=10)
+        with mock.patch('core.cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('a'))
+
+
+# ======================================================================
+# Testes do mixin de cache aplicado ao FileSystemStorage
+# ======================================================================
+class CachedFileSystemStorageTestCase(TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta)
+        self.storage = CachedFileSystemStorage(location=self.pasta, base_url='/media/')
+
+    def test_url_em_cache(self):
+        with mock.patch('django.core.files.storage.FileSystemStorage.url',
+                        return_value='/media/a.png') as url:
+            self.storage.url('a.png')
+            self.storage.url('a.png')
+        self.assertEqual(url.call_count, 1)
+
+    def test_save_e_delete_invalidam(self):
+        nome = self.storage.save('a.txt', ContentFile(b'123'))
+        self.assertEqual(self.storage.size(nome), 3)
+        self.storage.delete(nome)
+        self.assertFalse(self.storage.exists(nome))
+        nome = self.storage.save('a.txt', ContentFile(b'12345'))
+        self.assertEqual(self.storage.size(nome), 5)
+
+
+# ======================================================================
+# Validade das URLs assinadas do GCS
+# ======================================================================
+class CachedGoogleCloudStorageTestCase(TestCase):
+
+    def test_ttl_url_assinada(self):
+        storage = CachedGoogleCloudStorage(
+            bucket_name='teste', expiration=timedelta(hours=1), querystring_auth=True,
+        )
+        self.assertEqual(storage.get_url_cache_ttl('a.png'), 1800)
+
+    def test_ttl_url_publica(self):
+        storage = CachedGoogleCloudStorage(bucket_name='teste', querystring_auth=False)
+        self.assertIsNone(storage.get_url_cache_ttl('a.png'))
+
+    def test_cliente_compartilhado(self):
+        cliente = object()
+        with mock.patch('core.storage.get_client', return_value=cliente) as get_client:
+            media = CachedGoogleCloudStorage(bucket_name='teste')
+            static = CachedGoogleCloudStorage(bucket_name='teste')
+            self.assertIs(media.client, cliente)
+            self.assertIs(static.client, cliente)
+        self.assertEqual(get_client.call_count, 2)
+        # Nenhum cliente é criado na instanciação, só no primeiro acesso.
+
+
+# ======================================================================
+# Carregamento preguiçoso das credenciais (core/gcs.py)
+# ======================================================================
+class CredenciaisGcsTestCase(TestCase):
+
+    def setUp(self):
+        gcs._cache.clear()
+        self.addCleanup(gcs._cache.clear)
+
+    @override_settings(GS_CREDENTIALS=None, GS_CREDENTIALS_FILE='/inexistente/credenciais.json')
+    def test_arquivo_ausente(self):
+        with self.assertRaises(ImproperlyConfigured):
+            gcs.get_credentials()
+
+    def test_setup_nao_importa_google(self):
+        ambiente = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        processo = subprocess.run(
+            [sys.executable, '-c', 'import sys, django; django.setup(); '
+             'print("google.oauth2" in sys.modules)'],
+            env=ambiente, capture_output=True, text=True, check=True,
+        )
+        self.assertEqual(processo.stdout.strip(), 'False')
+
+    def test_parse_importtime(self):
+        saida = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       100 |        100 |   django.utils\n'
+            'import time:       250 |        350 | django\n'
+        )
+        self.assertEqual(
+            parse_importtime(saida),
+            [('django.utils', 100, 100, 1), ('django', 250, 350, 0)],
+        )
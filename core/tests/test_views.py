@@ -13,6 +13,16 @@ from django.urls import reverse_lazy
 # Usamos `reverse_lazy` em testes para evitar problemas de carregamento
 # das URLs antes da inicialização do Django.
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import json
+from model_mommy import mommy
+from django.core.files.storage import default_storage
+import os
+import shutil
+import tempfile
+# Usados nos testes da paginação por chave e da API (contagem de consultas e dados de teste).
+
 
 # ======================================================================
 # Testes para a view IndexView
@@ -64,3 +74,186 @@ class IndexViewTestCase(TestCase):
         self.assertEqual(200, request.status_code)
         # Verifica se a resposta HTTP é 200 (reexibe o formulário com erros),
         # que indica que a view não redirecionou porque o formulário é inválido.
+
+
+# ======================================================================
+# Testes para a view PlaceholderView
+# ======================================================================
+class PlaceholderViewTestCase(TestCase):
+
+    def setUp(self):
+        self.cliente = Client()
+        self.url = reverse_lazy("pictures:placeholder", kwargs={
+            "alt": "teste", "ratio": "1x1", "width": 480, "file_type": "PNG",
+        })
+
+    def test_cache_headers(self):
+        resposta = self.cliente.get(self.url)
+        self.assertEqual(200, resposta.status_code)
+        self.assertIn("immutable", resposta["Cache-Control"])
+        self.assertTrue(resposta["ETag"].startswith('"'))
+
+    def test_if_none_match(self):
+        etag = self.cliente.get(self.url)["ETag"]
+        resposta = self.cliente.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, resposta.status_code)
+        # O ETag é o mesmo porque a imagem vem do cache, e não é redesenhada.
+
+    def test_ratio_invalido(self):
+        url = reverse_lazy("pictures:placeholder", kwargs={
+            "alt": "teste", "ratio": "None", "width": 480, "file_type": "PNG",
+        })
+        self.assertEqual(404, self.cliente.get(url).status_code)
+
+    def test_if_none_match_lista(self):
+        etag = self.cliente.get(self.url)["ETag"]
+        resposta = self.cliente.get(self.url, HTTP_IF_NONE_MATCH=f'"outro", W/{etag}')
+        self.assertEqual(304, resposta.status_code)
+        resposta = self.cliente.get(self.url, HTTP_IF_NONE_MATCH=f'"x{etag[1:]}')
+        self.assertEqual(200, resposta.status_code)
+        # Um ETag que apenas contém o atual não vale.
+
+    def test_apenas_tamanhos_configurados(self):
+        for kwargs in (
+            {"alt": "teste", "ratio": "1x1", "width": 6000, "file_type": "PNG"},
+            {"alt": "teste", "ratio": "16x9", "width": 480, "file_type": "PNG"},
+            {"alt": "teste", "ratio": "1x1", "width": 480, "file_type": "WEBP"},
+            {"alt": "x" * 65, "ratio": "1x1", "width": 480, "file_type": "PNG"},
+        ):
+            with self.subTest(**kwargs):
+                url = reverse_lazy("pictures:placeholder", kwargs=kwargs)
+                self.assertEqual(404, self.cliente.get(url).status_code)
+
+    def test_limite_da_pasta(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta)
+        with self.settings(PICTURES_PLACEHOLDER_CACHE_DIR=pasta, PICTURES_PLACEHOLDER_CACHE_DIR_MAX_FILES=2):
+            for indice in range(4):
+                url = reverse_lazy("pictures:placeholder", kwargs={
+                    "alt": f"limite-{indice}", "ratio": "1x1", "width": 480, "file_type": "PNG",
+                })
+                self.assertEqual(200, self.cliente.get(url).status_code)
+        self.assertEqual(2, len(os.listdir(pasta)))
+
+
+# ======================================================================
+# Aquecimento dos workers do gunicorn (core/warmup.py)
+# ======================================================================
+class WarmupTestCase(TestCase):
+
+    def test_aquecer(self):
+        from core.warmup import aquecer
+        relatorio = {etapa: resultado for etapa, resultado, _ in aquecer()}
+        self.assertGreater(relatorio["templates"], 0)
+        self.assertEqual(relatorio["página inicial"], 200)
+
+
+# ======================================================================
+# Paginação por chave (keyset) das seções de serviços e equipe
+# ======================================================================
+class FragmentosKeysetTestCase(TestCase):
+
+    def setUp(self):
+        self.servicos = mommy.make("Servico", _quantity=15)
+        mommy.make("Servico", ativo=False, _quantity=3)
+        self.cliente = Client()
+
+    def percorrer(self, primeira):
+        # Segue os cursores até o fim, como o carregar-mais.js.
+        vistos = [s.pk for s in primeira.context["servicos"]]
+        cursor = primeira.context["servicos_proximo"]
+        while cursor:
+            with CaptureQueriesContext(connection) as consultas:
+                resposta = self.cliente.get(reverse_lazy("fragmento_servicos"), {"cursor": cursor})
+            self.assertLessEqual(len(consultas), 2)
+            # No máximo uma consulta por fase da rotação, qualquer que seja a página.
+            vistos += [s.pk for s in resposta.context["itens"]]
+            cursor = resposta.context["proximo"]
+        return vistos
+
+    def test_primeira_pagina_limitada(self):
+        resposta = self.cliente.get(reverse_lazy("index"))
+        self.assertEqual(len(resposta.context["servicos"]), 6)
+        self.assertIn("semente_ordem", resposta.cookies)
+        self.assertContains(resposta, "carregar-mais")
+
+    def test_percorre_todos_uma_vez(self):
+        vistos = self.percorrer(self.cliente.get(reverse_lazy("index")))
+        self.assertEqual(sorted(vistos), sorted(s.pk for s in self.servicos))
+        # Todos os ativos, sem repetição e sem os desativados.
+
+    def test_ordem_estavel_por_visitante(self):
+        self.cliente.cookies["semente_ordem"] = "12345"
+        primeira = self.percorrer(self.cliente.get(reverse_lazy("index")))
+        segunda = self.percorrer(self.cliente.get(reverse_lazy("index")))
+        self.assertEqual(primeira, segunda)
+
+    def test_cursor_invalido(self):
+        resposta = self.cliente.get(reverse_lazy("fragmento_servicos"), {"cursor": "adulterado"})
+        self.assertEqual(400, resposta.status_code)
+
+
+# ======================================================================
+# API JSON paginada por cursor (core/api.py)
+# ======================================================================
+class ApiTestCase(TestCase):
+
+    def setUp(self):
+        self.cargo = mommy.make("Cargo", cargo="Designer")
+        self.equipe = mommy.make(
+            "Equipe", cargo=self.cargo, imagem="sintetica.png",
+            image_width=480, image_height=480, _quantity=7,
+        )
+        mommy.make("Equipe", cargo=self.cargo, ativo=False)
+        self.cliente = Client()
+
+    def json(self, resposta):
+        self.assertEqual(200, resposta.status_code)
+        self.assertTrue(resposta.streaming)
+        return json.loads(b"".join(resposta.streaming_content))
+
+    def test_percorre_todas_as_paginas(self):
+        url, vistos = reverse_lazy("api_equipe") + "?limite=3", []
+        while url:
+            with CaptureQueriesContext(connection) as consultas:
+                dados = self.json(self.cliente.get(url))
+            self.assertEqual(len(consultas), 2)
+            # Agregação do ETag + a página (com o cargo na mesma consulta).
+            self.assertLessEqual(len(dados["resultados"]), 3)
+            vistos += [item["id"] for item in dados["resultados"]]
+            url = dados["proximo"]
+        self.assertEqual(vistos, sorted(e.pk for e in self.equipe))
+
+    def test_campos(self):
+        dados = self.json(self.cliente.get(reverse_lazy("api_equipe"), {"campos": "nome,cargo,imagens"}))
+        item = dados["resultados"][0]
+        self.assertEqual(set(item), {"nome", "cargo", "imagens"})
+        self.assertEqual(item["cargo"], "Designer")
+        self.assertEqual(item["imagens"], {
+            "original": {"png": {"480": default_storage.url("sintetica/480w.png")}},
+            "1/1": {"png": {"480": default_storage.url("sintetica/1/480w.png")}},
+        })
+        # As versões reais no storage, e não a rota de placeholders (/pictures/...).
+
+    def test_etag(self):
+        url = reverse_lazy("api_cargos")
+        etag = self.cliente.get(url)["ETag"]
+        self.assertEqual(304, self.cliente.get(url, HTTP_IF_NONE_MATCH=etag).status_code)
+        self.assertEqual(304, self.cliente.get(url, HTTP_IF_NONE_MATCH=f'"outro", W/{etag}').status_code)
+        self.assertEqual(304, self.cliente.get(url, HTTP_IF_NONE_MATCH="*").status_code)
+        self.assertEqual(200, self.cliente.get(url, HTTP_IF_NONE_MATCH=f'"x{etag[1:]}').status_code)
+        # Um ETag que apenas contém o atual não vale.
+        self.cargo.cargo = "Diretor de arte"
+        self.cargo.save()
+        self.assertNotEqual(etag, self.cliente.get(url)["ETag"])
+        self.assertNotEqual(etag, self.cliente.get(reverse_lazy("api_equipe"))["ETag"])
+
+    def test_parametros_invalidos(self):
+        url = reverse_lazy("api_servicos")
+        for parametros in ({"campos": "senha"}, {"limite": "0"}, {"limite": "x"}, {"cursor": "adulterado"}):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(400, self.cliente.get(url, parametros).status_code)
+        proximo = self.json(self.cliente.get(reverse_lazy("api_equipe"), {"limite": 1}))["proximo"]
+        cursor = proximo.split("cursor=")[1]
+        self.assertEqual(400, self.cliente.get(url + "?cursor=" + cursor).status_code)
+        # Cursor de outro endpoint.
@@ -0,0 +1,115 @@
+# ======================================================================
+# MEDIÇÃO DO TEMPO DE UMA REQUISIÇÃO (BANCO, TEMPLATES E TOTAL)
+# ======================================================================
+# Usado pelo ServerTimingMiddleware (core/middleware.py). Para cada
+# requisição amostrada, soma:
+#   - consultas SQL e o tempo gasto nelas, com connection.execute_wrapper()
+#     instalado em todas as conexões (principal e réplicas);
+#   - tempo de renderização de templates.
+#
+# Templates: o Django só envia o sinal 'template_rendered' dentro do
+# executor de testes (ele instrumenta Template._render). Aqui Template.render
+# é envolvido uma única vez, e apenas o template mais externo de cada
+# renderização é cronometrado: os {% include %} já estão dentro dele.
+
+import contextlib
+import contextvars
+import time
+from dataclasses import dataclass
+
+from django.db import connections
+from django.template.base import Template
+
+_atual = contextvars.ContextVar('medicao_requisicao', default=None)
+
+
+@dataclass
+class Medicao:
+    inicio: float
+    consultas: int = 0
+    banco: float = 0.0
+    render: float = 0.0
+    profundidade: int = 0
+    # Templates sendo renderizados agora (>0 dentro de um include).
+
+    def total(self):
+        return time.perf_counter() - self.inicio
+
+    def como_dict(self):
+        return {
+            'total_ms': round(self.total() * 1000, 2),
+            'banco_ms': round(self.banco * 1000, 2),
+            'consultas': self.consultas,
+            'render_ms': round(self.render * 1000, 2),
+        }
+
+
+def medicao_atual():
+    """Medição da requisição em andamento, ou None se ela não foi amostrada."""
+    return _atual.get()
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicao = _atual.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.banco += time.perf_counter() - inicio
+        medicao.consultas += 1
+
+
+_render_original = Template.render
+
+
+def _render_medido(self, context):
+    medicao = _atual.get()
+    if medicao is None:
+        return _render_original(self, context)
+    medicao.profundidade += 1
+    inicio = time.perf_counter()
+    try:
+        return _render_original(self, context)
+    finally:
+        medicao.profundidade -= 1
+        if medicao.profundidade == 0:
+            medicao.render += time.perf_counter() - inicio
+
+
+def instalar():
+    """Envolve Template.render (uma vez por processo)."""
+    if Template.render is not _render_medido:
+        Template.render = _render_medido
+
+
+@contextlib.contextmanager
+def medir():
+    """
+    Mede o bloco; produz a Medicao, preenchida ao longo da requisição.
+    Dentro de outra medição (ex: ServerTimingMiddleware e MetricsMiddleware
+    na mesma requisição), reaproveita a de fora em vez de medir duas vezes.
+    """
+    existente = _atual.get()
+    if existente is not None:
+        yield existente
+        return
+    medicao = Medicao(inicio=time.perf_counter())
+    token = _atual.set(medicao)
+    try:
+        with contextlib.ExitStack() as pilha:
+            for alias in connections:
+                pilha.enter_context(connections[alias].execute_wrapper(_medir_consulta))
+            yield medicao
+    finally:
+        _atual.reset(token)
+
+
+# ----------------------------------------------------------------------
+# Percentis (comandos loadtest e benchmark_db_connections)
+# ----------------------------------------------------------------------
+def percentil(valores, p):
+    """Valor no percentil p (0 a 100) de 'valores', pelo item mais próximo."""
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
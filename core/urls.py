@@ -10,7 +10,8 @@ from django.urls import path
 # Importa a classe `IndexView` definida no arquivo `views.py` desta mesma aplicação.
 # Essa classe representa a view que será executada quando o usuário acessar a rota configurada.
 # Como ela é uma class-based view, precisará ser convertida em função com `.as_view()`.
-from .views import IndexView
+from .views import EquipeFragmentoView, IndexView, ServicosFragmentoView
+from .api import CargosApiView, EquipeApiView, ServicosApiView
 
 # Cria a lista `urlpatterns`, que contém todas as rotas (URLs) mapeadas para esta aplicação Django.
 # O Django procura essa lista quando precisa decidir qual view deve atender a uma requisição.
@@ -24,4 +25,15 @@ urlpatterns = [
     #   → código Python (ex: reverse('index'))
     #   Isso facilita a manutenção, pois não precisamos alterar todas as referências caso a URL mude no futuro.
     path('', IndexView.as_view(), name = 'index'),
+
+    # Próximas páginas das seções de serviços e equipe (HTML parcial).
+    # - Chamadas pelo static/js/carregar-mais.js com ?cursor=... (paginação por chave).
+    path('fragmentos/servicos/', ServicosFragmentoView.as_view(), name = 'fragmento_servicos'),
+    path('fragmentos/equipe/', EquipeFragmentoView.as_view(), name = 'fragmento_equipe'),
+
+    # API JSON somente leitura (core/api.py), paginada por cursor.
+    # - Parâmetros opcionais: ?campos=..., ?limite=..., ?cursor=...
+    path('api/servicos/', ServicosApiView.as_view(), name = 'api_servicos'),
+    path('api/equipe/', EquipeApiView.as_view(), name = 'api_equipe'),
+    path('api/cargos/', CargosApiView.as_view(), name = 'api_cargos'),
 ]
@@ -2,8 +2,8 @@
 # VIEWS LINHA A LINHA – EXPLICAÇÃO DETALHADA
 # ======================================================================
 
-from django.views.generic import FormView
-# Importa a classe FormView do módulo django.views.generic
+from django.views.generic import FormView, TemplateView, View
+# Importa as classes FormView e View do módulo django.views.generic
 # - "django.views.generic" contém "Class-Based Views" (CBVs) já prontas para usos comuns.
 # - A classe FormView é uma view genérica projetada para lidar com formulários HTML.
 # - Ela automatiza:
@@ -42,6 +42,41 @@ from .forms import ContactForm
 # - Também deve conter um metodo send_email(), usado para enviar os dados por email.
 # - O Django cria automaticamente widgets HTML a partir desse form.
 
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from .cache import etag_confere
+from .placeholders import obter_placeholder
+# Usados pela PlaceholderView (imagens placeholder do django-pictures em cache).
+# - patch_cache_control adiciona diretivas ao cabeçalho Cache-Control.
+# - etag_confere compara o ETag com o cabeçalho If-None-Match.
+# - obter_placeholder devolve os bytes da imagem e o ETag a partir do cache.
+
+import os
+import tracemalloc
+from django.conf import settings
+from django.shortcuts import redirect
+from django.core import signing
+from django.http import HttpResponseBadRequest
+from .pagination import decodificar_cursor, nova_semente, paginar, primeira_pagina
+# Usados pela paginação por chave (keyset) da página inicial (core/pagination.py).
+
+from . import memory
+from .database import estatisticas_pool
+# Usados pela MemoriaView (página de memória e conexões do worker no admin).
+
+from django.http import HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from . import slowqueries
+# Usado pela ConsultasLentasView (registro de consultas lentas no admin).
+
+from django.http import FileResponse
+from . import profiling
+from .middleware import ProfilingMiddleware
+# Usados pela PerfisView (perfis de requisição gravados pelo ProfilingMiddleware).
+
+from . import metrics
+# Métricas do Prometheus: envios do formulário de contato e a MetricasView (/metrics).
+
 # ======================================================================
 # Definição da View IndexView
 # ======================================================================
@@ -74,13 +109,32 @@ class IndexView(FormView):
     # - Usa reverse_lazy para resolver o nome da rota 'index' definido em urls.py.
     # - O FormView chamará HttpResponseRedirect para essa URL depois de form_valid().
 
+    cookie_semente = 'semente_ordem'
+    # Cookie com a semente que define a ordem (embaralhada) de serviços e
+    # equipe para este visitante; ver core/pagination.py.
+
+    def semente(self):
+        """
+        Retorna a semente do visitante (lida do cookie ou sorteada).
+        - Cookie ausente ou inválido → nova semente, gravada na resposta
+          por render_to_response().
+        """
+        try:
+            return int(self.request.COOKIES[self.cookie_semente])
+        except (KeyError, ValueError):
+            if not hasattr(self, 'semente_nova'):
+                self.semente_nova = nova_semente()
+            return self.semente_nova
+
     def get_context_data(self, **kwargs):
         """
         Retorna o dicionário de contexto usado para renderizar o template.
         - Aqui adicionamos dados extras além do formulário padrão.
         - Inclui:
-            * Lista de serviços disponíveis (ordem aleatória).
-            * Lista de membros da equipe (ordem aleatória).
+            * Primeira página de serviços ativos (ordem da semente do visitante).
+            * Primeira página de membros ativos da equipe (mesma ideia).
+            * Cursores das próximas páginas, buscadas depois pelo navegador
+              em ServicosFragmentoView e EquipeFragmentoView.
         """
         context = super().get_context_data(**kwargs)
         # Chama o metodo get_context_data da superclasse (FormView → TemplateResponseMixin).
@@ -88,23 +142,38 @@ class IndexView(FormView):
         # - Ele já inclui o formulário em 'form', pronto para ser usado no template.
         # - O uso de super() chama a implementação herdada, mantendo o comportamento padrão.
 
-        context['servicos'] = Servico.objects.order_by('?').all()
-        # Adiciona ao contexto todos os registros do modelo Servico.
-        # - Servico.objects é o "manager" padrão do ORM, que gera consultas SQL.
-        # - order_by('?') embaralha a ordem dos resultados (aleatório).
-        # - all() retorna um QuerySet com todos os serviços.
-        # - O template pode iterar sobre context['servicos'] para exibir cada serviço.
+        context['servicos'], context['servicos_proximo'] = primeira_pagina(
+            ServicosFragmentoView.queryset, ServicosFragmentoView.tamanho_pagina, self.semente(),
+        )
+        # Adiciona ao contexto a primeira página de serviços ativos.
+        # - filter(ativo=True) (no queryset da ServicosFragmentoView) esconde os
+        #   desativados no admin e usa o índice parcial 'servico_ativo_idx'.
+        # - A ordem é uma rotação da pk a partir de um ponto sorteado por visitante,
+        #   em vez de order_by('?'), que ordenava a tabela inteira a cada visita.
+        # - 'servicos_proximo' é o cursor da página seguinte (None se não houver).
 
-        context['Equipe'] = Equipe.objects.order_by('?').all()
-        # Adiciona todos os registros do modelo Equipe ao contexto.
+        context['Equipe'], context['equipe_proximo'] = primeira_pagina(
+            EquipeFragmentoView.queryset, EquipeFragmentoView.tamanho_pagina, self.semente(),
+        )
+        # Adiciona a primeira página de membros ativos da equipe ao contexto
+        # (índice parcial 'equipe_ativo_idx').
         # - Semelhante aos serviços, mas para a equipe.
-        # - Também em ordem aleatória.
         # - Observação: a chave é 'Equipe' com "E" maiúsculo, então no template deve-se usar {{ Equipe }}.
 
         return context
         # Retorna o dicionário de contexto atualizado.
         # - Esse dicionário será passado para o template index.html.
-        # - O template terá acesso a 'form', 'servicos' e 'Equipe'.
+        # - O template terá acesso a 'form', 'servicos', 'Equipe' e aos cursores.
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if hasattr(self, 'semente_nova'):
+            response.set_cookie(
+                self.cookie_semente, str(self.semente_nova),
+                max_age=60 * 60 * 24 * 30, httponly=True, samesite='Lax',
+            )
+            # Guarda a semente por 30 dias: o visitante mantém a mesma ordem.
+        return response
 
     def form_valid(self, form, *args, **kwargs):
         """
@@ -115,6 +184,9 @@ class IndexView(FormView):
             2. Cria mensagem de sucesso (feedback ao usuário).
             3. Redireciona automaticamente para success_url.
         """
+        metrics.formulario_contato.inc(result='valido')
+        # Conta o envio antes do e-mail: falhas no envio aparecem na métrica de e-mail.
+
         form.send_email()
         # Chama o metodo definido em ContactForm.
         # - Responsável por montar o conteúdo do email.
@@ -140,6 +212,8 @@ class IndexView(FormView):
             1. Adiciona mensagem de erro para o usuário.
             2. Reexibe o formulário no template, com erros destacados.
         """
+        metrics.formulario_contato.inc(result='invalido')
+
         messages.error(self.request, 'Erro ao tentar enviar o email!')
         # Cria uma mensagem de erro associada ao request.
         # - Essa mensagem aparecerá no template como feedback negativo.
@@ -150,3 +224,203 @@ class IndexView(FormView):
         # - Essa implementação renderiza novamente o template definido em template_name.
         # - Inclui o objeto 'form' com os erros no contexto.
         # - Assim, o usuário vê os campos preenchidos e as mensagens de erro.
+
+
+# ======================================================================
+# Definição da View PlaceholderView
+# ======================================================================
+
+class PlaceholderView(View):
+    """
+    Substitui pictures.views.placeholder na rota 'pictures/'.
+    - Os bytes da imagem vêm do cache de core.placeholders (memória + disco),
+      então o Pillow só desenha cada combinação de tamanho/proporção/formato uma vez.
+    - Responde com ETag forte e Cache-Control de longa duração (1 ano, immutable).
+    - Se o navegador enviar If-None-Match com o mesmo ETag, responde 304 sem corpo.
+    - Tamanhos, proporções e formatos fora dos PictureFields do projeto dão 404.
+    """
+
+    cache_max_age = 60 * 60 * 24 * 365
+    # 1 ano, o mesmo prazo usado pelo django-pictures.
+
+    def get(self, request, alt, ratio, width, file_type):
+        try:
+            conteudo, etag = obter_placeholder(width, ratio, file_type, alt)
+        except (ValueError, ZeroDivisionError):
+            raise Http404()
+            # Proporção inválida (ex: 'None', '1x0'), tamanho/formato que
+            # nenhum PictureField gera ou 'alt' longo demais.
+
+        etag = f'"{etag}"'
+        if etag_confere(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(conteudo, content_type=f'image/{file_type.lower()}')
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=self.cache_max_age, immutable=True)
+        return response
+
+
+# ======================================================================
+# Definição da View MemoriaView
+# ======================================================================
+
+class MemoriaView(TemplateView):
+    """
+    Página do admin (apenas equipe) com a memória do worker que atendeu a
+    requisição: PID, RSS atual e de pico, limite do MemoryWatchdogMiddleware
+    e, se o tracemalloc estiver ligado, as linhas que mais alocaram memória.
+    - Cada worker do gunicorn é um processo: recarregar a página pode
+      mostrar outro PID.
+    - Se DB_POOL=1, mostra também as estatísticas do pool de conexões.
+    - POST com acao=iniciar/parar liga ou desliga o tracemalloc neste worker.
+    """
+
+    template_name = 'admin/memoria.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        pool = estatisticas_pool()
+        context.update(
+            title='Memória do worker',
+            pid=os.getpid(),
+            rss_mb=memory.rss_atual_mb(),
+            pico_rss_mb=max(memory.pico_rss_mb(), memory.estatisticas['pico_rss_mb']),
+            requisicoes=memory.estatisticas['requisicoes'],
+            limite_mb=getattr(settings, 'MEMORY_WATCHDOG_MAX_RSS_MB', None),
+            tracemalloc_ativo=tracemalloc.is_tracing(),
+            alocacoes=memory.top_alocacoes(),
+            pool=sorted(pool.items()) if pool is not None else None,
+        )
+        return context
+
+    def post(self, request, *args, **kwargs):
+        if request.POST.get('acao') == 'iniciar':
+            memory.iniciar_tracemalloc()
+        elif request.POST.get('acao') == 'parar':
+            tracemalloc.stop()
+        return redirect(request.path)
+
+
+# ======================================================================
+# Definição das Views de fragmentos (próximas páginas da página inicial)
+# ======================================================================
+
+class FragmentoKeysetView(TemplateView):
+    """
+    Devolve apenas o HTML dos próximos itens de uma seção da página inicial.
+    - Recebe ?cursor=... (gerado por core.pagination e assinado).
+    - O JavaScript 'carregar-mais.js' insere a resposta no lugar do botão
+      "Carregar mais", que vem junto se ainda houver outra página.
+    - Cursor ausente, alterado ou inválido → 400.
+    """
+
+    queryset = None
+    tamanho_pagina = 6
+
+    def get(self, request, *args, **kwargs):
+        try:
+            estado = decodificar_cursor(request.GET.get('cursor', ''))
+        except signing.BadSignature:
+            return HttpResponseBadRequest('Cursor inválido.')
+        itens, proximo = paginar(self.queryset, self.tamanho_pagina, estado)
+        return self.render_to_response(self.get_context_data(itens=itens, proximo=proximo))
+
+
+class ServicosFragmentoView(FragmentoKeysetView):
+    template_name = 'servicos_itens.html'
+    queryset = Servico.objects.filter(ativo=True)
+    tamanho_pagina = 6
+    # 6 serviços = 2 linhas de 3 colunas.
+
+
+class EquipeFragmentoView(FragmentoKeysetView):
+    template_name = 'team_itens.html'
+    queryset = Equipe.objects.filter(ativo=True).select_related('cargo')
+    # select_related: o cargo vem na mesma consulta; sem ele, {{ e.cargo }}
+    # no template fazia uma consulta por membro (N+1).
+    tamanho_pagina = 4
+    # 4 pessoas = 2 linhas de 2 colunas (cada uma com foto).
+
+
+# ======================================================================
+# Definição da View MetricasView
+# ======================================================================
+
+class MetricasView(View):
+    """
+    Rota /metrics lida pelo Prometheus (formato de exposição em texto).
+    - Os valores são a soma de todos os workers do gunicorn (core/metrics.py).
+    - Com METRICS_TOKEN definido, exige 'Authorization: Bearer <token>'.
+      Sem ele, apenas usuários da equipe (is_staff) ou DEBUG.
+    """
+
+    def get(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', None)
+        if token:
+            permitido = constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+        else:
+            permitido = settings.DEBUG or request.user.is_staff
+        if not permitido:
+            return HttpResponseForbidden()
+        return HttpResponse(metrics.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# ======================================================================
+# Definição da View ConsultasLentasView
+# ======================================================================
+
+class ConsultasLentasView(TemplateView):
+    """
+    Página do admin (apenas equipe) com as consultas mais lentas gravadas
+    por core/slowqueries.py (SLOW_QUERY_MS), agrupadas pela impressão
+    digital e ordenadas pelo tempo total: origem no código e no template,
+    exemplo com parâmetros e, se capturado, o plano de execução.
+    """
+
+    template_name = 'admin/consultas_lentas.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        registros = slowqueries.ler_registros()
+        context.update(
+            title='Consultas lentas',
+            limite_ms=getattr(settings, 'SLOW_QUERY_MS', None),
+            arquivo=settings.SLOW_QUERY_LOG_FILE,
+            total=len(registros),
+            grupos=slowqueries.piores(registros),
+        )
+        return context
+
+
+# ======================================================================
+# Definição das Views de perfis de requisição
+# ======================================================================
+
+class PerfisView(TemplateView):
+    """
+    Página do admin (apenas equipe) com os perfis gravados pelo
+    ProfilingMiddleware (core/profiling.py), do mais recente ao mais antigo,
+    com links para baixar os arquivos (.folded, .prof, .txt).
+    """
+
+    template_name = 'admin/perfis.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(
+            title='Perfis de requisições',
+            perfis=profiling.listar(),
+            parametro=f'?{ProfilingMiddleware.parametro}',
+        )
+        return context
+
+
+class PerfilArquivoView(View):
+    """Download de um arquivo de perfil (apenas nomes listados em PROFILING_DIR)."""
+
+    def get(self, request, nome):
+        caminho = profiling.caminho_do_arquivo(nome)
+        if caminho is None:
+            raise Http404()
+        return FileResponse(open(caminho, 'rb'), as_attachment=True, filename=nome, content_type='text/plain')
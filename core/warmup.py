@@ -0,0 +1,83 @@
+# ======================================================================
+# AQUECIMENTO (WARM-UP) DE UM WORKER DO GUNICORN
+# ======================================================================
+# Chamado pelo hook 'post_fork' do gunicorn.conf.py, logo depois que um
+# worker nasce e ANTES de ele aceitar conexões. Sem isso, a primeira
+# requisição de cada worker paga sozinha por:
+#   - abrir a conexão com o PostgreSQL;
+#   - ler e compilar os templates (o loader com cache guarda o resultado);
+#   - preencher os caches por processo (URLs do storage em core.storage,
+#     cliente do GCS em core.gcs) ao renderizar a página inicial.
+# Cada etapa é independente: uma falha é registrada e não derruba o worker.
+
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.test import Client
+
+logger = logging.getLogger(__name__)
+
+
+def abrir_conexoes():
+    """Fecha conexões herdadas do processo pai e abre uma nova em cada banco. Retorna a quantidade."""
+    total = 0
+    for conexao in connections.all():
+        if not conexao.in_atomic_block:
+            conexao.close()
+            # Uma conexão aberta antes do fork (preload_app) seria compartilhada
+            # entre os workers: cada um precisa da sua.
+        conexao.ensure_connection()
+        total += 1
+    return total
+
+
+def compilar_templates():
+    """Carrega os templates do projeto no cache do loader. Retorna a quantidade."""
+    total = 0
+    projeto = str(settings.BASE_DIR)
+    for engine in engines.all():
+        for pasta in engine.template_dirs:
+            if not str(pasta).startswith(projeto) or not os.path.isdir(pasta):
+                continue
+                # Ignora os templates de bibliotecas (ex: admin), raramente usados.
+            for root, _, arquivos in os.walk(pasta):
+                for nome in arquivos:
+                    if nome.endswith('.html'):
+                        engine.get_template(os.path.relpath(os.path.join(root, nome), pasta))
+                        total += 1
+    return total
+
+
+def carregar_pagina_inicial():
+    """Renderiza a página inicial uma vez, sem passar pela rede. Retorna o status HTTP."""
+    cliente = Client(raise_request_exception=False)
+    # O host 'testserver' já está em ALLOWED_HOSTS.
+    return cliente.get('/', secure=not settings.DEBUG).status_code
+
+
+ETAPAS = [
+    ('conexão com o banco', abrir_conexoes),
+    ('templates', compilar_templates),
+    ('página inicial', carregar_pagina_inicial),
+]
+
+
+def aquecer():
+    """
+    Executa as etapas de aquecimento e retorna uma lista de
+    (etapa, resultado, segundos). 'resultado' é a exceção em caso de falha.
+    """
+    relatorio = []
+    for nome, etapa in ETAPAS:
+        inicio = time.perf_counter()
+        try:
+            resultado = etapa()
+        except Exception as erro:
+            logger.exception('Falha no aquecimento do worker (%s)', nome)
+            resultado = erro
+        relatorio.append((nome, resultado, time.perf_counter() - inicio))
+    return relatorio
@@ -0,0 +1,62 @@
+# ======================================================================
+# CONFIGURAÇÕES PARA OS TESTES (RÁPIDAS E SEM DEPENDÊNCIAS EXTERNAS)
+# ======================================================================
+# Usadas automaticamente por 'python manage.py test' (ver manage.py), ou
+# explicitamente com --settings=fusion.settings_test.
+#
+# Diferenças em relação a fusion/settings.py:
+#   - banco SQLite em memória: dispensa o PostgreSQL local (e a rede);
+#     com --parallel, cada processo recebe a sua cópia do banco de teste;
+#   - mídia em memória (core.storage.SharedInMemoryStorage): o PictureField
+#     grava as imagens e as versões sem tocar em 'media/' nem no GCS;
+#   - hash de senha MD5: criar usuários do admin fica instantâneo;
+#   - Server-Timing sem amostragem e logging só a partir de ERROR: a
+#     saída dos testes mostra apenas os testes;
+#   - métricas, perfis, consultas lentas e benchmarks numa pasta
+#     temporária, apagada ao fim da execução.
+#
+# Uso:
+#   python manage.py test                      (todos os testes, em série)
+#   python manage.py test --parallel           (um processo por CPU)
+
+import atexit
+import os
+import shutil
+import tempfile
+
+from fusion.settings import *  # noqa: F401,F403
+from fusion.settings import LOGGING
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+REPLICA_DATABASES = []
+# Ignora DATABASE_REPLICA_URLS: os testes das réplicas usam override_settings.
+
+STORAGES = {
+    'default': {'BACKEND': 'core.storage.SharedInMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+SERVER_TIMING_SAMPLE_RATE = 0
+# Os testes do ServerTimingMiddleware ligam a amostragem com override_settings.
+
+for _logger in [LOGGING['root'], *LOGGING['loggers'].values()]:
+    _logger['level'] = 'ERROR'
+# assertLogs() continua funcionando: ele ajusta o nível do logger testado.
+
+_PASTA_TEMPORARIA = tempfile.mkdtemp(prefix='fusion-testes-')
+_PROCESSO_PRINCIPAL = os.getpid()
+atexit.register(lambda: os.getpid() == _PROCESSO_PRINCIPAL and shutil.rmtree(_PASTA_TEMPORARIA, ignore_errors=True))
+# Só o processo que criou a pasta a apaga (os processos de --parallel herdam o atexit).
+
+METRICS_DIR = os.path.join(_PASTA_TEMPORARIA, 'metrics')
+PROFILING_DIR = os.path.join(_PASTA_TEMPORARIA, 'perfis')
+SLOW_QUERY_LOG_FILE = os.path.join(_PASTA_TEMPORARIA, 'slow_queries.log')
+BENCHMARK_DIR = os.path.join(_PASTA_TEMPORARIA, 'benchmarks')
+PICTURES_PLACEHOLDER_CACHE_DIR = os.path.join(_PASTA_TEMPORARIA, 'placeholders')
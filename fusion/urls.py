@@ -36,10 +36,37 @@ from django.conf import settings
 # Essas views já implementam o comportamento padrão de login/logout, sem que precisemos criar views manuais.
 from django.contrib.auth import views as auth_views
 
+# View de placeholders com cache (substitui pictures.views.placeholder).
+# MemoriaView: página do admin com a memória do worker (RSS, pico, tracemalloc).
+from core.views import ConsultasLentasView, MemoriaView, MetricasView, PerfilArquivoView, PerfisView, PlaceholderView
+
+# Mesmas rotas de 'pictures.urls', mas atendidas pela PlaceholderView.
+# O namespace 'pictures' e o nome 'placeholder' são mantidos porque o
+# django-pictures monta as URLs com reverse("pictures:placeholder", ...).
+pictures_urlpatterns = ([
+    path(
+        "<alt>/<ratio>/<int:width>w.<file_type>",
+        PlaceholderView.as_view(),
+        name="placeholder",
+    ),
+], "pictures")
+
 # Lista obrigatória que mapeia padrões de URL para views
 # Cada entrada dessa lista indica: "Se o usuário acessar essa URL, execute essa view"
 urlpatterns = [
 
+    # Páginas de diagnóstico (memória do worker, consultas lentas e perfis de
+    # requisições), protegidas pelo login do admin (apenas equipe).
+    # Vêm antes de 'admin/' porque o admin responde 404 para caminhos que não conhece.
+    path('admin/memoria/', admin.site.admin_view(MemoriaView.as_view()), name='admin_memoria'),
+    path('admin/consultas-lentas/', admin.site.admin_view(ConsultasLentasView.as_view()), name='admin_consultas_lentas'),
+    path('admin/perfis/', admin.site.admin_view(PerfisView.as_view()), name='admin_perfis'),
+    path('admin/perfis/<str:nome>', admin.site.admin_view(PerfilArquivoView.as_view()), name='admin_perfil_arquivo'),
+
+    # Métricas no formato do Prometheus, somadas entre os workers (core/metrics.py).
+    # Sem barra no final: é o caminho padrão procurado pelo Prometheus.
+    path('metrics', MetricasView.as_view(), name='metrics'),
+
     # Rota para o painel administrativo do Django
     # "/admin/" será atendido pelas URLs internas do sistema admin do Django
     path('admin/', admin.site.urls),
@@ -56,7 +83,9 @@ urlpatterns = [
     # Se você tiver PICTURES["USE_PLACEHOLDERS"] = True, então essas rotas são obrigatórias.
     # 2. Preview de imagens ou URLs resolvidas automaticamente: Algumas views internas do pacote são usadas para servir essas
     # imagens em tempo real (por exemplo, para admin ou frontend dinâmico).
-    path('pictures/', include('pictures.urls'))
+    # Aqui usamos 'pictures_urlpatterns' (definido acima), que serve os mesmos
+    # placeholders a partir de um cache em memória e em disco.
+    path('pictures/', include(pictures_urlpatterns))
 ]
 
 # Define uma rota que corresponde ao caminho `/admin/logout/` da aplicação.
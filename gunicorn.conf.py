@@ -0,0 +1,166 @@
+# ======================================================================
+# CONFIGURAÇÃO DO GUNICORN
+# ======================================================================
+# Lido automaticamente pelo gunicorn quando ele é iniciado na raiz do
+# projeto (render.yaml: startCommand "gunicorn"). Todas as opções podem
+# ser ajustadas por variáveis de ambiente, sem alterar o código:
+#
+#   GUNICORN_WORKER_CLASS   sync (padrão) | gthread | uvicorn
+#   WEB_CONCURRENCY         número de workers (padrão: calculado, ver abaixo)
+#   GUNICORN_THREADS        threads por worker no modo gthread (padrão: calculado)
+#   GUNICORN_WORKER_MEMORY_MB  memória estimada por worker (padrão: 150)
+#   GUNICORN_PRELOAD        1 (padrão) carrega o Django no processo mestre
+#   GUNICORN_MAX_REQUESTS   reinicia o worker após N requisições (padrão: 1000; 0 desliga)
+#   GUNICORN_WARMUP         1 (padrão) aquece cada worker no post_fork
+#   GUNICORN_TIMEOUT        segundos até matar um worker travado (padrão: 30)
+
+import multiprocessing
+import os
+
+
+def _env_int(nome, padrao):
+    valor = os.environ.get(nome)
+    return int(valor) if valor not in (None, '') else padrao
+
+
+def _env_bool(nome, padrao):
+    valor = os.environ.get(nome)
+    if valor in (None, ''):
+        return padrao
+    return valor.strip().lower() in ('1', 'true', 'yes', 'sim')
+
+
+def memoria_disponivel_mb():
+    """
+    Memória disponível para o serviço, em MB. Usa o limite do cgroup
+    (contêiner do Render/Docker) e, na falta dele, a memória total da máquina.
+    """
+    for caminho in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(caminho) as f:
+                valor = f.read().strip()
+        except OSError:
+            continue
+        if valor.isdigit() and int(valor) < 1 << 60:
+            return int(valor) // (1024 * 1024)
+            # 'max' (ou um número gigante no cgroup v1) significa "sem limite".
+    try:
+        with open('/proc/meminfo') as f:
+            for linha in f:
+                if linha.startswith('MemTotal:'):
+                    return int(linha.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+# -------------------------------------------------------------------
+# Endereço
+# -------------------------------------------------------------------
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# O Render informa a porta pela variável PORT.
+
+# -------------------------------------------------------------------
+# Tipo de worker
+# -------------------------------------------------------------------
+CLASSES = {
+    'sync': ('sync', 'fusion.wsgi:application'),
+    'gthread': ('gthread', 'fusion.wsgi:application'),
+    'uvicorn': ('uvicorn.workers.UvicornWorker', 'fusion.asgi:application'),
+    # 'uvicorn' exige o pacote 'uvicorn' instalado e usa a aplicação ASGI.
+}
+tipo_worker = os.environ.get('GUNICORN_WORKER_CLASS', 'sync').strip().lower()
+if tipo_worker not in CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS inválido: '{tipo_worker}' (use {', '.join(CLASSES)}).")
+worker_class, wsgi_app = CLASSES[tipo_worker]
+
+# -------------------------------------------------------------------
+# Quantidade de workers e threads
+# -------------------------------------------------------------------
+cpus = multiprocessing.cpu_count()
+memoria_mb = memoria_disponivel_mb()
+memoria_por_worker_mb = _env_int('GUNICORN_WORKER_MEMORY_MB', 150)
+
+workers = 2 * cpus + 1
+# Regra clássica do gunicorn para workers síncronos...
+if memoria_mb:
+    workers = min(workers, max(1, memoria_mb // memoria_por_worker_mb))
+    # ...limitada pela memória: no plano free (512 MB) cabem 3 workers.
+workers = _env_int('WEB_CONCURRENCY', workers)
+
+threads = _env_int('GUNICORN_THREADS', min(8, 2 * cpus) if tipo_worker == 'gthread' else 1)
+# Threads só fazem sentido no gthread: enquanto uma espera o banco ou o
+# GCS, outra atende. No sync e no uvicorn, fica em 1.
+
+# -------------------------------------------------------------------
+# Pré-carregamento e reciclagem
+# -------------------------------------------------------------------
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+# O Django (apps, models, URLs, templates) é importado uma vez no processo
+# mestre; os workers nascem por fork e compartilham essas páginas de memória
+# (copy-on-write) enquanto não as alteram. Menos memória e boot mais rápido.
+
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = max_requests // 10
+# Recicla os workers aos poucos, contendo vazamentos de memória; o "jitter"
+# evita que todos reiniciem ao mesmo tempo.
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = 30
+keepalive = 5
+
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+# O heartbeat dos workers é um arquivo temporário; em memória, não trava
+# quando o disco do contêiner está lento.
+
+accesslog = '-'
+errorlog = '-'
+
+
+# -------------------------------------------------------------------
+# Hooks
+# -------------------------------------------------------------------
+def on_starting(server):
+    """Zera as métricas do Prometheus (core/metrics.py) ao iniciar o servidor."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fusion.settings')
+    from core import metrics
+    metrics.limpar()
+
+
+def child_exit(server, worker):
+    """Guarda as métricas do worker encerrado em 'encerrados.json' (no processo mestre)."""
+    from core import metrics
+    try:
+        metrics.arquivar_processo(worker.pid)
+    except OSError:
+        server.log.warning('worker %s: métricas não arquivadas', worker.pid, exc_info=True)
+
+
+def when_ready(server):
+    server.log.info(
+        'gunicorn: %s worker(s) %s, %s thread(s), preload=%s, memória=%s MB',
+        workers, worker_class, threads, preload_app, memoria_mb,
+    )
+
+
+def post_fork(server, worker):
+    """Marca o processo como worker e o aquece antes de ele aceitar conexões."""
+    os.environ['FUSION_GUNICORN_WORKER'] = '1'
+    # core.memory.em_worker_gunicorn(): vale para sync, gthread e uvicorn.
+    from core import metrics
+    metrics.ativar_gravacao()
+    # Só os workers gravam as métricas em METRICS_DIR (não os comandos).
+    if not _env_bool('GUNICORN_WARMUP', True):
+        return
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fusion.settings')
+    django.setup()
+    # Sem preload_app o Django ainda não foi carregado neste processo;
+    # com preload, setup() não faz nada.
+
+    from core.warmup import aquecer
+    for etapa, resultado, segundos in aquecer():
+        if isinstance(resultado, Exception):
+            server.log.warning('worker %s: aquecimento (%s) falhou: %r', worker.pid, etapa, resultado)
+        else:
+            server.log.info('worker %s: aquecimento (%s) em %.0f ms: %s', worker.pid, etapa, segundos * 1000, resultado)
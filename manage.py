@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fusion.settings')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fusion.settings_test' if sys.argv[1:2] == ['test'] else 'fusion.settings')
+    # 'manage.py test' usa as configurações de teste (SQLite em memória, mídia
+    # em memória); DJANGO_SETTINGS_MODULE ou --settings têm precedência.
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc: